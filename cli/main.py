@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 import datetime
+import json
 import typer
 from pathlib import Path
 from functools import wraps
@@ -1101,5 +1102,252 @@ def analyze():
     run_analysis()
 
 
+def save_batch_reports(results_dir, final_state):
+    """Write the report sections of one run to ``results_dir/reports``."""
+    report_dir = results_dir / "reports"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    for section in (
+        "market_report",
+        "sentiment_report",
+        "news_report",
+        "fundamentals_report",
+        "investment_plan",
+        "trader_investment_plan",
+        "final_trade_decision",
+    ):
+        if final_state.get(section):
+            with open(report_dir / f"{section}.md", "w") as f:
+                f.write(final_state[section])
+
+
+@app.command()
+def batch(
+    tickers: Optional[List[str]] = typer.Argument(None, help="Ticker symbols to analyze"),
+    universe: Optional[Path] = typer.Option(
+        None, help="File with more ticker symbols, one per line"
+    ),
+    screen_top: Optional[int] = typer.Option(
+        None, help="Only analyze the N best tickers of the universe screen"
+    ),
+    analysis_date: str = typer.Option(
+        datetime.datetime.now().strftime("%Y-%m-%d"),
+        "--date",
+        help="Analysis date in YYYY-MM-DD format",
+    ),
+    analysts: List[AnalystType] = typer.Option(
+        [analyst.value for analyst in AnalystType],
+        "--analyst",
+        help="Analyst to include; repeat for several",
+    ),
+    max_concurrency: Optional[int] = typer.Option(
+        None, help="Tickers analyzed at once (default: config max_concurrent_runs)"
+    ),
+    research_depth: int = typer.Option(1, help="Debate and risk discussion rounds"),
+    online: bool = typer.Option(
+        DEFAULT_CONFIG["online_tools"], help="Use online data tools"
+    ),
+):
+    """Analyze several tickers headlessly, printing each decision as it completes."""
+    config = DEFAULT_CONFIG.copy()
+    config["max_debate_rounds"] = research_depth
+    config["max_risk_discuss_rounds"] = research_depth
+    config["online_tools"] = online
+
+    tickers = [ticker.upper() for ticker in tickers or []]
+    if universe is not None:
+        tickers += [
+            line.strip().upper() for line in universe.read_text().splitlines() if line.strip()
+        ]
+    if not tickers:
+        raise typer.BadParameter("Give ticker symbols or a --universe file")
+
+    graph = TradingAgentsGraph(
+        [analyst.value for analyst in analysts], config=config, debug=False
+    )
+
+    summary = {}
+    for ticker, result in graph.propagate_many(
+        tickers, analysis_date, max_concurrency, top_n=screen_top
+    ):
+        if isinstance(result, Exception):
+            console.print(f"[red]{ticker}: failed: {result}[/red]")
+            summary[ticker] = {"error": str(result)}
+            continue
+
+        final_state, signal = result
+        console.print(f"[green]{ticker}[/green]: {signal}")
+        save_batch_reports(
+            Path(config["results_dir"]) / ticker / analysis_date, final_state
+        )
+        summary[ticker] = {"decision": signal}
+
+    summary_file = Path(config["results_dir"]) / f"batch_{analysis_date}.json"
+    summary_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_file, "w") as f:
+        json.dump({"trade_date": analysis_date, "results": summary}, f, indent=4)
+    console.print(f"Summary written to {summary_file}")
+
+
+@app.command()
+def backtest(
+    tickers: List[str] = typer.Argument(..., help="Ticker symbols to backtest"),
+    start_date: str = typer.Option(..., "--start", help="First trade date, YYYY-MM-DD"),
+    end_date: str = typer.Option(..., "--end", help="Last trade date, YYYY-MM-DD"),
+    analysts: List[AnalystType] = typer.Option(
+        [analyst.value for analyst in AnalystType],
+        "--analyst",
+        help="Analyst to include; repeat for several",
+    ),
+    holding_period: int = typer.Option(
+        DEFAULT_CONFIG["backtest_holding_period"],
+        help="Trading days between a decision and its realized return",
+    ),
+    max_workers: Optional[int] = typer.Option(
+        None, help="Runs executed at once (default: config max_concurrent_runs)"
+    ),
+    freeze_memory: bool = typer.Option(
+        DEFAULT_CONFIG["backtest_freeze_memory"],
+        help="Do not update memories, so dates also run concurrently",
+    ),
+    triggers: bool = typer.Option(
+        False, help="Only run the graph on sessions flagged by the trigger rules"
+    ),
+    online: bool = typer.Option(
+        DEFAULT_CONFIG["online_tools"], help="Use online data tools"
+    ),
+    results_file: Optional[Path] = typer.Option(
+        None, help="Results CSV; an existing file is resumed"
+    ),
+):
+    """Walk-forward backtest: run, score and reflect on every trading day."""
+    from tradingagents.backtest import BacktestEngine, summarize
+
+    config = DEFAULT_CONFIG.copy()
+    config["online_tools"] = online
+    if triggers:
+        config["backtest_triggers"] = config["backtest_triggers"] or True
+
+    graph = TradingAgentsGraph(
+        [analyst.value for analyst in analysts], config=config, debug=False
+    )
+    if results_file is None:
+        results_file = (
+            Path(config["results_dir"]) / f"backtest_{start_date}_{end_date}.csv"
+        )
+
+    engine = BacktestEngine(
+        graph,
+        str(results_file),
+        holding_period=holding_period,
+        max_workers=max_workers,
+        freeze_memory=freeze_memory,
+    )
+    results = engine.run(tickers, start_date, end_date)
+
+    print_frame("Backtest Summary", summarize(results))
+    if engine.triggers is not None:
+        print_frame("Graph Runs Saved by Triggers", engine.trigger_report())
+    console.print(f"Results written to {results_file}")
+
+
+@app.command("build-indicators")
+def build_indicators(
+    tickers: Optional[List[str]] = typer.Argument(None, help="Ticker symbols to add"),
+    universe: Optional[Path] = typer.Option(
+        None, help="File with more ticker symbols, one per line"
+    ),
+    store_dir: Optional[Path] = typer.Option(
+        None, help="Store directory (default: config indicator_store_dir)"
+    ),
+):
+    """Precompute the technical indicators of a universe for the offline tools.
+
+    Running it again adds new tickers and the sessions after the store's last date.
+    """
+    from tradingagents.dataflows.indicator_store import build_indicator_store
+
+    tickers = [ticker.upper() for ticker in tickers or []]
+    if universe is not None:
+        tickers += [
+            line.strip().upper() for line in universe.read_text().splitlines() if line.strip()
+        ]
+    store = build_indicator_store(tickers, str(store_dir) if store_dir else None)
+    console.print(
+        f"{len(store.tickers)} tickers x {len(store.dates)} dates x "
+        f"{len(store.indicators)} indicators in {store.path}"
+    )
+
+
+@app.command()
+def bundle(
+    tickers: Optional[List[str]] = typer.Argument(None, help="Ticker symbols of the watchlist"),
+    universe: Optional[Path] = typer.Option(
+        None, help="File with more ticker symbols, one per line"
+    ),
+    start_date: str = typer.Option(..., "--start", help="First trade date, YYYY-MM-DD"),
+    end_date: Optional[str] = typer.Option(
+        None, "--end", help="Last trade date, YYYY-MM-DD (default: --start)"
+    ),
+    lookback_days: int = typer.Option(
+        90, help="Calendar days of news, filings and indicators kept before --start"
+    ),
+):
+    """Pack each ticker's offline tool data into one file read at the start of its runs."""
+    from tradingagents.dataflows.run_bundle import build_watchlist_bundles
+
+    tickers = [ticker.upper() for ticker in tickers or []]
+    if universe is not None:
+        tickers += [
+            line.strip().upper() for line in universe.read_text().splitlines() if line.strip()
+        ]
+    if not tickers:
+        raise typer.BadParameter("Give ticker symbols or a --universe file")
+    paths = build_watchlist_bundles(tickers, start_date, end_date, lookback_days)
+    for ticker, path in paths.items():
+        console.print(f"[green]{ticker}[/green]: {path}")
+
+
+@app.command()
+def ingest(
+    data_dir: Optional[Path] = typer.Option(
+        None, help="Raw data directory (default: config data_dir)"
+    ),
+    output_dir: Optional[Path] = typer.Option(
+        None, help="Converted data directory (default: config ingested_data_dir)"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, help="Conversion processes (default: one per CPU)"
+    ),
+    force: bool = typer.Option(False, help="Convert every file again"),
+):
+    """Convert the offline data directory into indexed files the tools load directly.
+
+    Running it again converts only the files that changed.
+    """
+    from tradingagents.dataflows.ingest import coverage_report, ingest_data_dir
+
+    ingest_data_dir(
+        str(data_dir) if data_dir else None,
+        str(output_dir) if output_dir else None,
+        workers,
+        force,
+    )
+    print_frame(
+        "Ingested Data Coverage", coverage_report(str(output_dir) if output_dir else None)
+    )
+
+
+def print_frame(title, frame):
+    """Print a DataFrame as a rich table."""
+    table = Table(title=title, box=box.SIMPLE)
+    for column in frame.columns:
+        table.add_column(str(column))
+    for _, row in frame.iterrows():
+        table.add_row(
+            *[f"{value:.4f}" if isinstance(value, float) else str(value) for value in row]
+        )
+    console.print(table)
+
+
 if __name__ == "__main__":
     app()
@@ -1,4 +1,4 @@
-from .utils.agent_utils import Toolkit, create_msg_delete
+from .utils.agent_utils import Toolkit, create_msg_delete, create_llm_node
 from .utils.agent_states import AgentState, InvestDebateState, RiskDebateState
 from .utils.memory import FinancialSituationMemory
 
@@ -24,6 +24,7 @@ __all__ = [
     "Toolkit",
     "AgentState",
     "create_msg_delete",
+    "create_llm_node",
     "InvestDebateState",
     "RiskDebateState",
     "create_bear_researcher",
@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_fundamentals_analyst(llm, toolkit):
@@ -52,7 +53,7 @@ IMPORTANT: Please provide your entire fundamental analysis report in Chinese (
 
         chain = prompt | llm.bind_tools(tools)
 
-        result = chain.invoke(state["messages"])
+        result = yield chain, state["messages"]
 
         report = ""
 
@@ -64,4 +65,4 @@ IMPORTANT: Please provide your entire fundamental analysis report in Chinese (
             "fundamentals_report": report,
         }
 
-    return fundamentals_analyst_node
+    return create_llm_node(fundamentals_analyst_node)
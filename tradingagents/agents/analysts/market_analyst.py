@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_market_analyst(llm, toolkit):
@@ -77,7 +78,7 @@ IMPORTANT: Please provide your entire analysis report in Chinese (中文). All t
 
         chain = prompt | llm.bind_tools(tools)
 
-        result = chain.invoke(state["messages"])
+        result = yield chain, state["messages"]
 
         report = ""
 
@@ -89,4 +90,4 @@ IMPORTANT: Please provide your entire analysis report in Chinese (中文). All t
             "market_report": report,
         }
 
-    return market_analyst_node
+    return create_llm_node(market_analyst_node)
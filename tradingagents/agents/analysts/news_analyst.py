@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_news_analyst(llm, toolkit):
@@ -48,7 +49,7 @@ IMPORTANT: Please provide your entire news analysis report in Chinese (中文).
         prompt = prompt.partial(ticker=ticker)
 
         chain = prompt | llm.bind_tools(tools)
-        result = chain.invoke(state["messages"])
+        result = yield chain, state["messages"]
 
         report = ""
 
@@ -60,4 +61,4 @@ IMPORTANT: Please provide your entire news analysis report in Chinese (中文).
             "news_report": report,
         }
 
-    return news_analyst_node
+    return create_llm_node(news_analyst_node)
@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_social_media_analyst(llm, toolkit):
@@ -48,7 +49,7 @@ IMPORTANT: Please provide your entire social media and sentiment analysis report
 
         chain = prompt | llm.bind_tools(tools)
 
-        result = chain.invoke(state["messages"])
+        result = yield chain, state["messages"]
 
         report = ""
 
@@ -60,4 +61,4 @@ IMPORTANT: Please provide your entire social media and sentiment analysis report
             "sentiment_report": report,
         }
 
-    return social_media_analyst_node
+    return create_llm_node(social_media_analyst_node)
@@ -1,5 +1,6 @@
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_research_manager(llm, memory):
@@ -12,8 +13,18 @@ def create_research_manager(llm, memory):
 
         investment_debate_state = state["investment_debate_state"]
 
-        curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
-        past_memories = memory.get_memories(curr_situation, n_matches=2)
+        curr_situation = [
+            market_research_report,
+            sentiment_report,
+            news_report,
+            fundamentals_report,
+        ]
+        # Retrieved up front by the Memory Retrieval node when it is in the graph
+        past_memories = state.get("past_memories", {}).get("invest_judge")
+        if past_memories is None:
+            past_memories = memory.get_memories(
+                curr_situation, n_matches=2, **memory.retrieval_filters(state)
+            )
 
         past_memory_str = ""
         for i, rec in enumerate(past_memories, 1):
@@ -38,7 +49,7 @@ Debate History:
 {history}
 
 IMPORTANT: Please provide your entire research management decision and analysis in Chinese (中文). All investment recommendations, rationale explanations, strategic actions, and debate summaries should be written in Chinese. Use professional financial and investment management terminology in Chinese."""
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         new_investment_debate_state = {
             "judge_decision": response.content,
@@ -54,4 +65,4 @@ IMPORTANT: Please provide your entire research management decision and analysis
             "investment_plan": response.content,
         }
 
-    return research_manager_node
+    return create_llm_node(research_manager_node)
@@ -1,5 +1,6 @@
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_risk_manager(llm, memory):
@@ -15,8 +16,18 @@ def create_risk_manager(llm, memory):
         sentiment_report = state["sentiment_report"]
         trader_plan = state["investment_plan"]
 
-        curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
-        past_memories = memory.get_memories(curr_situation, n_matches=2)
+        curr_situation = [
+            market_research_report,
+            sentiment_report,
+            news_report,
+            fundamentals_report,
+        ]
+        # Retrieved up front by the Memory Retrieval node when it is in the graph
+        past_memories = state.get("past_memories", {}).get("risk_manager")
+        if past_memories is None:
+            past_memories = memory.get_memories(
+                curr_situation, n_matches=2, **memory.retrieval_filters(state)
+            )
 
         past_memory_str = ""
         for i, rec in enumerate(past_memories, 1):
@@ -45,7 +56,7 @@ Focus on actionable insights and continuous improvement. Build on past lessons,
 
 IMPORTANT: Please provide your entire risk management analysis and decision in Chinese (中文). All risk evaluation, investment recommendation adjustments, strategic refinements, and final decisions should be written in Chinese. Use professional risk management and financial terminology in Chinese."""
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         new_risk_debate_state = {
             "judge_decision": response.content,
@@ -65,4 +76,4 @@ IMPORTANT: Please provide your entire risk management analysis and decision in C
             "final_trade_decision": response.content,
         }
 
-    return risk_manager_node
+    return create_llm_node(risk_manager_node)
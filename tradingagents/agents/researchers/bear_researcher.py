@@ -1,6 +1,7 @@
 from langchain_core.messages import AIMessage
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_bear_researcher(llm, memory):
@@ -15,8 +16,18 @@ def create_bear_researcher(llm, memory):
         news_report = state["news_report"]
         fundamentals_report = state["fundamentals_report"]
 
-        curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
-        past_memories = memory.get_memories(curr_situation, n_matches=2)
+        curr_situation = [
+            market_research_report,
+            sentiment_report,
+            news_report,
+            fundamentals_report,
+        ]
+        # Retrieved up front by the Memory Retrieval node when it is in the graph
+        past_memories = state.get("past_memories", {}).get("bear")
+        if past_memories is None:
+            past_memories = memory.get_memories(
+                curr_situation, n_matches=2, **memory.retrieval_filters(state)
+            )
 
         past_memory_str = ""
         for i, rec in enumerate(past_memories, 1):
@@ -46,7 +57,7 @@ Use this information to deliver a compelling bear argument, refute the bull's cl
 IMPORTANT: Please provide your entire bear analysis and argument in Chinese (中文). All risk analysis, competitive weakness evaluation, negative indicator discussions, and debate points should be written in Chinese. Use professional financial and investment terminology in Chinese.
 """
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         argument = f"Bear Analyst: {response.content}"
 
@@ -60,4 +71,4 @@ IMPORTANT: Please provide your entire bear analysis and argument in Chinese (中
 
         return {"investment_debate_state": new_investment_debate_state}
 
-    return bear_node
+    return create_llm_node(bear_node)
@@ -1,6 +1,7 @@
 import functools
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_trader(llm, memory):
@@ -12,8 +13,18 @@ def create_trader(llm, memory):
         news_report = state["news_report"]
         fundamentals_report = state["fundamentals_report"]
 
-        curr_situation = f"{market_research_report}\n\n{sentiment_report}\n\n{news_report}\n\n{fundamentals_report}"
-        past_memories = memory.get_memories(curr_situation, n_matches=2)
+        curr_situation = [
+            market_research_report,
+            sentiment_report,
+            news_report,
+            fundamentals_report,
+        ]
+        # Retrieved up front by the Memory Retrieval node when it is in the graph
+        past_memories = state.get("past_memories", {}).get("trader")
+        if past_memories is None:
+            past_memories = memory.get_memories(
+                curr_situation, n_matches=2, **memory.retrieval_filters(state)
+            )
 
         past_memory_str = ""
         if past_memories:
@@ -37,7 +48,7 @@ IMPORTANT: Please provide your entire trading analysis and decision in Chinese (
             context,
         ]
 
-        result = llm.invoke(messages)
+        result = yield llm, messages
 
         return {
             "messages": [result],
@@ -45,4 +56,4 @@ IMPORTANT: Please provide your entire trading analysis and decision in Chinese (
             "sender": name,
         }
 
-    return functools.partial(trader_node, name="Trader")
+    return create_llm_node(functools.partial(trader_node, name="Trader"))
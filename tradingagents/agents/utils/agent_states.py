@@ -1,4 +1,4 @@
-from typing import Annotated, Sequence
+from typing import Annotated, Dict, List, Sequence
 from datetime import date, timedelta, datetime
 from typing_extensions import TypedDict, Optional
 from langchain_openai import ChatOpenAI
@@ -50,6 +50,7 @@ class RiskDebateState(TypedDict):
 class AgentState(MessagesState):
     company_of_interest: Annotated[str, "Company that we are interested in trading"]
     trade_date: Annotated[str, "What date we are trading at"]
+    company_sector: Annotated[str, "Sector of the company, empty if unknown"]
 
     sender: Annotated[str, "Agent that sent this message"]
 
@@ -61,11 +62,19 @@ class AgentState(MessagesState):
     ]
     fundamentals_report: Annotated[str, "Report from the Fundamentals Researcher"]
 
+    # memories retrieved for each agent before the debate
+    past_memories: Annotated[
+        Dict[str, List[Dict]], "Past memories retrieved for each agent, keyed by role"
+    ]
+
     # researcher team discussion step
     investment_debate_state: Annotated[
         InvestDebateState, "Current state of the debate on if to invest or not"
     ]
     investment_plan: Annotated[str, "Plan generated by the Analyst"]
+    debate_stop_reason: Annotated[
+        str, "Why the investment debate ended (max_rounds, stance_converged, no_new_arguments)"
+    ]
 
     trader_investment_plan: Annotated[str, "Plan generated by the Trader"]
 
@@ -73,4 +82,8 @@ class AgentState(MessagesState):
     risk_debate_state: Annotated[
         RiskDebateState, "Current state of the debate on evaluating risk"
     ]
+    risk_stop_reason: Annotated[
+        str,
+        "Why the risk debate ended (max_rounds, stance_converged, no_new_arguments, unanimous)",
+    ]
     final_trade_decision: Annotated[str, "Final decision made by the Risk Analysts"]
@@ -3,6 +3,7 @@ from typing import List
 from typing import Annotated
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import RemoveMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
 from datetime import date, timedelta, datetime
 import functools
@@ -31,6 +32,37 @@ def create_msg_delete():
     return delete_messages
 
 
+def create_llm_node(node):
+    """Turn a generator node into a runnable with sync and async execution.
+
+    ``node(state)`` yields ``(runnable, input)`` for its LLM call, receives the
+    response and returns the state update. The runnable is called with
+    ``invoke`` when the graph is invoked and with ``ainvoke`` when it is
+    awaited, so the same node body serves both paths.
+    """
+
+    def run(state):
+        steps = node(state)
+        runnable, llm_input = next(steps)
+        try:
+            steps.send(runnable.invoke(llm_input))
+        except StopIteration as done:
+            return done.value
+        raise RuntimeError("LLM nodes must make exactly one LLM call")
+
+    async def arun(state):
+        steps = node(state)
+        runnable, llm_input = next(steps)
+        try:
+            steps.send(await runnable.ainvoke(llm_input))
+        except StopIteration as done:
+            return done.value
+        raise RuntimeError("LLM nodes must make exactly one LLM call")
+
+    name = getattr(node, "__name__", None) or node.func.__name__
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
 class Toolkit:
     _config = DEFAULT_CONFIG.copy()
 
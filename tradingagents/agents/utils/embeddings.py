@@ -0,0 +1,289 @@
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?|[\u4e00-\u9fff]")
+
+# Odd 64-bit multipliers used to derive independent projection slots from a
+# single feature hash (multiply-shift hashing).
+_PROJECTION_MULTIPLIERS = np.array(
+    [
+        0x9E3779B97F4A7C15,
+        0xC2B2AE3D27D4EB4F,
+        0x165667B19E3779F9,
+        0xD6E8FEB86659FD93,
+        0xFF51AFD7ED558CCD,
+        0xC4CEB9FE1A85EC53,
+        0x94D049BB133111EB,
+        0xBF58476D1CE4E5B9,
+    ],
+    dtype=np.uint64,
+)
+
+
+class HashingEmbedder:
+    """Offline embedder: hashed n-gram term frequencies followed by a sparse random projection.
+
+    Words (and individual CJK characters, since the reports are often written
+    in Chinese) plus their bigrams are hashed with a stable CRC32, weighted with
+    sublinear term frequency and projected onto ``dim`` dimensions. Each
+    feature contributes ``density`` signed entries whose positions are derived
+    from its hash, so the projection matrix is never materialised. Similar
+    texts share features and therefore end up close in cosine space, unlike the
+    digest-based vectors this replaces.
+    """
+
+    def __init__(self, dim=384, density=4):
+        if not 1 <= density <= len(_PROJECTION_MULTIPLIERS):
+            raise ValueError(
+                f"density must be between 1 and {len(_PROJECTION_MULTIPLIERS)}"
+            )
+        self.dim = dim
+        self.density = density
+        self._multipliers = _PROJECTION_MULTIPLIERS[:density]
+
+    @staticmethod
+    def _features(text):
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens + bigrams
+
+    def embed(self, texts):
+        """Embed a batch of texts into an (n, dim) float32 array of unit vectors."""
+        doc_ids = []
+        hashes = []
+        for i, text in enumerate(texts):
+            features = self._features(text)
+            doc_ids.append(np.full(len(features), i, dtype=np.int64))
+            hashes.append(
+                np.fromiter(
+                    (zlib.crc32(f.encode("utf-8")) for f in features),
+                    dtype=np.uint64,
+                    count=len(features),
+                )
+            )
+
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not hashes or sum(len(h) for h in hashes) == 0:
+            return out
+
+        doc_ids = np.concatenate(doc_ids)
+        hashes = np.concatenate(hashes)
+
+        # Sublinear term frequency per (document, feature); CRC32 hashes fit
+        # in the low 32 bits so both can be packed into one sort key.
+        keys, counts = np.unique(
+            (doc_ids.astype(np.uint64) << np.uint64(32)) | hashes,
+            return_counts=True,
+        )
+        weights = (1.0 + np.log(counts)).astype(np.float32)
+        feature_hashes = keys & np.uint64(0xFFFFFFFF)
+
+        # Sparse random projection: each feature hits `density` signed slots
+        mixed = feature_hashes[:, None] * self._multipliers
+        slots = ((mixed >> np.uint64(32)) % np.uint64(self.dim)).astype(np.int64)
+        signs = np.where((mixed >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+        rows = np.repeat((keys >> np.uint64(32)).astype(np.int64), self.density)
+
+        np.add.at(
+            out,
+            (rows, slots.ravel()),
+            (signs * weights[:, None]).ravel(),
+        )
+
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class OpenAIEmbedder:
+    """Embedder backed by an OpenAI-compatible embeddings endpoint."""
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+
+    def embed(self, texts):
+        """Embed a batch of texts with a single API request."""
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+
+class ChunkingEmbedder:
+    """Splits situations into chunks, embeds them in one batch and pools the result.
+
+    A situation is either a plain string or a sequence of report sections
+    (market, sentiment, news, fundamentals). Sections are kept as separate
+    chunks, and any section longer than ``max_chunk_chars`` is packed
+    paragraph by paragraph into several chunks, so no input exceeds the
+    embedding model's limit. Chunk vectors are cached by content: the five
+    agent memories embed the same reports, so only the first lookup pays for
+    them.
+    """
+
+    def __init__(self, base, max_chunk_chars=4000, max_chunks=32, cache_size=1024):
+        self.base = base
+        self.max_chunk_chars = max_chunk_chars
+        self.max_chunks = max_chunks
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def join(situation):
+        """Return the situation as a single document string."""
+        if isinstance(situation, str):
+            return situation
+        return "\n\n".join(situation)
+
+    def _pack(self, section):
+        """Pack the paragraphs of one section into chunks of bounded size."""
+        if len(section) <= self.max_chunk_chars:
+            return [section]
+
+        chunks = []
+        current = ""
+        for paragraph in section.split("\n\n"):
+            while len(paragraph) > self.max_chunk_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(paragraph[: self.max_chunk_chars])
+                paragraph = paragraph[self.max_chunk_chars :]
+            if current and len(current) + 2 + len(paragraph) > self.max_chunk_chars:
+                chunks.append(current)
+                current = paragraph
+            else:
+                current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def split(self, situation):
+        """Split a situation into chunks on report boundaries."""
+        sections = [situation] if isinstance(situation, str) else list(situation)
+        chunks = []
+        for section in sections:
+            if section and section.strip():
+                chunks.extend(self._pack(section.strip()))
+        if not chunks:
+            chunks = [self.join(situation).strip() or " "]
+        return chunks[: self.max_chunks]
+
+    @staticmethod
+    def _key(chunk):
+        return hashlib.sha1(chunk.encode("utf-8")).hexdigest()
+
+    def _embed_chunks(self, chunks):
+        """Embed unique chunks, serving repeats from the cache."""
+        keys = [self._key(chunk) for chunk in chunks]
+
+        with self._lock:
+            cached = {key: self._cache[key] for key in keys if key in self._cache}
+            for key in cached:
+                self._cache.move_to_end(key)
+
+        missing = {}
+        for key, chunk in zip(keys, chunks):
+            if key not in cached and key not in missing:
+                missing[key] = chunk
+
+        if missing:
+            vectors = self.base.embed(list(missing.values()))
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = np.divide(
+                vectors, norms, out=np.zeros_like(vectors), where=norms > 0
+            )
+            fresh = dict(zip(missing.keys(), vectors))
+            cached.update(fresh)
+            with self._lock:
+                self._cache.update(fresh)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return np.stack([cached[key] for key in keys]).astype(np.float32, copy=False)
+
+    def embed_chunked(self, situations):
+        """Embed situations, returning (pooled vectors, per-situation chunk vectors)."""
+        split = [self.split(situation) for situation in situations]
+        flat = [chunk for chunks in split for chunk in chunks]
+        if not flat:
+            return np.empty((0, 0), dtype=np.float32), []
+
+        vectors = self._embed_chunks(flat)
+
+        chunk_vectors = []
+        start = 0
+        for chunks in split:
+            chunk_vectors.append(vectors[start : start + len(chunks)])
+            start += len(chunks)
+
+        pooled = np.stack([v.mean(axis=0) for v in chunk_vectors])
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        np.divide(pooled, norms, out=pooled, where=norms > 0)
+        return pooled, chunk_vectors
+
+    def embed(self, situations):
+        """Embed situations into pooled (n, dim) float32 unit vectors."""
+        return self.embed_chunked(situations)[0]
+
+
+_SHARED_EMBEDDERS = {}
+_SHARED_EMBEDDERS_LOCK = threading.Lock()
+
+
+def _create_base_embedder(backend, config):
+    backend_url = config.get("backend_url", "")
+
+    if backend == "local":
+        return HashingEmbedder(dim=config.get("local_embedding_dim", 384))
+    if backend == "openai":
+        from openai import OpenAI
+
+        if backend_url == "http://localhost:11434/v1":
+            model = "nomic-embed-text"
+        else:
+            model = config.get("embedding_model", "text-embedding-3-small")
+        return OpenAIEmbedder(OpenAI(base_url=backend_url), model)
+
+    raise ValueError(f"Unsupported embedding backend: {backend}")
+
+
+def create_embedder(config):
+    """Create the chunking embedder selected by ``config["embedding_backend"]``.
+
+    ``"auto"`` uses the provider's embeddings API for OpenAI-compatible
+    backends (including Ollama) and the local hashing embedder for providers
+    without one, such as Google and Anthropic. Embedders are shared between
+    memories with the same settings so they also share the chunk cache.
+    """
+    backend = config.get("embedding_backend", "auto").lower()
+    llm_provider = config.get("llm_provider", "openai").lower()
+    backend_url = config.get("backend_url", "")
+
+    if backend == "auto":
+        backend = "local" if llm_provider in ("google", "anthropic") else "openai"
+        if backend_url == "http://localhost:11434/v1":
+            backend = "openai"
+
+    key = (
+        backend,
+        backend_url,
+        config.get("embedding_model"),
+        config.get("local_embedding_dim", 384),
+        config.get("embedding_chunk_chars", 4000),
+        config.get("embedding_max_chunks", 32),
+    )
+    with _SHARED_EMBEDDERS_LOCK:
+        if key not in _SHARED_EMBEDDERS:
+            _SHARED_EMBEDDERS[key] = ChunkingEmbedder(
+                _create_base_embedder(backend, config),
+                max_chunk_chars=config.get("embedding_chunk_chars", 4000),
+                max_chunks=config.get("embedding_max_chunks", 32),
+            )
+        return _SHARED_EMBEDDERS[key]
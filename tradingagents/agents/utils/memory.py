@@ -1,103 +1,293 @@
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .embeddings import create_embedder
+from .vector_store import create_vector_store
+
+
+def trade_date_key(trade_date):
+    """Integer YYYYMMDD key for a trade date, usable in range filters."""
+    return int(str(trade_date)[:10].replace("-", ""))
 
 
 class FinancialSituationMemory:
     def __init__(self, name, config):
+        self.name = name
         self.config = config
         self.llm_provider = config.get("llm_provider", "openai").lower()
-        
-        # Initialize embedding client based on LLM provider
-        if self.llm_provider == "openai" or config["backend_url"] == "http://localhost:11434/v1":
-            self.client = OpenAI(base_url=config["backend_url"])
-            if config["backend_url"] == "http://localhost:11434/v1":
-                self.embedding = "nomic-embed-text"
-            else:
-                self.embedding = "text-embedding-3-small"
-        elif self.llm_provider == "google":
-            # For Google, we'll use a simple fallback embedding
-            self.client = None
-            self.embedding = None
-        elif self.llm_provider == "anthropic":
-            # For Anthropic, we'll use a simple fallback embedding
-            self.client = None 
-            self.embedding = None
-        else:
-            # Default to OpenAI
-            self.client = OpenAI(base_url=config["backend_url"])
-            self.embedding = "text-embedding-3-small"
-            
-        self.chroma_client = chromadb.Client(Settings(allow_reset=True))
-        # Use get_or_create_collection to avoid "already exists" error
-        self.situation_collection = self.chroma_client.get_or_create_collection(name=name)
+
+        # Embedding backend: provider API or the offline hashing embedder,
+        # wrapped so long situations are chunked and pooled
+        self.embedder = create_embedder(config)
+        self.scoring = config.get("memory_scoring", "pooled").lower()
+
+        # Vector storage: chromadb collection or the NumPy exact-search store
+        self.store = create_vector_store(name, config)
+
+        # Capacity management
+        self.capacity = config.get("memory_capacity")
+        self.ticker_quota = config.get("memory_ticker_quota")
+        self.eviction = config.get("memory_eviction", "oldest").lower()
+        self.dedup_threshold = config.get("memory_dedup_threshold")
+        self.merge_threshold = config.get("memory_merge_threshold", 0.95)
+        if self.eviction not in ("oldest", "least_retrieved"):
+            raise ValueError(f"Unsupported memory eviction policy: {self.eviction}")
+
+        # Retrieval filters applied by the agents
+        self.retrieval_scope = config.get("memory_retrieval_scope", "all").lower()
+        self.point_in_time = config.get("memory_point_in_time", True)
+        if self.retrieval_scope not in ("all", "ticker", "sector"):
+            raise ValueError(
+                f"Unsupported memory retrieval scope: {self.retrieval_scope}"
+            )
+
+        # Writers (reflections, compaction) and readers share the store
+        self._lock = threading.RLock()
+        self._stop_compaction = threading.Event()
+        self._compaction_thread = None
+        interval = config.get("memory_compaction_interval")
+        if interval:
+            self._compaction_thread = threading.Thread(
+                target=self._compaction_loop,
+                args=(interval,),
+                name=f"{name}-compaction",
+                daemon=True,
+            )
+            self._compaction_thread.start()
 
     def get_embedding(self, text):
         """Get embedding for a text based on configured provider"""
-        
-        if self.client and self.embedding:
-            # Use OpenAI/compatible embedding
-            response = self.client.embeddings.create(
-                model=self.embedding, input=text
+        return self.embedder.embed([text])[0].tolist()
+
+    def get_embeddings(self, texts):
+        """Get embeddings for a batch of texts in one call"""
+        return self.embedder.embed(texts).tolist()
+
+    def _is_duplicate(self, embedding, accepted, ticker=None):
+        """Check a new situation against the store (same ticker) and the rest of the batch."""
+        if self.dedup_threshold is None:
+            return False
+        if any(float(embedding @ other) >= self.dedup_threshold for other in accepted):
+            return True
+        nearest = self.store.query(embedding, 1, ticker=ticker)
+        return bool(nearest) and nearest[0]["score"] >= self.dedup_threshold
+
+    def add_situations(self, situations_and_advice, metadata=None):
+        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)
+
+        A situation is either a string or a list of report sections; sections
+        are embedded as separate chunks. ``metadata`` (ticker, sector,
+        trade_date, decision and, once the outcome is realized, exit_date)
+        is recorded on every entry. Situations that are near-duplicates of a
+        stored one are skipped, then the configured capacity and per-ticker
+        quota are enforced.
+        """
+        if not situations_and_advice:
+            return
+
+        situations = [situation for situation, _ in situations_and_advice]
+        embeddings, chunk_embeddings = self.embedder.embed_chunked(situations)
+
+        metadata = dict(metadata or {})
+        if metadata.get("trade_date"):
+            metadata["trade_date"] = str(metadata["trade_date"])
+            metadata["trade_date_key"] = trade_date_key(metadata["trade_date"])
+            # The date the lesson's outcome was realized; 0 when not recorded
+            if metadata.get("exit_date"):
+                metadata["exit_date"] = str(metadata["exit_date"])
+                metadata["exit_date_key"] = trade_date_key(metadata["exit_date"])
+            else:
+                metadata.pop("exit_date", None)
+                metadata["exit_date_key"] = 0
+
+        with self._lock:
+            ids, documents, metadatas, pooled, chunks = [], [], [], [], []
+            now = time.time()
+
+            for i, (situation, recommendation) in enumerate(situations_and_advice):
+                if self._is_duplicate(embeddings[i], pooled, metadata.get("ticker")):
+                    continue
+
+                ids.append(uuid.uuid4().hex)
+                documents.append(self.embedder.join(situation))
+                metadatas.append(
+                    {
+                        **metadata,
+                        "recommendation": recommendation,
+                        "created_at": now,
+                        "hits": 0,
+                        "last_retrieved": 0.0,
+                    }
+                )
+                pooled.append(embeddings[i])
+                chunks.append(chunk_embeddings[i])
+
+            if not ids:
+                return
+
+            self.store.add(
+                ids=ids,
+                embeddings=np.stack(pooled),
+                documents=documents,
+                metadatas=metadatas,
+                chunk_embeddings=chunks,
             )
-            return response.data[0].embedding
-        else:
-            # Simple fallback: use text length and character distribution as a basic "embedding"
-            # This is a very simple approach for non-OpenAI providers
-            import hashlib
-            import numpy as np
-            
-            # Create a simple hash-based embedding
-            hash_obj = hashlib.md5(text.encode())
-            hash_bytes = hash_obj.digest()
-            
-            # Convert to a fixed-size vector (384 dimensions, common for many embedding models)
-            embedding = []
-            for i in range(384):
-                embedding.append((hash_bytes[i % len(hash_bytes)] - 128) / 128.0)
-            
-            return embedding
-
-    def add_situations(self, situations_and_advice):
-        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
-
-        situations = []
-        advice = []
-        ids = []
-        embeddings = []
-
-        offset = self.situation_collection.count()
-
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
-            situations.append(situation)
-            advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
-
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
-        )
-
-    def get_memories(self, current_situation, n_matches=1):
-        """Find matching recommendations using OpenAI embeddings"""
-        query_embedding = self.get_embedding(current_situation)
-
-        results = self.situation_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_matches,
-            include=["metadatas", "documents", "distances"],
-        )
+            self._enforce_capacity({m.get("ticker") for m in metadatas} - {None})
+
+    def _eviction_key(self, metadata):
+        if self.eviction == "least_retrieved":
+            return (
+                metadata.get("hits", 0),
+                metadata.get("last_retrieved", 0.0),
+                metadata.get("created_at", 0.0),
+            )
+        return (metadata.get("created_at", 0.0),)
+
+    def _enforce_capacity(self, tickers=()):
+        """Evict entries beyond the per-ticker quota and the total capacity."""
+        if self.capacity is None and self.ticker_quota is None:
+            return
+
+        ids, metadatas = self.store.get_metadatas()
+        entries = sorted(zip(ids, metadatas), key=lambda e: self._eviction_key(e[1]))
+        evict = set()
+
+        if self.ticker_quota is not None:
+            for ticker in tickers:
+                same_ticker = [e for e in entries if e[1].get("ticker") == ticker]
+                excess = len(same_ticker) - self.ticker_quota
+                evict.update(entry_id for entry_id, _ in same_ticker[: max(excess, 0)])
+
+        if self.capacity is not None:
+            remaining = [e for e in entries if e[0] not in evict]
+            excess = len(remaining) - self.capacity
+            evict.update(entry_id for entry_id, _ in remaining[: max(excess, 0)])
+
+        if evict:
+            self.store.delete(list(evict))
+
+    def compact(self):
+        """Merge groups of highly similar entries into their highest-priority member.
+
+        Entries are visited from highest to lowest eviction priority (newest
+        or most retrieved first); each unmerged entry absorbs the unmerged
+        entries whose similarity exceeds ``memory_merge_threshold``. The kept
+        entry inherits their retrieval counts. Returns the number of entries
+        removed.
+        """
+        with self._lock:
+            ids, metadatas = self.store.get_metadatas()
+            if len(ids) < 2:
+                return 0
+
+            order = sorted(
+                range(len(ids)),
+                key=lambda i: self._eviction_key(metadatas[i]),
+                reverse=True,
+            )
+            ids = [ids[i] for i in order]
+            metadatas = [metadatas[i] for i in order]
+            vectors = self.store.get_embeddings(ids)
+            vectors = vectors / np.maximum(
+                np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12
+            )
+
+            merged = np.zeros(len(ids), dtype=bool)
+            removed, updated_ids, updated_metadatas = [], [], []
+            for i in range(len(ids)):
+                if merged[i]:
+                    continue
+                similar = (vectors[i + 1 :] @ vectors[i]) >= self.merge_threshold
+                group = np.flatnonzero(similar & ~merged[i + 1 :]) + i + 1
+                if not len(group):
+                    continue
+                merged[group] = True
+                removed.extend(ids[j] for j in group)
+                metadata = dict(metadatas[i])
+                metadata["hits"] = metadata.get("hits", 0) + sum(
+                    metadatas[j].get("hits", 0) for j in group
+                )
+                metadata["merged"] = metadata.get("merged", 0) + len(group)
+                updated_ids.append(ids[i])
+                updated_metadatas.append(metadata)
+
+            if removed:
+                self.store.update_metadatas(updated_ids, updated_metadatas)
+                self.store.delete(removed)
+            return len(removed)
+
+    def _compaction_loop(self, interval):
+        while not self._stop_compaction.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting memory {self.name}: {e}")
+
+    def close(self):
+        """Stop the background compaction thread, if any."""
+        self._stop_compaction.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+
+    def retrieval_filters(self, state):
+        """Filters for ``get_memories`` given the agent state and the configured scope."""
+        filters = {}
+        if self.retrieval_scope == "ticker":
+            filters["ticker"] = state["company_of_interest"]
+        elif self.retrieval_scope == "sector" and state.get("company_sector"):
+            filters["sector"] = state["company_sector"]
+        if self.point_in_time:
+            filters["as_of"] = state["trade_date"]
+        return filters
+
+    def get_memories(
+        self, current_situation, n_matches=1, ticker=None, sector=None, as_of=None
+    ):
+        """Find matching recommendations using the configured embeddings
+
+        ``ticker`` and ``sector`` restrict the search to entries recorded for
+        them; ``as_of`` only considers entries whose outcome was realized on
+        or before it (their exit date), or, when no exit date was recorded,
+        entries from trade dates strictly before it. Backtests thus never see
+        lessons built on returns that were not yet realized.
+        """
+        embeddings, chunk_embeddings = self.embedder.embed_chunked([current_situation])
+
+        with self._lock:
+            results = self.store.query(
+                embeddings[0],
+                n_matches,
+                chunk_embeddings=chunk_embeddings[0] if self.scoring == "maxsim" else None,
+                ticker=ticker,
+                sector=sector,
+                as_of=trade_date_key(as_of) if as_of else None,
+            )
+
+            # Retrieval statistics drive the least-retrieved eviction policy
+            if results and self.eviction == "least_retrieved":
+                now = time.time()
+                self.store.update_metadatas(
+                    [result["id"] for result in results],
+                    [
+                        {
+                            **result["metadata"],
+                            "hits": result["metadata"].get("hits", 0) + 1,
+                            "last_retrieved": now,
+                        }
+                        for result in results
+                    ],
+                )
 
         matched_results = []
-        for i in range(len(results["documents"][0])):
+        for result in results:
             matched_results.append(
                 {
-                    "matched_situation": results["documents"][0][i],
-                    "recommendation": results["metadatas"][0][i]["recommendation"],
-                    "similarity_score": 1 - results["distances"][0][i],
+                    "matched_situation": result["document"],
+                    "recommendation": result["metadata"]["recommendation"],
+                    "similarity_score": result["score"],
                 }
             )
 
@@ -105,8 +295,13 @@ class FinancialSituationMemory:
 
 
 if __name__ == "__main__":
-    # Example usage
-    matcher = FinancialSituationMemory()
+    from tradingagents.default_config import DEFAULT_CONFIG
+
+    # Example usage (offline: local embeddings and the NumPy store)
+    config = DEFAULT_CONFIG.copy()
+    config["embedding_backend"] = "local"
+    config["memory_backend"] = "numpy"
+    matcher = FinancialSituationMemory("example_memory", config)
 
     # Example data
     example_data = [
@@ -0,0 +1,239 @@
+import os
+import sys
+
+import numpy as np
+
+
+QUANTIZATION_DTYPES = {
+    "float32": np.float32,
+    "float16": np.float16,
+    "int8": np.int8,
+}
+
+
+def normalize_quantization(quantization):
+    """Map a config value (None, "none", "float32", "float16", "int8") to a dtype name."""
+    if quantization in (None, "", "none"):
+        return "float32"
+    quantization = str(quantization).lower()
+    if quantization not in QUANTIZATION_DTYPES:
+        raise ValueError(
+            f"Unsupported memory quantization: {quantization}. "
+            f"Choose from: {list(QUANTIZATION_DTYPES)}"
+        )
+    return quantization
+
+
+def quantize(rows, quantization):
+    """Quantize float rows, returning (codes, per-row scales or None).
+
+    int8 uses symmetric per-vector scaling: ``row ~= codes * scale`` with
+    ``scale = max(|row|) / 127``.
+    """
+    rows = np.asarray(rows, dtype=np.float32)
+    if quantization == "int8":
+        scales = np.abs(rows).max(axis=1) / 127.0
+        safe = np.where(scales > 0, scales, 1.0)
+        codes = np.clip(np.rint(rows / safe[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    return rows.astype(QUANTIZATION_DTYPES[quantization]), None
+
+
+def dequantize(codes, scales):
+    rows = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        rows = rows * np.asarray(scales, dtype=np.float32)[:, None]
+    return rows
+
+
+def grow(array, used, needed, shape_tail, dtype):
+    """Return ``array`` with room for ``needed`` rows, reallocating geometrically.
+
+    Memory-mapped arrays loaded from a snapshot are read-only, so they are
+    copied into RAM on the first write.
+    """
+    if array is not None and array.shape[1:] != shape_tail:
+        raise ValueError(
+            f"Embedding dimension {shape_tail} does not match store dimension {array.shape[1:]}"
+        )
+    writable = array is not None and not isinstance(array, np.memmap)
+    if writable and needed <= array.shape[0]:
+        return array
+
+    capacity = max(needed, 2 * used, 64)
+    grown = np.empty((capacity,) + shape_tail, dtype=dtype)
+    if used:
+        grown[:used] = array[:used]
+    return grown
+
+
+class VectorMatrix:
+    """Growable row matrix stored as float32, float16 or int8 codes.
+
+    Scores are computed block by block so that dequantising int8/float16 codes
+    never materialises a float32 copy of the whole matrix.
+    """
+
+    BLOCK_ROWS = 65536
+
+    def __init__(self, quantization=None):
+        self.quantization = normalize_quantization(quantization)
+        self.codes = None
+        self.scales = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """Bytes used by the populated codes and scales."""
+        if self.codes is None:
+            return 0
+        total = self.codes[: self.size].nbytes
+        if self.scales is not None:
+            total += self.scales[: self.size].nbytes
+        return total
+
+    def append(self, rows):
+        codes, scales = quantize(rows, self.quantization)
+        needed = self.size + len(codes)
+        self.codes = grow(
+            self.codes, self.size, needed, codes.shape[1:], codes.dtype
+        )
+        self.codes[self.size : needed] = codes
+        if scales is not None:
+            self.scales = grow(self.scales, self.size, needed, (), np.float32)
+            self.scales[self.size : needed] = scales
+        self.size = needed
+
+    def take(self, index):
+        """Return a new matrix holding only the rows at ``index``."""
+        matrix = VectorMatrix(self.quantization)
+        if self.codes is not None:
+            matrix.codes = np.ascontiguousarray(self.codes[: self.size][index])
+            if self.scales is not None:
+                matrix.scales = np.ascontiguousarray(self.scales[: self.size][index])
+            matrix.size = len(matrix.codes)
+        return matrix
+
+    def rows(self, index):
+        """Dequantised float32 rows for an index array or slice."""
+        scales = None if self.scales is None else self.scales[: self.size][index]
+        return dequantize(self.codes[: self.size][index], scales)
+
+    def scores(self, queries):
+        """Inner products between float32 ``queries`` (m, dim) and every row: (m, size)."""
+        queries = np.asarray(queries, dtype=np.float32)
+        out = np.empty((len(queries), self.size), dtype=np.float32)
+        for start in range(0, self.size, self.BLOCK_ROWS):
+            end = min(start + self.BLOCK_ROWS, self.size)
+            block = np.asarray(self.codes[start:end], dtype=np.float32)
+            out[:, start:end] = queries @ block.T
+            if self.scales is not None:
+                out[:, start:end] *= self.scales[start:end]
+        return out
+
+    def save(self, prefix):
+        """Save codes (and scales) as ``prefix.npy`` / ``prefix.scales.npy``."""
+        codes = np.empty((0, 0), dtype=np.float32) if self.codes is None else self.codes
+        np.save(prefix + ".npy", np.ascontiguousarray(codes[: self.size]))
+        if self.scales is not None:
+            np.save(prefix + ".scales.npy", np.ascontiguousarray(self.scales[: self.size]))
+
+    @classmethod
+    def load(cls, prefix, quantization=None):
+        """Load a saved matrix memory-mapped, re-quantizing if the stored format differs."""
+        matrix = cls(quantization)
+        codes = np.load(prefix + ".npy", mmap_mode="r")
+        scales = None
+        if os.path.exists(prefix + ".scales.npy"):
+            scales = np.load(prefix + ".scales.npy", mmap_mode="r")
+
+        if len(codes) == 0:
+            return matrix
+
+        stored = "int8" if scales is not None else np.dtype(codes.dtype).name
+        if stored == matrix.quantization:
+            matrix.codes, matrix.scales, matrix.size = codes, scales, len(codes)
+        else:
+            matrix.append(dequantize(codes, scales))
+        return matrix
+
+
+def exact_top_k(vectors, queries, k):
+    """Ground-truth top-k row indices for each query by float32 inner product."""
+    scores = np.asarray(queries, dtype=np.float32) @ np.asarray(vectors, dtype=np.float32).T
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return top
+
+
+def benchmark_recall(vectors, queries, k=10, quantization="int8", rescore_factor=4):
+    """Measure recall@k and size of a quantized matrix against exact float32 search.
+
+    Returns a dict with recall before and after rescoring the top
+    ``k * rescore_factor`` approximate candidates with the float32 vectors,
+    plus the bytes used by float32 and by the quantized codes.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(vectors))
+    truth = exact_top_k(vectors, queries, k)
+
+    matrix = VectorMatrix(quantization)
+    matrix.append(vectors)
+    approx = matrix.scores(queries)
+
+    n_candidates = min(len(vectors), max(k, k * rescore_factor))
+    candidates = np.argpartition(-approx, n_candidates - 1, axis=1)[:, :n_candidates]
+    approx_top = np.take_along_axis(
+        candidates,
+        np.argsort(-np.take_along_axis(approx, candidates, axis=1), axis=1)[:, :k],
+        axis=1,
+    )
+
+    exact = np.einsum("qd,qcd->qc", queries, vectors[candidates])
+    rescored_top = np.take_along_axis(
+        candidates, np.argsort(-exact, axis=1)[:, :k], axis=1
+    )
+
+    def recall(found):
+        hits = [len(set(f) & set(t)) for f, t in zip(found, truth)]
+        return float(np.sum(hits)) / (len(truth) * k)
+
+    return {
+        "quantization": matrix.quantization,
+        "k": k,
+        "recall": recall(approx_top),
+        "recall_rescored": recall(rescored_top),
+        "float32_bytes": vectors.nbytes,
+        "quantized_bytes": matrix.nbytes,
+        "compression": vectors.nbytes / max(matrix.nbytes, 1),
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python -m tradingagents.agents.utils.quantization [snapshot.npy]
+    # Benchmarks a saved NumPy memory snapshot, or clustered synthetic vectors.
+    rng = np.random.default_rng(0)
+    if len(sys.argv) > 1:
+        data = np.load(sys.argv[1]).astype(np.float32)
+    else:
+        centers = rng.normal(size=(200, 1536)).astype(np.float32)
+        data = centers[rng.integers(0, 200, 20000)] + 0.5 * rng.normal(
+            size=(20000, 1536)
+        ).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    queries = data[rng.integers(0, len(data), 200)] + 0.05 * rng.normal(
+        size=(200, data.shape[1])
+    ).astype(np.float32)
+
+    for quantization in ("float16", "int8"):
+        result = benchmark_recall(data, queries, k=10, quantization=quantization)
+        print(
+            f"{quantization}: recall@{result['k']}={result['recall']:.4f} "
+            f"rescored={result['recall_rescored']:.4f} "
+            f"size {result['float32_bytes'] / 2**20:.1f}MB -> "
+            f"{result['quantized_bytes'] / 2**20:.1f}MB ({result['compression']:.1f}x)"
+        )
@@ -0,0 +1,564 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .quantization import VectorMatrix, grow, normalize_quantization
+
+
+class ChromaVectorStore:
+    """Vector store backed by an in-process chromadb collection."""
+
+    def __init__(self, name):
+        # Imported lazily so the NumPy backend never pays chromadb's start-up cost
+        import chromadb
+        from chromadb.config import Settings
+
+        self.chroma_client = chromadb.Client(Settings(allow_reset=True))
+        # Use get_or_create_collection to avoid "already exists" error
+        self.collection = self.chroma_client.get_or_create_collection(name=name)
+
+    def count(self):
+        return self.collection.count()
+
+    def add(self, ids, embeddings, documents, metadatas, chunk_embeddings=None):
+        # Chroma holds one vector per entry, so only the pooled vector is kept
+        self.collection.add(
+            documents=list(documents),
+            metadatas=list(metadatas),
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            ids=list(ids),
+        )
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def update_metadatas(self, ids, metadatas):
+        if ids:
+            self.collection.update(ids=list(ids), metadatas=list(metadatas))
+
+    def get_metadatas(self):
+        """Return (ids, metadatas) for every entry."""
+        results = self.collection.get(include=["metadatas"])
+        return results["ids"], results["metadatas"]
+
+    def get_embeddings(self, ids):
+        """Return pooled float32 vectors for ``ids``, in the given order."""
+        results = self.collection.get(ids=list(ids), include=["embeddings"])
+        by_id = dict(zip(results["ids"], results["embeddings"]))
+        return np.asarray([by_id[i] for i in ids], dtype=np.float32)
+
+    @staticmethod
+    def _where(ticker=None, sector=None, as_of=None):
+        clauses = []
+        if ticker is not None:
+            clauses.append({"ticker": ticker})
+        if sector is not None:
+            clauses.append({"sector": sector})
+        if as_of is not None:
+            # Realized by the date, or from an earlier trade date when no exit was recorded
+            clauses.append(
+                {
+                    "$or": [
+                        {
+                            "$and": [
+                                {"exit_date_key": {"$gt": 0}},
+                                {"exit_date_key": {"$lte": as_of}},
+                            ]
+                        },
+                        {
+                            "$and": [
+                                {"exit_date_key": 0},
+                                {"trade_date_key": {"$lt": as_of}},
+                            ]
+                        },
+                    ]
+                }
+            )
+        if len(clauses) > 1:
+            return {"$and": clauses}
+        return clauses[0] if clauses else None
+
+    def query(
+        self,
+        embedding,
+        n_results,
+        chunk_embeddings=None,
+        ticker=None,
+        sector=None,
+        as_of=None,
+    ):
+        if self.count() == 0:
+            return []
+
+        results = self.collection.query(
+            query_embeddings=[np.asarray(embedding, dtype=np.float32).tolist()],
+            n_results=n_results,
+            where=self._where(ticker, sector, as_of),
+            include=["metadatas", "documents", "distances"],
+        )
+
+        return [
+            {
+                "id": results["ids"][0][i],
+                "document": results["documents"][0][i],
+                "metadata": results["metadatas"][0][i],
+                "score": 1 - results["distances"][0][i],
+            }
+            for i in range(len(results["documents"][0]))
+        ]
+
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class _FullPrecisionRows:
+    """Float32 copy of a quantized matrix kept on disk for rescoring.
+
+    Rows from the snapshot stay memory-mapped; rows added since the last
+    ``persist`` are held in RAM until they are written out.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mapped = None
+        self.pending = []
+        if os.path.exists(path):
+            self.mapped = np.load(path, mmap_mode="r")
+
+    def __len__(self):
+        mapped = 0 if self.mapped is None else len(self.mapped)
+        return mapped + sum(len(rows) for rows in self.pending)
+
+    def append(self, rows):
+        self.pending.append(np.asarray(rows, dtype=np.float32))
+
+    def rows(self, index):
+        parts = ([] if self.mapped is None else [self.mapped]) + self.pending
+        if len(parts) == 1:
+            return np.asarray(parts[0][index], dtype=np.float32)
+        index = np.asarray(index)
+        out = np.empty((len(index), parts[0].shape[1]), dtype=np.float32)
+        offset = 0
+        for part in parts:
+            mask = (index >= offset) & (index < offset + len(part))
+            out[mask] = part[index[mask] - offset]
+            offset += len(part)
+        return out
+
+    def take(self, index):
+        """Keep only the rows at ``index``; written out on the next ``persist``."""
+        self.pending = [self.rows(index)]
+        self.mapped = None
+
+    def persist(self):
+        if not self.pending:
+            return
+        parts = ([] if self.mapped is None else [self.mapped]) + self.pending
+        np.save(self.path + ".tmp.npy", np.concatenate(parts))
+        os.replace(self.path + ".tmp.npy", self.path)
+        self.mapped = np.load(self.path, mmap_mode="r")
+        self.pending = []
+
+
+class NumpyVectorStore:
+    """Exact cosine-similarity search over a contiguous vector matrix.
+
+    Vectors are L2-normalised on insert so a query is a single matrix-vector
+    product followed by ``argpartition`` for the top-k. Each entry may also
+    carry several chunk vectors, stored contiguously in a second matrix, for
+    max-sim scoring. When ``persist_dir`` is set, the matrices are written with
+    ``np.save`` after every insert and loaded back memory-mapped, so start-up
+    does not read the vectors into RAM until the store is written to.
+
+    With ``quantization`` set to ``"float16"`` or ``"int8"`` (per-vector
+    scale) the matrices are held as quantized codes. Queries then take the
+    top ``n_results * rescore_factor`` candidates by approximate score and
+    rescore them against float32 rows kept memory-mapped next to the snapshot.
+    Rescoring needs ``persist_dir``; ``rescore_factor=0`` disables it and drops
+    the float32 copy from the snapshot.
+
+    Queries can be restricted by ticker, sector and trade date. Entries are
+    partitioned by ticker and sector, so a filtered query only scores the
+    rows of its partition.
+    """
+
+    def __init__(self, name, persist_dir=None, quantization=None, rescore_factor=4):
+        self.name = name
+        self.persist_dir = persist_dir
+        self.quantization = normalize_quantization(quantization)
+        self.rescore_factor = rescore_factor
+        self._vectors = VectorMatrix(self.quantization)
+        self._chunks = VectorMatrix(self.quantization)
+        self._chunk_owner = None
+        self._full_vectors = None
+        self._full_chunks = None
+        self._stored_quantization = self.quantization
+        self._index = None
+        self._partitions = None
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+            self._load()
+            if self._rescoring:
+                self._open_full_precision()
+
+    def _path(self, suffix):
+        return os.path.join(self.persist_dir, f"{self.name}{suffix}")
+
+    @property
+    def _rescoring(self):
+        return (
+            self.quantization != "float32"
+            and self.rescore_factor > 0
+            and self.persist_dir is not None
+        )
+
+    @property
+    def nbytes(self):
+        """Resident bytes of the vector and chunk codes."""
+        return self._vectors.nbytes + self._chunks.nbytes
+
+    @property
+    def chunk_owner(self):
+        """The entry owning each populated chunk row."""
+        if self._chunk_owner is None:
+            return np.empty(0, dtype=np.int64)
+        return self._chunk_owner[: len(self._chunks)]
+
+    def count(self):
+        return len(self._vectors)
+
+    def add(self, ids, embeddings, documents, metadatas, chunk_embeddings=None):
+        embeddings = _normalize_rows(embeddings)
+        if embeddings.ndim != 2 or len(embeddings) == 0:
+            return
+
+        # Entries without chunks are represented by their pooled vector so
+        # that every entry owns at least one contiguous chunk row.
+        if chunk_embeddings is None:
+            chunk_embeddings = [vector[None, :] for vector in embeddings]
+        chunk_embeddings = [_normalize_rows(c) for c in chunk_embeddings]
+        chunk_rows = np.concatenate(chunk_embeddings)
+        owners = np.repeat(
+            np.arange(self.count(), self.count() + len(embeddings)),
+            [len(c) for c in chunk_embeddings],
+        )
+
+        n_chunks = len(self._chunks)
+        self._chunk_owner = grow(
+            self._chunk_owner, n_chunks, n_chunks + len(owners), (), np.int64
+        )
+        self._chunk_owner[n_chunks : n_chunks + len(owners)] = owners
+        self._vectors.append(embeddings)
+        self._chunks.append(chunk_rows)
+        if self._rescoring:
+            self._full_vectors.append(embeddings)
+            self._full_chunks.append(chunk_rows)
+
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self._invalidate()
+
+        if self.persist_dir:
+            self.persist()
+
+    def _invalidate(self):
+        self._index = None
+        self._partitions = None
+
+    def _row(self, entry_id):
+        if self._index is None:
+            self._index = {entry_id: row for row, entry_id in enumerate(self.ids)}
+        return self._index[entry_id]
+
+    def delete(self, ids):
+        drop = set(ids)
+        keep = np.array(
+            [row for row, entry_id in enumerate(self.ids) if entry_id not in drop],
+            dtype=np.int64,
+        )
+        if len(keep) == self.count():
+            return
+
+        chunk_keep = np.flatnonzero(np.isin(self.chunk_owner, keep))
+        remap = np.full(self.count(), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        self._chunk_owner = remap[self.chunk_owner[chunk_keep]]
+        self._vectors = self._vectors.take(keep)
+        self._chunks = self._chunks.take(chunk_keep)
+        if self._rescoring:
+            self._full_vectors.take(keep)
+            self._full_chunks.take(chunk_keep)
+
+        self.ids = [self.ids[row] for row in keep]
+        self.documents = [self.documents[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        self._invalidate()
+
+        if self.persist_dir:
+            self.persist()
+
+    def update_metadatas(self, ids, metadatas):
+        # Kept in memory; written out with the next insert or deletion
+        for entry_id, metadata in zip(ids, metadatas):
+            self.metadatas[self._row(entry_id)] = metadata
+        self._partitions = None
+
+    def get_metadatas(self):
+        """Return (ids, metadatas) for every entry."""
+        return list(self.ids), list(self.metadatas)
+
+    def get_embeddings(self, ids):
+        """Return pooled float32 vectors for ``ids``, in the given order."""
+        rows = np.array([self._row(entry_id) for entry_id in ids], dtype=np.int64)
+        if self._rescoring:
+            return self._full_vectors.rows(rows)
+        return self._vectors.rows(rows)
+
+    def _partition_index(self):
+        """Row arrays per ticker and per sector, plus each row's trade and exit date keys."""
+        if self._partitions is None:
+            groups = {"ticker": {}, "sector": {}}
+            for row, metadata in enumerate(self.metadatas):
+                for field, group in groups.items():
+                    group.setdefault(metadata.get(field), []).append(row)
+            self._partitions = {
+                field: {
+                    value: np.array(rows, dtype=np.int64)
+                    for value, rows in group.items()
+                }
+                for field, group in groups.items()
+            }
+            for key in ("trade_date_key", "exit_date_key"):
+                self._partitions[key] = np.array(
+                    [metadata.get(key, 0) for metadata in self.metadatas],
+                    dtype=np.int64,
+                )
+        return self._partitions
+
+    def _candidates(self, ticker=None, sector=None, as_of=None):
+        """Rows matching the filters, or None when no filter is set."""
+        if ticker is None and sector is None and as_of is None:
+            return None
+
+        partitions = self._partition_index()
+        empty = np.empty(0, dtype=np.int64)
+        candidates = None
+        if ticker is not None:
+            candidates = partitions["ticker"].get(ticker, empty)
+        if sector is not None:
+            rows = partitions["sector"].get(sector, empty)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows)
+        if candidates is None:
+            candidates = np.arange(self.count())
+        if as_of is not None:
+            dates = partitions["trade_date_key"][candidates]
+            exits = partitions["exit_date_key"][candidates]
+            # Realized by the date, or from an earlier trade date when no exit was recorded
+            visible = np.where(exits > 0, exits <= as_of, dates < as_of)
+            candidates = candidates[(dates > 0) & visible]
+        return candidates
+
+    def _chunk_starts(self):
+        return np.searchsorted(self.chunk_owner, np.arange(self.count()))
+
+    def _chunk_rows(self, entries):
+        """Chunk row indices of ``entries`` and where each entry's run starts."""
+        starts = self._chunk_starts()
+        ends = np.append(starts[1:], len(self._chunks))
+        lengths = ends[entries] - starts[entries]
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        rows = np.repeat(starts[entries] - offsets, lengths) + np.arange(lengths.sum())
+        return rows, offsets
+
+    def _scores(self, query, query_chunks, candidates):
+        """Approximate scores for every entry, or for ``candidates`` only."""
+        if query_chunks is None:
+            if candidates is None:
+                return self._vectors.scores(query[None, :])[0]
+            return self._vectors.rows(candidates) @ query
+
+        # Late interaction: mean over query chunks of the best matching stored chunk
+        if candidates is None:
+            similarities = self._chunks.scores(query_chunks)
+            starts = self._chunk_starts()
+        else:
+            rows, starts = self._chunk_rows(candidates)
+            similarities = query_chunks @ self._chunks.rows(rows).T
+        return np.maximum.reduceat(similarities, starts, axis=1).mean(axis=0)
+
+    def _rescore(self, candidates, query, query_chunks):
+        """Exact float32 scores for candidate entries."""
+        if query_chunks is None:
+            return self._full_vectors.rows(candidates) @ query
+
+        rows, starts = self._chunk_rows(candidates)
+        similarities = query_chunks @ self._full_chunks.rows(rows).T
+        return np.maximum.reduceat(similarities, starts, axis=1).mean(axis=0)
+
+    @staticmethod
+    def _top(scores, k):
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def query(
+        self,
+        embedding,
+        n_results,
+        chunk_embeddings=None,
+        ticker=None,
+        sector=None,
+        as_of=None,
+    ):
+        if self.count() == 0:
+            return []
+
+        candidates = self._candidates(ticker, sector, as_of)
+        if candidates is not None and len(candidates) == 0:
+            return []
+
+        query = _normalize_rows(embedding)
+        query_chunks = None
+        if chunk_embeddings is not None:
+            query_chunks = _normalize_rows(chunk_embeddings)
+        scores = self._scores(query, query_chunks, candidates)
+
+        k = min(n_results, len(scores))
+        if self._rescoring:
+            shortlist = self._top(scores, min(len(scores), k * self.rescore_factor))
+            if candidates is not None:
+                shortlist = candidates[shortlist]
+            exact = self._rescore(shortlist, query, query_chunks)
+            order = np.argsort(-exact, kind="stable")[:k]
+            top, top_scores = shortlist[order], exact[order]
+        else:
+            top = self._top(scores, k)
+            top_scores = scores[top]
+            if candidates is not None:
+                top = candidates[top]
+
+        return [
+            {
+                "id": self.ids[i],
+                "document": self.documents[i],
+                "metadata": self.metadatas[i],
+                "score": float(score),
+            }
+            for i, score in zip(top, top_scores)
+        ]
+
+    def persist(self):
+        """Write the store to ``persist_dir`` atomically."""
+        self._vectors.save(self._path(".tmp"))
+        self._chunks.save(self._path(".chunks.tmp"))
+        np.save(self._path(".chunk_owner.tmp.npy"), np.ascontiguousarray(self.chunk_owner))
+        if self._rescoring:
+            self._full_vectors.persist()
+            self._full_chunks.persist()
+
+        with open(self._path(".json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "quantization": self.quantization,
+                    "ids": self.ids,
+                    "documents": self.documents,
+                    "metadatas": self.metadatas,
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+        for prefix in ("", ".chunks"):
+            os.replace(self._path(f"{prefix}.tmp.npy"), self._path(f"{prefix}.npy"))
+            if os.path.exists(self._path(f"{prefix}.tmp.scales.npy")):
+                os.replace(
+                    self._path(f"{prefix}.tmp.scales.npy"),
+                    self._path(f"{prefix}.scales.npy"),
+                )
+            elif os.path.exists(self._path(f"{prefix}.scales.npy")):
+                os.remove(self._path(f"{prefix}.scales.npy"))
+        os.replace(self._path(".chunk_owner.tmp.npy"), self._path(".chunk_owner.npy"))
+        os.replace(self._path(".json.tmp"), self._path(".json"))
+
+    def _load(self):
+        if not (os.path.exists(self._path(".npy")) and os.path.exists(self._path(".json"))):
+            return
+
+        with open(self._path(".json"), "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        vectors = VectorMatrix.load(self._path(""), self.quantization)
+        if len(vectors) != len(records["ids"]):
+            raise ValueError(f"Corrupted memory snapshot for {self.name}")
+
+        self.ids = records["ids"]
+        self.documents = records["documents"]
+        self.metadatas = records["metadatas"]
+        self._vectors = vectors
+        if not len(vectors):
+            return
+
+        if os.path.exists(self._path(".chunks.npy")):
+            self._chunks = VectorMatrix.load(self._path(".chunks"), self.quantization)
+            self._chunk_owner = np.load(self._path(".chunk_owner.npy"), mmap_mode="r")
+        else:
+            self._chunks = VectorMatrix(self.quantization)
+            self._chunks.append(vectors.rows(slice(None)))
+            self._chunk_owner = np.arange(len(vectors), dtype=np.int64)
+
+        self._stored_quantization = records.get("quantization", "float32")
+
+    def _open_full_precision(self):
+        """Open (or seed) the float32 copies used for rescoring."""
+        for suffix, matrix in ((".full.npy", self._vectors), (".chunks.full.npy", self._chunks)):
+            path = self._path(suffix)
+            if os.path.exists(path) and len(np.load(path, mmap_mode="r")) == len(matrix):
+                continue
+            if not len(matrix):
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            source = path.replace(".full.npy", ".npy")
+            if self._stored_quantization == "float32" and os.path.exists(source):
+                # The previous snapshot is unquantized: copy it verbatim
+                shutil.copyfile(source, path)
+            else:
+                print(
+                    f"Memory {self.name}: no float32 copy found, "
+                    f"rescoring uses {self._stored_quantization} vectors"
+                )
+                np.save(path, matrix.rows(slice(None)))
+
+        self._full_vectors = _FullPrecisionRows(self._path(".full.npy"))
+        self._full_chunks = _FullPrecisionRows(self._path(".chunks.full.npy"))
+
+
+def create_vector_store(name, config):
+    """Create the vector store selected by ``config["memory_backend"]``."""
+    backend = config.get("memory_backend", "chromadb").lower()
+
+    if backend == "chromadb":
+        return ChromaVectorStore(name)
+    if backend == "numpy":
+        return NumpyVectorStore(
+            name,
+            persist_dir=config.get("memory_dir"),
+            quantization=config.get("memory_quantization"),
+            rescore_factor=config.get("memory_rescore_factor", 4),
+        )
+
+    raise ValueError(f"Unsupported memory backend: {backend}")
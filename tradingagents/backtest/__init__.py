@@ -0,0 +1,13 @@
+# TradingAgents/backtest/__init__.py
+
+from .engine import BacktestEngine, normalize_decision, summarize
+from .triggers import TRIGGER_RULES, TriggerStage, trigger_report
+
+__all__ = [
+    "BacktestEngine",
+    "normalize_decision",
+    "summarize",
+    "TRIGGER_RULES",
+    "TriggerStage",
+    "trigger_report",
+]
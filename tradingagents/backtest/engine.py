@@ -0,0 +1,325 @@
+# TradingAgents/backtest/engine.py
+
+import concurrent.futures
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.price_store import load_price_history
+from tradingagents.graph.conditional_logic import extract_stance
+
+from .triggers import TriggerStage, trigger_report
+
+
+RESULT_COLUMNS = [
+    "ticker",
+    "trade_date",
+    "decision",
+    "exit_date",
+    "entry_price",
+    "exit_price",
+    "return",
+    "position_return",
+    "triggered",
+    "reflected",
+    "error",
+]
+
+POSITIONS = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+_DECISION_PATTERN = re.compile(r"\b(?:BUY|SELL|HOLD)\b|买入|卖出|持有", re.IGNORECASE)
+_DECISION_LABELS = {"买入": "BUY", "卖出": "SELL", "持有": "HOLD"}
+
+
+def normalize_decision(signal: str) -> str:
+    """Map a processed signal to BUY, SELL or HOLD (HOLD when unreadable)."""
+    stance = extract_stance(signal)
+    if stance is None:
+        match = _DECISION_PATTERN.search(signal or "")
+        if match:
+            stance = _DECISION_LABELS.get(match.group(0), match.group(0).upper())
+    return stance or "HOLD"
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Per-ticker summary of a results table: sessions, trades, hit rate and mean returns.
+
+    Returns of consecutive runs overlap when the holding period exceeds one
+    session, so they are averaged rather than compounded.
+    """
+    done = results[results["error"].fillna("") == ""].dropna(subset=["return"])
+    rows = []
+    for ticker, group in done.groupby("ticker"):
+        active = group[group["decision"] != "HOLD"]
+        rows.append(
+            {
+                "ticker": ticker,
+                "sessions": len(group),
+                "graph_runs": int(group["triggered"].astype(bool).sum()),
+                "trades": len(active),
+                "hit_rate": float((active["position_return"] > 0).mean())
+                if len(active)
+                else np.nan,
+                "mean_position_return": group["position_return"].mean(),
+                "mean_return": group["return"].mean(),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+class BacktestEngine:
+    """Walk-forward backtest over tickers and dates on top of ``propagate``.
+
+    For every (ticker, trade date) the graph is run, the decision is scored
+    against the realized return over the next ``holding_period`` sessions of
+    the local price store, and the outcome is fed to ``reflect_and_remember``
+    with its exit date. Point-in-time retrieval (``memory_point_in_time``)
+    only shows a lesson to runs on or after that date, for every ticker
+    sharing the memories, so no run learns from a return that was not yet
+    realized.
+
+    Tickers run concurrently (``max_workers``, default
+    ``config["max_concurrent_runs"]``); the dates of one ticker run in order
+    because each may learn from the previous ones. With ``freeze_memory`` the
+    memories stay at their loaded snapshot and are not written to, so every
+    (ticker, date) is independent and dates run concurrently as well.
+
+    With a ``TriggerStage`` (``triggers``, default built from
+    ``config["backtest_triggers"]``) the graph only runs on flagged sessions;
+    the others carry the previous decision forward and are scored with it.
+    Carried rows are recomputed on every run, so they follow retried runs.
+
+    Each finished row is appended to ``results_path``; running the same
+    backtest again skips the rows already there, and with
+    ``config["checkpoint_dir"]`` interrupted graph runs resume from their
+    last completed node.
+    """
+
+    def __init__(
+        self,
+        graph,
+        results_path: str,
+        holding_period: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        freeze_memory: Optional[bool] = None,
+        triggers: Optional[TriggerStage] = None,
+    ):
+        config = graph.config
+        self.graph = graph
+        self.results_path = results_path
+        self.holding_period = holding_period or config.get("backtest_holding_period", 1)
+        self.max_workers = max_workers or config.get("max_concurrent_runs", 4)
+        if freeze_memory is None:
+            freeze_memory = config.get("backtest_freeze_memory", False)
+        self.freeze_memory = freeze_memory
+        if triggers is None:
+            triggers = TriggerStage.from_config(config.get("backtest_triggers"))
+        self.triggers = triggers
+        self.trigger_flags: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def trading_dates(self, ticker: str, start_date: str, end_date: str) -> List[str]:
+        """Sessions of the ticker's price history between the two dates, inclusive."""
+        prices = load_price_history(ticker)
+        sessions = prices.index[
+            (prices.index >= pd.Timestamp(start_date))
+            & (prices.index <= pd.Timestamp(end_date))
+        ]
+        return [session.strftime("%Y-%m-%d") for session in sessions]
+
+    def realized_return(self, ticker: str, trade_date: str) -> Dict:
+        """Close-to-close return from the trade date over the holding period.
+
+        The exit fields are NaN when the price store does not reach the exit yet.
+        """
+        close = load_price_history(ticker)["Close"]
+        entry = close.index.searchsorted(pd.Timestamp(trade_date))
+        exit_index = entry + self.holding_period
+        if exit_index >= len(close):
+            return {"exit_date": "", "entry_price": np.nan, "exit_price": np.nan, "return": np.nan}
+        return {
+            "exit_date": close.index[exit_index].strftime("%Y-%m-%d"),
+            "entry_price": close.iloc[entry],
+            "exit_price": close.iloc[exit_index],
+            "return": close.iloc[exit_index] / close.iloc[entry] - 1,
+        }
+
+    def completed(self) -> set:
+        """(ticker, trade_date) pairs already in the results table without error."""
+        if not os.path.exists(self.results_path):
+            return set()
+        results = pd.read_csv(self.results_path, dtype={"trade_date": str})
+        ok = results[results["error"].fillna("") == ""]
+        return set(zip(ok["ticker"], ok["trade_date"]))
+
+    def _write(self, row: Dict):
+        with self._lock:
+            directory = os.path.dirname(self.results_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            header = not os.path.exists(self.results_path)
+            pd.DataFrame([row], columns=RESULT_COLUMNS).to_csv(
+                self.results_path, mode="a", header=header, index=False
+            )
+
+    def _propagate(self, ticker: str, trade_date: str):
+        if self.graph.checkpointer is not None:
+            try:
+                return self.graph.resume(ticker, trade_date)
+            except ValueError:
+                pass  # no checkpoint for this run yet
+        return self.graph.propagate(ticker, trade_date)
+
+    def _run_date(self, ticker: str, trade_date: str):
+        """Run and score one date, returning (row, final_state, signal)."""
+        row = {
+            "ticker": ticker,
+            "trade_date": trade_date,
+            "triggered": True,
+            "reflected": False,
+            "error": "",
+        }
+        try:
+            final_state, signal = self._propagate(ticker, trade_date)
+        except Exception as e:
+            print(f"Backtest run failed for {ticker} on {trade_date}: {e}")
+            row.update(decision="", error=str(e) or type(e).__name__)
+            return row, None, None
+
+        self._score(row, normalize_decision(signal))
+        return row, final_state, signal
+
+    def _score(self, row: Dict, decision: str):
+        row["decision"] = decision
+        row.update(self.realized_return(row["ticker"], row["trade_date"]))
+        row["position_return"] = POSITIONS[decision] * row["return"]
+
+    def _carry_forward(self, ticker: str, dates: List[str], triggered: set):
+        """Score the sessions skipped by the triggers with the last graph decision before them.
+
+        Recomputed on every ``run``, so when a failed triggered run succeeds on
+        a rerun, the sessions after it are rewritten with its decision.
+        Triggered sessions without a successful run keep the last decision
+        and are left for the next run to retry.
+        """
+        results = self.results()
+        results = results[results["ticker"] == ticker].set_index("trade_date")
+        decision = "HOLD"
+        for trade_date in dates:
+            existing = results.loc[trade_date] if trade_date in results.index else None
+            if trade_date in triggered or (existing is not None and bool(existing["triggered"])):
+                if existing is not None and isinstance(existing["decision"], str) and existing["decision"]:
+                    decision = existing["decision"]
+                continue
+            row = {
+                "ticker": ticker,
+                "trade_date": trade_date,
+                "triggered": False,
+                "reflected": False,
+                "error": "",
+            }
+            self._score(row, decision)
+            if (
+                existing is not None
+                and existing["decision"] == decision
+                and not (pd.isna(existing["return"]) and not np.isnan(row["return"]))
+            ):
+                continue  # unchanged
+            self._write(row)
+
+    def _reflect(self, row: Dict, final_state, signal):
+        """Feed a realized outcome to the agents' memories, then record the row."""
+        if not np.isnan(row["return"]):
+            try:
+                self.graph.reflect_and_remember(
+                    f"{row['return']:+.2%} price change from {row['trade_date']} to "
+                    f"{row['exit_date']} ({self.holding_period} trading days); "
+                    f"the {row['decision']} decision returned {row['position_return']:+.2%}",
+                    final_state=final_state,
+                    signal=signal,
+                    exit_date=row["exit_date"],
+                )
+                row["reflected"] = True
+            except Exception as e:
+                print(f"Reflection failed for {row['ticker']} on {row['trade_date']}: {e}")
+        self._write(row)
+
+    def _walk_forward(self, ticker: str, dates: List[str], completed: set):
+        """Run one ticker's dates in order, reflecting once each exit date is reached."""
+        pending = []
+        for trade_date in dates:
+            # Outcomes realized by now may inform this run
+            while pending and pending[0][0]["exit_date"] <= trade_date:
+                self._reflect(*pending.pop(0))
+            if (ticker, trade_date) in completed:
+                continue
+
+            row, final_state, signal = self._run_date(ticker, trade_date)
+            if final_state is None or np.isnan(row["return"]):
+                self._write(row)
+            else:
+                pending.append((row, final_state, signal))
+
+        for item in pending:
+            self._reflect(*item)
+
+    def _run_frozen(self, ticker: str, trade_date: str):
+        row, _, _ = self._run_date(ticker, trade_date)
+        self._write(row)
+
+    def run(self, tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """Backtest the tickers over the date range and return the results table."""
+        completed = self.completed()
+        sessions = {}
+        for ticker in dict.fromkeys(t.upper() for t in tickers):
+            try:
+                sessions[ticker] = self.trading_dates(ticker, start_date, end_date)
+            except FileNotFoundError as e:
+                print(f"Skipping {ticker}: {e}")
+
+        schedule = sessions
+        if self.triggers is not None:
+            schedule = {}
+            for ticker, dates in sessions.items():
+                flags = self.triggers.evaluate(ticker, dates)
+                self.trigger_flags[ticker] = flags
+                schedule[ticker] = list(flags.index[flags["triggered"]])
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="backtest"
+        ) as executor:
+            if self.freeze_memory:
+                futures = [
+                    executor.submit(self._run_frozen, ticker, trade_date)
+                    for ticker, dates in schedule.items()
+                    for trade_date in dates
+                    if (ticker, trade_date) not in completed
+                ]
+            else:
+                futures = [
+                    executor.submit(self._walk_forward, ticker, dates, completed)
+                    for ticker, dates in schedule.items()
+                ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+        if self.triggers is not None:
+            for ticker, dates in sessions.items():
+                self._carry_forward(ticker, dates, set(schedule[ticker]))
+        return self.results()
+
+    def trigger_report(self) -> pd.DataFrame:
+        """Graph runs saved by the triggers in the last ``run``, per ticker."""
+        return trigger_report(self.trigger_flags)
+
+    def results(self) -> pd.DataFrame:
+        """The results table, one row per (ticker, trade date), latest attempt kept."""
+        if not os.path.exists(self.results_path):
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        results = pd.read_csv(self.results_path, dtype={"trade_date": str})
+        results = results.drop_duplicates(["ticker", "trade_date"], keep="last")
+        return results.sort_values(["ticker", "trade_date"]).reset_index(drop=True)
@@ -0,0 +1,118 @@
+# TradingAgents/backtest/lookahead.py
+
+import os
+import re
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.dataflows.config import get_config, set_config
+from tradingagents.default_config import DEFAULT_CONFIG
+
+from .engine import BacktestEngine
+
+
+_EXIT_PATTERN = re.compile(r" to (\d{4}-\d{2}-\d{2}) ")
+
+
+class _RecordingGraph:
+    """Stands in for ``TradingAgentsGraph``: every run records the lessons it can retrieve."""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.checkpointer = None
+        self.memory = FinancialSituationMemory("lookahead_check", config)
+        self.retrieved: List[Dict] = []
+
+    def propagate(self, ticker, trade_date):
+        state = {"company_of_interest": ticker, "trade_date": trade_date}
+        matches = self.memory.get_memories(
+            f"{ticker} market situation on {trade_date}",
+            n_matches=1000,
+            **self.memory.retrieval_filters(state),
+        )
+        for match in matches:
+            exit_date = _EXIT_PATTERN.search(match["recommendation"]).group(1)
+            self.retrieved.append(
+                {"ticker": ticker, "trade_date": trade_date, "exit_date": exit_date}
+            )
+        return state, "BUY"
+
+    def reflect_and_remember(self, returns_losses, final_state=None, signal=None, exit_date=""):
+        self.memory.add_situations(
+            [(f"{final_state['company_of_interest']} market situation on {final_state['trade_date']}", returns_losses)],
+            {
+                "ticker": final_state["company_of_interest"],
+                "trade_date": final_state["trade_date"],
+                "exit_date": exit_date,
+            },
+        )
+
+
+def lookahead_check(tickers=("AAA", "BBB"), holding_period=3, sessions=30, max_workers=1):
+    """Backtest tickers sharing one memory and check no run sees an unrealized outcome.
+
+    With ``max_workers`` below the number of tickers they run one after the
+    other, so the first ticker reflects on all its dates before the second
+    starts: the case where a filter on trade dates alone leaks returns.
+    Returns the number of lessons retrieved and raises AssertionError when
+    a run retrieved one whose exit date is after its trade date.
+    """
+    previous = get_config()
+    data_dir = tempfile.mkdtemp()
+    price_dir = os.path.join(data_dir, "market_data", "price_data")
+    os.makedirs(price_dir)
+    dates = pd.bdate_range("2024-01-02", periods=sessions)
+    rng = np.random.default_rng(0)
+    for ticker in tickers:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, sessions))
+        pd.DataFrame(
+            {
+                "Date": dates.strftime("%Y-%m-%d"),
+                "Open": close,
+                "High": close * 1.01,
+                "Low": close * 0.99,
+                "Close": close,
+                "Volume": 1e6,
+            }
+        ).to_csv(
+            os.path.join(price_dir, f"{ticker}-YFin-data-2015-01-01-2025-03-25.csv"),
+            index=False,
+        )
+
+    config = dict(
+        DEFAULT_CONFIG,
+        data_dir=data_dir,
+        online_tools=False,
+        embedding_backend="local",
+        memory_backend="numpy",
+        memory_dedup_threshold=None,
+        memory_retrieval_scope="all",
+        memory_point_in_time=True,
+    )
+    set_config(config)
+    try:
+        graph = _RecordingGraph(config)
+        engine = BacktestEngine(
+            graph,
+            os.path.join(data_dir, "results.csv"),
+            holding_period=holding_period,
+            max_workers=max_workers,
+            freeze_memory=False,
+        )
+        engine.run(list(tickers), dates[0].strftime("%Y-%m-%d"), dates[-1].strftime("%Y-%m-%d"))
+    finally:
+        set_config(previous)
+
+    leaks = [r for r in graph.retrieved if r["exit_date"] > r["trade_date"]]
+    assert not leaks, f"{len(leaks)} runs retrieved unrealized outcomes, e.g. {leaks[0]}"
+    assert any(r["ticker"] != tickers[0] for r in graph.retrieved), "no lesson was shared"
+    return len(graph.retrieved)
+
+
+if __name__ == "__main__":
+    # Usage: python -m tradingagents.backtest.lookahead
+    print(f"{lookahead_check()} lessons retrieved, none before its exit date")
@@ -0,0 +1,252 @@
+# TradingAgents/backtest/triggers.py
+
+import functools
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.config import get_config
+from tradingagents.dataflows.price_store import load_price_history
+from tradingagents.dataflows.reddit_utils import company_post_counts, ticker_to_company
+
+
+DEFAULT_TRIGGER_RULES = {
+    "volatility_spike": {"window": 20, "threshold": 2.5},  # |return| above k trailing stds
+    "sma_cross": {"fast": 50, "slow": 200},  # golden / death cross
+    "macd_cross": {"fast": 12, "slow": 26, "signal": 9},  # MACD crosses its signal line
+    "rsi_extreme": {"window": 14, "upper": 70, "lower": 30},  # RSI enters a zone
+    "news_burst": {"window": 20, "threshold": 3.0, "min_count": 3},  # news count spike
+    "earnings": {"sessions_after": 1},  # statement publish date and the sessions after
+}
+DEFAULT_MAX_STALE_SESSIONS = 20  # force a run after this many quiet sessions
+
+
+def _crossed(a: pd.Series, b: pd.Series) -> pd.Series:
+    """Sessions where ``a`` crosses ``b`` in either direction."""
+    above = a > b
+    valid = a.notna() & b.notna()
+    return (above != above.shift(1)) & valid & valid.shift(1, fill_value=False)
+
+
+def volatility_spike(ticker, prices, window=20, threshold=2.5):
+    """Daily move larger than ``threshold`` standard deviations of the trailing window."""
+    returns = prices["Close"].pct_change()
+    sigma = returns.rolling(window).std().shift(1)
+    return returns.abs() > threshold * sigma
+
+
+def sma_cross(ticker, prices, fast=50, slow=200):
+    """Fast simple moving average crosses the slow one."""
+    close = prices["Close"]
+    return _crossed(
+        close.rolling(fast, min_periods=fast).mean(),
+        close.rolling(slow, min_periods=slow).mean(),
+    )
+
+
+def macd_cross(ticker, prices, fast=12, slow=26, signal=9):
+    """MACD line crosses its signal line."""
+    close = prices["Close"]
+    macd = close.ewm(span=fast).mean() - close.ewm(span=slow).mean()
+    flags = _crossed(macd, macd.ewm(span=signal).mean())
+    flags.iloc[:slow] = False  # the EMAs have not converged yet
+    return flags
+
+
+def rsi_extreme(ticker, prices, window=14, upper=70, lower=30):
+    """RSI enters the overbought or the oversold zone."""
+    delta = prices["Close"].diff()
+    up = delta.clip(lower=0).ewm(alpha=1 / window).mean()
+    down = (-delta).clip(lower=0).ewm(alpha=1 / window).mean()
+    rsi = 100 * up / (up + down)
+    overbought, oversold = rsi > upper, rsi < lower
+    flags = (overbought & ~overbought.shift(1, fill_value=False)) | (
+        oversold & ~oversold.shift(1, fill_value=False)
+    )
+    flags.iloc[:window] = False
+    return flags
+
+
+@functools.lru_cache(maxsize=512)
+def _news_counts(ticker: str, data_dir: str) -> pd.Series:
+    """Finnhub and Reddit news items about the ticker per calendar date."""
+    counts = {}
+    finnhub_path = os.path.join(
+        data_dir, "finnhub_data", "news_data", f"{ticker}_data_formatted.json"
+    )
+    if os.path.exists(finnhub_path):
+        with open(finnhub_path, "r") as f:
+            for day, entries in json.load(f).items():
+                counts[day] = counts.get(day, 0) + len(entries)
+
+    reddit_path = os.path.join(data_dir, "reddit_data")
+    if ticker in ticker_to_company and os.path.isdir(
+        os.path.join(reddit_path, "company_news")
+    ):
+        for day, count in company_post_counts(ticker, reddit_path).items():
+            counts[day] = counts.get(day, 0) + count
+
+    series = pd.Series(counts, dtype="float64")
+    series.index = pd.to_datetime(series.index)
+    return series.sort_index()
+
+
+def _per_session(values: pd.Series, sessions: pd.DatetimeIndex) -> np.ndarray:
+    """Sum dated values into the first session on or after their date."""
+    position = sessions.searchsorted(values.index)
+    inside = position < len(sessions)
+    return np.bincount(
+        position[inside], weights=values.values[inside], minlength=len(sessions)
+    )
+
+
+def news_burst(ticker, prices, window=20, threshold=3.0, min_count=3):
+    """News count well above its trailing average (weekend news counts on Monday)."""
+    counts = _news_counts(ticker, get_config()["data_dir"])
+    if counts.empty:
+        return pd.Series(False, index=prices.index)
+    per_session = pd.Series(_per_session(counts, prices.index), index=prices.index)
+    mean = per_session.rolling(window, min_periods=1).mean().shift(1)
+    std = per_session.rolling(window, min_periods=2).std().shift(1).fillna(0)
+    return (per_session >= min_count) & (per_session > mean + threshold * std)
+
+
+@functools.lru_cache(maxsize=4)
+def _publish_dates(data_dir: str) -> pd.DataFrame:
+    path = os.path.join(
+        data_dir,
+        "fundamental_data",
+        "simfin_data_all",
+        "income_statements",
+        "companies",
+        "us",
+        "us-income-quarterly.csv",
+    )
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["Ticker", "Publish Date"])
+    df = pd.read_csv(path, sep=";", usecols=["Ticker", "Publish Date"])
+    df["Publish Date"] = (
+        pd.to_datetime(df["Publish Date"], utc=True).dt.tz_localize(None).dt.normalize()
+    )
+    return df
+
+
+def earnings(ticker, prices, sessions_after=1):
+    """Quarterly statement publish dates (from SimFin) and the sessions right after."""
+    dates = _publish_dates(get_config()["data_dir"])
+    published = pd.Series(
+        1.0, index=pd.DatetimeIndex(dates["Publish Date"][dates["Ticker"] == ticker])
+    )
+    release = _per_session(published, prices.index) > 0
+    hits = release.copy()
+    for lag in range(1, sessions_after + 1):
+        hits[lag:] |= release[:-lag]
+    return pd.Series(hits, index=prices.index)
+
+
+TRIGGER_RULES = {
+    "volatility_spike": volatility_spike,
+    "sma_cross": sma_cross,
+    "macd_cross": macd_cross,
+    "rsi_extreme": rsi_extreme,
+    "news_burst": news_burst,
+    "earnings": earnings,
+}
+
+
+class TriggerStage:
+    """Flags the sessions worth a full graph run.
+
+    Every rule is computed in one vectorized pass over a ticker's full price
+    history (plus its news counts and statement publish dates), so trailing
+    windows are warm at the start of the range. The first session of a range
+    always runs, and so does any session after ``max_stale_sessions`` quiet
+    ones; on the other sessions the previous decision is carried forward.
+
+    ``rules`` maps rule names (see ``TRIGGER_RULES``) to parameter overrides;
+    only the rules listed are used. Custom rules can be added to
+    ``TRIGGER_RULES`` as ``rule(ticker, prices, **params) -> bool Series``.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, Dict]] = None,
+        max_stale_sessions: Optional[int] = DEFAULT_MAX_STALE_SESSIONS,
+    ):
+        if rules is None:
+            rules = DEFAULT_TRIGGER_RULES
+        unknown = set(rules) - set(TRIGGER_RULES)
+        if unknown:
+            raise ValueError(
+                f"Unknown trigger rules: {sorted(unknown)}. Choose from: {list(TRIGGER_RULES)}"
+            )
+        self.rules = {
+            name: {**DEFAULT_TRIGGER_RULES.get(name, {}), **(params or {})}
+            for name, params in rules.items()
+        }
+        self.max_stale_sessions = max_stale_sessions
+
+    @classmethod
+    def from_config(cls, value):
+        """Build from ``config["backtest_triggers"]``: None/False, True or a rule dict."""
+        if not value:
+            return None
+        if value is True:
+            return cls()
+        value = dict(value)
+        max_stale = value.pop("max_stale_sessions", DEFAULT_MAX_STALE_SESSIONS)
+        return cls(value, max_stale_sessions=max_stale)
+
+    def evaluate(self, ticker: str, dates: List[str]) -> pd.DataFrame:
+        """Per-rule flags and the final ``triggered`` column for the given sessions."""
+        prices = load_price_history(ticker)
+        flags = pd.DataFrame(
+            {
+                name: TRIGGER_RULES[name](ticker, prices, **params)
+                .reindex(prices.index)
+                .fillna(False)
+                .astype(bool)
+                for name, params in self.rules.items()
+            },
+            index=prices.index,
+        )
+        flags = flags.reindex(pd.DatetimeIndex(pd.to_datetime(dates)), fill_value=False)
+        flags.index = pd.Index(list(dates), name="trade_date")
+
+        triggered = flags.any(axis=1).to_numpy(copy=True)
+        if len(triggered):
+            triggered[0] = True
+        if self.max_stale_sessions:
+            quiet = 0
+            for i, hit in enumerate(triggered):
+                quiet = 0 if hit else quiet + 1
+                if quiet > self.max_stale_sessions:
+                    triggered[i] = True
+                    quiet = 0
+        flags["triggered"] = triggered
+        return flags
+
+
+def trigger_report(flags_by_ticker: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Sessions, graph runs and runs saved per ticker, with per-rule hit counts."""
+    rows = []
+    for ticker, flags in flags_by_ticker.items():
+        row = {
+            "ticker": ticker,
+            "sessions": len(flags),
+            "runs": int(flags["triggered"].sum()),
+        }
+        row.update({name: int(flags[name].sum()) for name in flags.columns if name != "triggered"})
+        rows.append(row)
+
+    report = pd.DataFrame(rows)
+    if report.empty:
+        return report
+    total = report.drop(columns="ticker").sum()
+    report = pd.concat([report, pd.DataFrame([{"ticker": "TOTAL", **total}])], ignore_index=True)
+    report["saved"] = report["sessions"] - report["runs"]
+    report["saved_pct"] = 100.0 * report["saved"] / report["sessions"].clip(lower=1)
+    return report
@@ -23,6 +23,7 @@ from .interface import (
     # Market data functions
     get_YFin_data_window,
     get_YFin_data,
+    get_company_sector,
 )
 
 __all__ = [
@@ -43,4 +44,5 @@ __all__ = [
     # Market data functions
     "get_YFin_data_window",
     "get_YFin_data",
+    "get_company_sector",
 ]
@@ -1,6 +1,8 @@
 import json
 import os
 
+from .ingest import finnhub_range
+
 
 def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=None):
     """
@@ -25,6 +27,10 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
             data_dir, "finnhub_data", data_type, f"{ticker}_data_formatted.json"
         )
 
+    converted = finnhub_range(data_path, start_date, end_date)
+    if converted is not None:
+        return converted
+
     data = open(data_path, "r")
     data = json.load(data)
 
@@ -0,0 +1,407 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Annotated, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .indicators import (
+    ATR_WINDOW,
+    BOLL_STD_TIMES,
+    BOLL_WINDOW,
+    MACD_WINDOWS,
+    MFI_WINDOW,
+    RSI_WINDOW,
+    SUPPORTED_INDICATORS,
+    VWMA_WINDOW,
+    compute_indicators,
+)
+
+
+STATE_FILE = "{symbol}-indicator-state.json"
+HISTORY_SESSIONS = 260  # indicator values kept per symbol to answer look-back windows
+
+_lock = threading.Lock()
+# (symbol, price file, state file) -> (price file size and mtime, state brought up to it)
+_updated: Dict[tuple, tuple] = {}
+
+
+def state_file(symbol: Annotated[str, "ticker symbol of the company"]) -> str:
+    """Path of a ticker's indicator state, next to the online price cache."""
+    config = get_config()
+    os.makedirs(config["data_cache_dir"], exist_ok=True)
+    return os.path.join(config["data_cache_dir"], STATE_FILE.format(symbol=symbol))
+
+
+class _Ema:
+    """Adjusted exponential mean, updated exactly like pandas ``ewm(adjust=True).mean()``."""
+
+    def __init__(self, alpha: float, weighted: float = math.nan, old_wt: float = 1.0):
+        self.alpha = alpha
+        self.weighted = weighted
+        self.old_wt = old_wt
+
+    # alpha is derived through the centre of mass as pandas does, for identical rounding
+    @classmethod
+    def span(cls, span: int):
+        return cls(1.0 / (1.0 + (span - 1) / 2.0))
+
+    @classmethod
+    def wilder(cls, window: int):
+        return cls(1.0 / (1.0 + (1.0 / (1.0 / window) - 1.0)))
+
+    def update(self, value: float) -> float:
+        if math.isnan(self.weighted):
+            self.weighted = value
+            return value
+        self.old_wt *= 1.0 - self.alpha
+        if self.weighted != value:
+            self.weighted = (self.old_wt * self.weighted + value) / (self.old_wt + 1.0)
+        self.old_wt += 1.0
+        return self.weighted
+
+    def to_list(self) -> List[float]:
+        return [self.weighted, self.old_wt]
+
+
+class _Window:
+    """Last ``size`` values with a running sum over the partial or full window."""
+
+    def __init__(self, size: int, values=()):
+        self.values = deque(values, maxlen=size)
+        self.total = math.fsum(self.values)
+        self.pushes = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self.pushes += 1
+        if self.pushes % self.values.maxlen == 0:
+            self.total = math.fsum(self.values)  # bound the drift of the running sum
+
+    def mean(self) -> float:
+        return self.total / len(self.values)
+
+    def std(self) -> float:
+        """Sample standard deviation, NaN below two values (as pandas)."""
+        n = len(self.values)
+        if n < 2:
+            return math.nan
+        mean = math.fsum(self.values) / n
+        return math.sqrt(math.fsum((v - mean) ** 2 for v in self.values) / (n - 1))
+
+
+class IndicatorState:
+    """Running state of the supported indicators for one ticker.
+
+    ``update`` folds one new daily bar into the state in constant time and
+    returns the indicator values on that bar; they equal a full stockstats
+    recompute over the same history up to floating-point rounding. The state
+    also keeps the last ``HISTORY_SESSIONS`` values of every indicator so
+    look-back windows can be served without touching the price history.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.last_date: Optional[str] = None
+        self.last_close = math.nan
+        self.last_tp = math.nan
+        self.bars = 0
+        short, long, signal = MACD_WINDOWS
+        self.emas = {
+            "close_10": _Ema.span(10),
+            "macd_short": _Ema.span(short),
+            "macd_long": _Ema.span(long),
+            "macd_signal": _Ema.span(signal),
+            "rsi_up": _Ema.wilder(RSI_WINDOW),
+            "rsi_down": _Ema.wilder(RSI_WINDOW),
+            "atr": _Ema.wilder(ATR_WINDOW),
+        }
+        self.windows = {
+            "close_50": _Window(50),
+            "close_200": _Window(200),
+            "boll": _Window(BOLL_WINDOW),
+            "vwma_tpv": _Window(VWMA_WINDOW),
+            "vwma_volume": _Window(VWMA_WINDOW),
+            "mfi_positive": _Window(MFI_WINDOW),
+            "mfi_negative": _Window(MFI_WINDOW),
+        }
+        self.history: Dict[str, deque] = {
+            name: deque(maxlen=HISTORY_SESSIONS) for name in ["date"] + SUPPORTED_INDICATORS
+        }
+
+    def update(self, date: str, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Add the bar of ``date`` (after ``last_date``) and return its indicator values."""
+        first = self.bars == 0
+        prev_close = close if first else self.last_close
+        tp = (close + high + low) / 3.0
+        diff = 0.0 if first else close - self.last_close
+        tp_diff = 0.0 if first else tp - self.last_tp
+
+        values = {}
+        for window in ("close_50", "close_200", "boll"):
+            self.windows[window].push(close)
+        values["close_50_sma"] = self.windows["close_50"].mean()
+        values["close_200_sma"] = self.windows["close_200"].mean()
+        values["close_10_ema"] = self.emas["close_10"].update(close)
+
+        macd = self.emas["macd_short"].update(close) - self.emas["macd_long"].update(close)
+        macds = self.emas["macd_signal"].update(macd)
+        values.update(macd=macd, macds=macds, macdh=macd - macds)
+
+        up = self.emas["rsi_up"].update(diff if diff > 0 else 0.0)
+        down = self.emas["rsi_down"].update(-diff if diff < 0 else 0.0)
+        total = up + down
+        values["rsi"] = 50.0 if first or total == 0 else 100 * (up / total)
+
+        boll = self.windows["boll"].mean()
+        width = BOLL_STD_TIMES * self.windows["boll"].std()
+        values.update(boll=boll, boll_ub=boll + width, boll_lb=boll - width)
+
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        values["atr"] = self.emas["atr"].update(0.0 if math.isnan(true_range) else true_range)
+
+        self.windows["vwma_tpv"].push(volume * tp)
+        self.windows["vwma_volume"].push(volume)
+        rolling_volume = self.windows["vwma_volume"].total
+        values["vwma"] = self.windows["vwma_tpv"].total / rolling_volume if rolling_volume != 0 else 0.0
+
+        money_flow = tp * volume
+        self.windows["mfi_positive"].push(money_flow if tp_diff > 0 else 0.0)
+        self.windows["mfi_negative"].push(money_flow if tp_diff < 0 else 0.0)
+        positive = self.windows["mfi_positive"].total
+        flow = positive + self.windows["mfi_negative"].total
+        values["mfi"] = 0.5 if self.bars < MFI_WINDOW or not flow > 0 else positive / flow
+
+        self.bars += 1
+        self.last_date, self.last_close, self.last_tp = date, close, tp
+        self.history["date"].append(date)
+        for name in SUPPORTED_INDICATORS:
+            self.history[name].append(values[name])
+        return values
+
+    def extend(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """Add the bars of an OHLCV frame (indexed by date) after ``last_date``."""
+        start = 0
+        if self.last_date:
+            start = prices.index.searchsorted(pd.Timestamp(self.last_date), side="right")
+        new = prices.iloc[start:]
+        dates = new.index.strftime("%Y-%m-%d")
+        columns = [new[name].to_numpy(dtype=np.float64) for name in ("High", "Low", "Close", "Volume")]
+        rows = [
+            self.update(date, *(float(column[i]) for column in columns))
+            for i, date in enumerate(dates)
+        ]
+        return pd.DataFrame(rows, index=pd.Index(dates, name="Date"), columns=SUPPORTED_INDICATORS)
+
+    def value(self, indicator: str, date: str):
+        """Indicator value on ``date`` from the kept history, None when not a kept session."""
+        dates = self.history["date"]
+        if not dates or not dates[0] <= date <= dates[-1]:
+            return None
+        position = int(np.searchsorted(np.asarray(dates), date))
+        if dates[position] != date:
+            return None
+        return self.history[indicator][position]
+
+    def covers(self, date: str) -> bool:
+        """Whether every session from ``date`` up to ``last_date`` is in the kept history."""
+        dates = self.history["date"]
+        return bool(dates) and (dates[0] <= date or len(dates) == self.bars)
+
+    def to_dict(self) -> Dict:
+        return {
+            "symbol": self.symbol,
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "last_tp": self.last_tp,
+            "bars": self.bars,
+            "emas": {name: ema.to_list() for name, ema in self.emas.items()},
+            "windows": {name: list(window.values) for name, window in self.windows.items()},
+            "history": {name: list(values) for name, values in self.history.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IndicatorState":
+        state = cls(data["symbol"])
+        state.last_date = data["last_date"]
+        state.last_close = data["last_close"]
+        state.last_tp = data["last_tp"]
+        state.bars = data["bars"]
+        for name, (weighted, old_wt) in data["emas"].items():
+            state.emas[name].weighted, state.emas[name].old_wt = weighted, old_wt
+        for name, values in data["windows"].items():
+            state.windows[name] = _Window(state.windows[name].values.maxlen, values)
+        for name, values in data["history"].items():
+            state.history[name].extend(values)
+        return state
+
+    def save(self, path: Optional[str] = None):
+        """Write the state as JSON (atomically) to ``path`` or its ``state_file``."""
+        path = path or state_file(self.symbol)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, symbol: str, path: Optional[str] = None) -> Optional["IndicatorState"]:
+        """The saved state of ``symbol``, or None when there is none."""
+        path = path or state_file(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable indicator state {path}: {e}")
+            return None
+
+
+def _matches(state: IndicatorState, prices: pd.DataFrame, full: bool = True) -> bool:
+    """Whether the state was built from these prices (adjusted closes get revised).
+
+    ``prices`` is the full history, or with ``full=False`` the bars from
+    ``last_date`` on, where only the close of that bar can be checked.
+    """
+    if state.last_date is None:
+        return False
+    last = pd.Timestamp(state.last_date)
+    if last not in prices.index:
+        return False
+    close = float(prices["Close"].loc[last])
+    return math.isclose(close, state.last_close, rel_tol=1e-9) and (
+        not full or prices.index.searchsorted(last, side="right") == state.bars
+    )
+
+
+def update_indicator_state(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    prices: Annotated[Optional[pd.DataFrame], "OHLCV bars indexed by date"] = None,
+    online: Annotated[Optional[bool], "price history to read when prices is None"] = None,
+) -> IndicatorState:
+    """Bring a ticker's saved indicator state up to the last bar of ``prices``.
+
+    Only the bars after the saved ``last_date`` are folded in. The state is
+    rebuilt from the full history when there is none yet or when the prices
+    up to ``last_date`` changed (e.g. split or dividend adjustments).
+
+    ``prices`` defaults to the price store's file of the ticker: then only
+    its bars from ``last_date`` on are read, and the state is kept in
+    memory until the file changes, so repeated calls cost one ``stat``.
+    """
+    symbol = symbol.upper()
+    if prices is not None:
+        with _lock:
+            state = IndicatorState.load(symbol)
+            if state is None or not _matches(state, prices):
+                state = IndicatorState(symbol)
+            if state.last_date is None or prices.index[-1] > pd.Timestamp(state.last_date):
+                state.extend(prices)
+                state.save()
+            for key in [key for key in _updated if key[0] == symbol]:
+                del _updated[key]
+        return state
+
+    from .price_store import load_price_history, load_price_range, price_file
+
+    if online is None:
+        online = get_config()["online_tools"]
+    path = price_file(symbol, online)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No price history for {symbol}: {path}")
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    key = (symbol, path, state_file(symbol))
+
+    with _lock:
+        cached = _updated.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        state = IndicatorState.load(symbol)
+        if state is not None and state.last_date is not None:
+            # No bar is dated after today; the margin covers time zones
+            end_date = (pd.Timestamp.today() + pd.Timedelta(days=7)).strftime("%Y-%m-%d")
+            prices = load_price_range(symbol, state.last_date, end_date, online)
+            if not _matches(state, prices, full=False):
+                state = None
+        if state is None:
+            state = IndicatorState(symbol)
+            prices = load_price_history(symbol, online)
+        if state.last_date is None or prices.index[-1] > pd.Timestamp(state.last_date):
+            state.extend(prices)
+            state.save()
+        _updated[key] = (signature, state)
+    return state
+
+
+def replay_bars(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    path: Annotated[str, "CSV of daily bars with Date, High, Low, Close and Volume columns"],
+) -> IndicatorState:
+    """Update a ticker's indicator state from a local bar file."""
+    bars = pd.read_csv(path)
+    bars.index = pd.DatetimeIndex(bars.pop("Date").astype(str).str[:10], name="Date")
+    return update_indicator_state(symbol, bars.sort_index())
+
+
+def equivalence(length=2000, initial=500, seed=0, tolerance=1e-9) -> Dict[str, float]:
+    """Compare streamed updates with a full recompute of the indicator engine.
+
+    The first ``initial`` bars build the state, which is then saved, reloaded
+    and updated one bar at a time. Returns the worst relative difference per
+    indicator and raises AssertionError above ``tolerance``.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, length))
+    spread = np.abs(rng.normal(0, 0.01, length)) * close
+    prices = pd.DataFrame(
+        {
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(0, 5_000_000, length).astype(np.float64),
+        },
+        index=pd.bdate_range("2010-01-04", periods=length, name="Date"),
+    )
+    prices.iloc[:30, :3] = 100.0  # flat prices exercise the division guards
+    expected = compute_indicators(prices, SUPPORTED_INDICATORS)
+
+    state = IndicatorState("TEST")
+    streamed = [state.extend(prices.iloc[:initial])]
+    for i in range(initial, length):
+        state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+        streamed.append(state.extend(prices.iloc[: i + 1]))
+    streamed = pd.concat(streamed)
+
+    worst = {}
+    for name in SUPPORTED_INDICATORS:
+        actual = streamed[name].to_numpy()
+        both_nan = np.isnan(actual) & np.isnan(expected[name])
+        error = np.abs(actual - expected[name]) / np.maximum(1.0, np.abs(expected[name]))
+        worst[name] = float(np.where(both_nan, 0.0, np.nan_to_num(error, nan=np.inf)).max())
+        assert worst[name] <= tolerance, f"{name} differs from a full recompute: {worst[name]}"
+    return worst
+
+
+if __name__ == "__main__":
+    # Usage: python -m tradingagents.dataflows.indicator_state [length]
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for name, error in equivalence(length).items():
+        print(f"{name}: max relative difference {error:.2e}")
+
+    state = IndicatorState("TEST")
+    bars = [(100.0 + i % 7, 98.0 + i % 5, 99.0 + i % 6, 1e6 + i) for i in range(10_000)]
+    start = time.perf_counter()
+    for i, bar in enumerate(bars):
+        state.update(str(i), *bar)
+    print(f"{(time.perf_counter() - start) / len(bars) * 1e6:.1f} µs per streamed bar")
@@ -0,0 +1,213 @@
+import functools
+import json
+import os
+from typing import Annotated, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .indicators import SUPPORTED_INDICATORS, compute_indicators
+from .price_store import load_price_history
+
+
+VALUES_FILE = "values.f32"
+TICKERS_FILE = "tickers.txt"
+DATES_FILE = "dates.npy"
+META_FILE = "meta.json"
+DATE_HEADROOM = 512  # sessions reserved per ticker so appended dates are written in place
+BUILD_CHUNK = 100  # tickers computed per batch of the indicator engine
+
+
+class IndicatorStore:
+    """Read-only view of a ticker × date × indicator float32 tensor on disk.
+
+    The values are memory-mapped, so slices are views of the file and every
+    process opening the store shares the same pages of the OS page cache.
+    Dates are the union of the tickers' sessions; values are NaN where a
+    ticker has no session.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r") as f:
+            meta = json.load(f)
+        self.indicators: List[str] = meta["indicators"]
+        self.online: bool = meta["online"]
+        self.date_capacity: int = meta["date_capacity"]
+        with open(os.path.join(path, TICKERS_FILE), "r") as f:
+            self.tickers = [line.strip() for line in f if line.strip()]
+        self.dates = np.load(os.path.join(path, DATES_FILE))
+        self._ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        shape = (len(self.tickers), self.date_capacity, len(self.indicators))
+        self.values = (
+            np.memmap(os.path.join(path, VALUES_FILE), dtype=np.float32, mode="r", shape=shape)
+            if self.tickers
+            else np.empty(shape, dtype=np.float32)
+        )
+
+    def covers(self, ticker: str, date) -> bool:
+        """Whether the store has the ticker and reaches ``date``."""
+        return (
+            ticker in self._ticker_index
+            and len(self.dates) > 0
+            and self.dates[-1] >= np.datetime64(str(date)[:10], "D")
+        )
+
+    def window(
+        self, ticker: str, indicator: str, start, end
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Dates and values of one indicator between two dates, inclusive, as views."""
+        lo = np.searchsorted(self.dates, np.datetime64(str(start)[:10], "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(str(end)[:10], "D"), side="right")
+        t = self._ticker_index[ticker]
+        return self.dates[lo:hi], self.values[t, lo:hi, self._indicator_index[indicator]]
+
+    def series(self, ticker: str, indicator: str) -> np.ndarray:
+        """All stored values of one indicator of one ticker, as a view."""
+        t = self._ticker_index[ticker]
+        return self.values[t, : len(self.dates), self._indicator_index[indicator]]
+
+
+def _compute(histories: Dict[str, pd.DataFrame], dates: np.ndarray, indicators: List[str]) -> np.ndarray:
+    """Indicators of the tickers on the given dates, as a ticker × date × indicator array."""
+    out = np.full((len(histories), len(dates), len(indicators)), np.nan, dtype=np.float32)
+    if not histories:
+        return out
+    # Each ticker on its own sessions, right-aligned with leading NaN padding
+    length = max(len(prices) for prices in histories.values())
+    stacked = {name: np.full((length, len(histories)), np.nan) for name in ("Close", "High", "Low", "Volume")}
+    for t, prices in enumerate(histories.values()):
+        for name, block in stacked.items():
+            block[length - len(prices) :, t] = prices[name].to_numpy(dtype=np.float64)
+    values = compute_indicators(stacked, indicators)
+
+    for t, prices in enumerate(histories.values()):
+        sessions = prices.index.values.astype("datetime64[D]")
+        rows = np.searchsorted(dates, sessions)
+        kept = (rows < len(dates)) & (dates[np.minimum(rows, len(dates) - 1)] == sessions)
+        offset = length - len(prices)
+        for i, name in enumerate(indicators):
+            out[t, rows[kept], i] = values[name][offset:, t][kept]
+    return out
+
+
+def _write_index(path: str, tickers: List[str], dates: np.ndarray, meta: Dict):
+    with open(os.path.join(path, TICKERS_FILE), "w") as f:
+        f.write("".join(f"{ticker}\n" for ticker in tickers))
+    np.save(os.path.join(path, DATES_FILE), dates)
+    # The metadata goes last: readers only see the new shape once all data is written
+    tmp_path = os.path.join(path, f"{META_FILE}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, META_FILE))
+
+
+def build_indicator_store(
+    tickers: Annotated[List[str], "ticker symbols to add or bring up to date"],
+    path: Annotated[Optional[str], "store directory (default config['indicator_store_dir'])"] = None,
+    online: Annotated[bool, "build from the online price cache instead of the offline data"] = False,
+) -> IndicatorStore:
+    """Materialize the supported indicators of a universe into a memory-mapped store.
+
+    Building again appends: tickers not in the store yet are added, and the
+    sessions after the store's last date are added for every ticker (only
+    those are written). New tickers keep their sessions on the existing
+    date axis. Only one process should build a store at a time; readers may
+    keep it open.
+    """
+    path = path or get_config()["indicator_store_dir"]
+    os.makedirs(path, exist_ok=True)
+    existing = IndicatorStore(path) if os.path.exists(os.path.join(path, META_FILE)) else None
+    if existing is not None and existing.online != online:
+        raise ValueError(f"The store in {path} was built with online={existing.online}")
+
+    old_tickers = existing.tickers if existing is not None else []
+    old_dates = existing.dates if existing is not None else np.array([], dtype="datetime64[D]")
+    indicators = existing.indicators if existing is not None else list(SUPPORTED_INDICATORS)
+    new_tickers = [t for t in dict.fromkeys(t.upper() for t in tickers) if t not in old_tickers]
+
+    histories = {}
+    for ticker in old_tickers + new_tickers:
+        try:
+            histories[ticker] = load_price_history(ticker, online)
+        except FileNotFoundError as e:
+            if ticker in new_tickers:
+                print(f"Skipping {ticker}: {e}")
+                new_tickers.remove(ticker)
+    all_tickers = old_tickers + new_tickers
+
+    sessions = [p.index.values.astype("datetime64[D]") for p in histories.values()]
+    union = np.unique(np.concatenate(sessions)) if sessions else old_dates
+    later = union[union > old_dates[-1]] if len(old_dates) else union
+    dates = np.concatenate([old_dates, later])
+
+    capacity = existing.date_capacity if existing is not None else 0
+    values_path = os.path.join(path, VALUES_FILE)
+    shape = (len(all_tickers), max(capacity, len(dates)), len(indicators))
+    if len(dates) > capacity:
+        # Reallocate with headroom; open readers keep the old file until they reload
+        shape = (len(all_tickers), len(dates) + DATE_HEADROOM, len(indicators))
+        tmp_path = f"{values_path}.tmp"
+        values = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=shape)
+        values[:] = np.nan
+        if old_tickers:
+            values[: len(old_tickers), : len(old_dates)] = existing.values[:, : len(old_dates)]
+        values.flush()
+        del values
+        os.replace(tmp_path, values_path)
+    elif new_tickers:
+        with open(values_path, "ab") as f:
+            f.truncate(int(np.prod(shape)) * 4)
+    del existing
+
+    if all_tickers:
+        values = np.memmap(values_path, dtype=np.float32, mode="r+", shape=shape)
+        position = {ticker: t for t, ticker in enumerate(all_tickers)}
+        for start in range(0, len(all_tickers), BUILD_CHUNK):
+            chunk = all_tickers[start : start + BUILD_CHUNK]
+            computed = {t: histories[t] for t in chunk if t in histories}
+            block = _compute(computed, dates, indicators)
+            for row, ticker in zip(block, computed):
+                t = position[ticker]
+                if t >= len(old_tickers):
+                    values[t] = np.nan
+                    values[t, : len(dates)] = row
+                else:
+                    values[t, len(old_dates) : len(dates)] = row[len(old_dates) :]
+        values.flush()
+        del values
+
+    _write_index(
+        path,
+        all_tickers,
+        dates,
+        {"indicators": indicators, "online": online, "date_capacity": shape[1]},
+    )
+    print(
+        f"Indicator store {path}: {len(all_tickers)} tickers ({len(new_tickers)} new), "
+        f"{len(dates)} dates ({len(later)} new)"
+    )
+    return IndicatorStore(path)
+
+
+@functools.lru_cache(maxsize=4)
+def _open(path: str, version: float) -> IndicatorStore:
+    return IndicatorStore(path)
+
+
+def get_indicator_store(path: Optional[str] = None) -> Optional[IndicatorStore]:
+    """The store the indicator tools read from, or None when none has been built.
+
+    Reopened automatically after a build appends to it.
+    """
+    path = path or get_config().get("indicator_store_dir")
+    if not path:
+        return None
+    meta_path = os.path.join(path, META_FILE)
+    try:
+        version = os.stat(meta_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _open(path, version)
@@ -0,0 +1,386 @@
+import math
+import re
+import sys
+import time
+from typing import Annotated, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+SUPPORTED_INDICATORS = [
+    "close_50_sma",
+    "close_200_sma",
+    "close_10_ema",
+    "macd",
+    "macds",
+    "macdh",
+    "rsi",
+    "boll",
+    "boll_ub",
+    "boll_lb",
+    "atr",
+    "vwma",
+    "mfi",
+]
+
+# Default windows, as in stockstats
+RSI_WINDOW = 14
+BOLL_WINDOW = 20
+BOLL_STD_TIMES = 2
+ATR_WINDOW = 14
+VWMA_WINDOW = 14
+MFI_WINDOW = 14
+MACD_WINDOWS = (12, 26, 9)
+
+# Share of an exponential average's weight that may fall before the loaded history
+WARMUP_TOLERANCE = 1e-6
+
+_MOVING_AVERAGE = re.compile(r"^close_(\d+)_(sma|ema)$")
+
+
+def is_supported(indicator: str) -> bool:
+    """Whether the native engine computes ``indicator`` (else fall back to stockstats)."""
+    return indicator in SUPPORTED_INDICATORS or bool(_MOVING_AVERAGE.match(indicator))
+
+
+class _Batch:
+    """Price columns of one or many tickers as (sessions, tickers) float64 arrays.
+
+    A column may start with NaN rows (a ticker listed later than the others in
+    a batch); every indicator then starts at the column's first value, exactly
+    as if the column had been computed on its own.
+    """
+
+    def __init__(self, close, high=None, low=None, volume=None):
+        self.squeeze = np.ndim(close) == 1
+        self.close = self._column(close)
+        self.high = None if high is None else self._column(high)
+        self.low = None if low is None else self._column(low)
+        self.volume = None if volume is None else self._column(volume)
+        self.valid = ~np.isnan(self.close)
+        self.start = np.where(self.valid.any(axis=0), self.valid.argmax(axis=0), len(self.close))
+        self.columns = np.arange(self.close.shape[1])
+        self._cache = {}
+
+    @staticmethod
+    def _column(values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        return np.ascontiguousarray(values)
+
+    def frame(self, values):
+        return pd.DataFrame(values, copy=False)
+
+    def first_rows(self, values, fill, count=1):
+        """Set the first ``count`` rows of every column (from its start) to ``fill``."""
+        rows = self.start[None, :] + np.arange(count)[:, None]
+        inside = rows < len(values)
+        values[rows[inside], np.broadcast_to(self.columns, rows.shape)[inside]] = fill
+        return values
+
+    def diff(self, values):
+        """First difference, 0 on each column's first row (stockstats ``_np_diff``)."""
+        out = np.full_like(values, np.nan)
+        out[1:] = values[1:] - values[:-1]
+        return self.first_rows(out, 0.0)
+
+    def previous(self, values):
+        """Previous row, the row itself on each column's first row."""
+        out = np.full_like(values, np.nan)
+        out[1:] = values[:-1]
+        rows = np.minimum(self.start, len(values) - 1)
+        out[rows, self.columns] = values[rows, self.columns]
+        return out
+
+    def masked(self, values):
+        """NaN before each column's start."""
+        values[~self.valid] = np.nan
+        return values
+
+    def cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def output(self, values):
+        return values[:, 0] if self.squeeze else values
+
+
+def _sma(batch, values, window):
+    return batch.frame(values).rolling(window, min_periods=1).mean().to_numpy()
+
+
+def _mstd(batch, values, window):
+    return batch.frame(values).rolling(window, min_periods=1).std().to_numpy()
+
+
+def _msum(batch, values, window):
+    return batch.frame(values).rolling(window, min_periods=1).sum().to_numpy()
+
+
+def _ema(batch, values, window):
+    return (
+        batch.frame(values)
+        .ewm(ignore_na=False, span=window, min_periods=1, adjust=True)
+        .mean()
+        .to_numpy()
+    )
+
+
+def _smma(batch, values, window):
+    return (
+        batch.frame(values)
+        .ewm(ignore_na=False, alpha=1.0 / window, min_periods=0, adjust=True)
+        .mean()
+        .to_numpy()
+    )
+
+
+def _cumsum_window(batch, values, window):
+    """Rolling sum over partial windows via cumulative sums (stockstats ``_rolling_sum``)."""
+    cumsum = np.cumsum(np.where(batch.valid, values, 0.0), axis=0)
+    out = cumsum.copy()
+    out[window:] = cumsum[window:] - cumsum[:-window]
+    return out
+
+
+def _typical_price(batch):
+    return batch.cached(
+        "tp", lambda: np.nan_to_num((batch.close + batch.high + batch.low) / 3.0)
+    )
+
+
+def _macd(batch):
+    def compute():
+        short, long, signal = MACD_WINDOWS
+        macd = _ema(batch, batch.close, short) - _ema(batch, batch.close, long)
+        macds = _ema(batch, macd, signal)
+        return macd, macds, macd - macds
+
+    return batch.cached("macd", compute)
+
+
+def _boll(batch):
+    def compute():
+        mean = _sma(batch, batch.close, BOLL_WINDOW)
+        width = BOLL_STD_TIMES * _mstd(batch, batch.close, BOLL_WINDOW)
+        return mean, mean + width, mean - width
+
+    return batch.cached("boll", compute)
+
+
+def _rsi(batch, window=RSI_WINDOW):
+    diff = batch.diff(batch.close)
+    up = batch.masked(np.where(diff > 0, diff, 0.0))
+    down = batch.masked(np.where(diff < 0, -diff, 0.0))
+    up_smma = _smma(batch, up, window)
+    down_smma = _smma(batch, down, window)
+    total = up_smma + down_smma
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(total != 0, 100 * (up_smma / total), 50.0)
+    return batch.first_rows(np.nan_to_num(rsi), 50.0)
+
+
+def _atr(batch, window=ATR_WINDOW):
+    prev_close = batch.previous(batch.close)
+    true_range = np.maximum(
+        batch.high - batch.low,
+        np.maximum(np.abs(batch.high - prev_close), np.abs(batch.low - prev_close)),
+    )
+    return _smma(batch, batch.masked(np.nan_to_num(true_range)), window)
+
+
+def _vwma(batch, window=VWMA_WINDOW):
+    rolling_tpv = _msum(batch, batch.masked(batch.volume * _typical_price(batch)), window)
+    rolling_volume = _msum(batch, batch.volume, window)
+    return np.divide(
+        rolling_tpv,
+        rolling_volume,
+        out=np.zeros_like(rolling_tpv),
+        where=rolling_volume != 0,
+    )
+
+
+def _mfi(batch, window=MFI_WINDOW):
+    tp = _typical_price(batch)
+    raw_money_flow = tp * batch.volume
+    tp_diff = batch.diff(tp)
+    positive = _cumsum_window(batch, np.where(tp_diff > 0, raw_money_flow, 0.0), window)
+    negative = _cumsum_window(batch, np.where(tp_diff < 0, raw_money_flow, 0.0), window)
+    total = positive + negative
+    mfi = np.divide(positive, total, out=np.full_like(positive, 0.5), where=total > 0)
+    return batch.first_rows(mfi, 0.5, count=window)
+
+
+def _compute(batch: _Batch, indicator: str) -> np.ndarray:
+    match = _MOVING_AVERAGE.match(indicator)
+    if match:
+        window, kind = int(match.group(1)), match.group(2)
+        average = _sma if kind == "sma" else _ema
+        return average(batch, batch.close, window)
+    if indicator in ("macd", "macds", "macdh"):
+        return _macd(batch)[("macd", "macds", "macdh").index(indicator)]
+    if indicator in ("boll", "boll_ub", "boll_lb"):
+        return _boll(batch)[("boll", "boll_ub", "boll_lb").index(indicator)]
+    if indicator == "rsi":
+        return _rsi(batch)
+    if indicator == "atr":
+        return _atr(batch)
+    if indicator == "vwma":
+        return _vwma(batch)
+    if indicator == "mfi":
+        return _mfi(batch)
+    raise ValueError(
+        f"Indicator {indicator} is not supported natively. Please choose from: {SUPPORTED_INDICATORS}"
+    )
+
+
+def _ema_warmup(alpha: float, tolerance: float) -> int:
+    """Sessions after which older values carry less than ``tolerance`` of the weight."""
+    return int(math.ceil(math.log(tolerance) / math.log(1.0 - alpha)))
+
+
+def required_history(indicator: str, tolerance: float = WARMUP_TOLERANCE) -> int:
+    """Sessions of history an indicator needs before the first value it reports.
+
+    Window indicators are exact with their window; exponential ones (EMA,
+    MACD, RSI, ATR) converge to the full-history value within ``tolerance``
+    of the dropped weight, relative to the spread of the dropped prices.
+    """
+    match = _MOVING_AVERAGE.match(indicator)
+    if match:
+        window, kind = int(match.group(1)), match.group(2)
+        return window - 1 if kind == "sma" else _ema_warmup(2.0 / (window + 1), tolerance)
+    if indicator in ("macd", "macds", "macdh"):
+        _, long, signal = MACD_WINDOWS
+        return _ema_warmup(2.0 / (long + 1), tolerance) + _ema_warmup(2.0 / (signal + 1), tolerance)
+    if indicator in ("boll", "boll_ub", "boll_lb"):
+        return BOLL_WINDOW - 1
+    if indicator == "rsi":
+        return _ema_warmup(1.0 / RSI_WINDOW, tolerance) + 1
+    if indicator == "atr":
+        return _ema_warmup(1.0 / ATR_WINDOW, tolerance) + 1
+    if indicator == "vwma":
+        return VWMA_WINDOW - 1
+    if indicator == "mfi":
+        return MFI_WINDOW
+    raise ValueError(
+        f"Indicator {indicator} is not supported natively. Please choose from: {SUPPORTED_INDICATORS}"
+    )
+
+
+def compute_indicators(
+    prices: Annotated[
+        Dict[str, np.ndarray],
+        "Close, High, Low and Volume arrays: (sessions,) or (sessions, tickers)",
+    ],
+    indicators: Annotated[Iterable[str], "indicator names, e.g. close_50_sma"],
+) -> Dict[str, np.ndarray]:
+    """Compute several indicators at once, sharing intermediate results.
+
+    ``prices`` maps column names (case-insensitive) to 1-D arrays for one
+    ticker or 2-D (sessions, tickers) arrays for a batch; results have the
+    same shape. A DataFrame with those columns also works. Values match
+    stockstats for every supported indicator.
+    """
+    columns = {str(name).lower(): values for name, values in dict(prices).items()}
+    batch = _Batch(
+        columns["close"], columns.get("high"), columns.get("low"), columns.get("volume")
+    )
+    out = {}
+    for indicator in indicators:
+        values = batch.masked(np.array(_compute(batch, indicator), dtype=np.float64))
+        out[indicator] = batch.output(values)
+    return out
+
+
+def compute_indicator(prices, indicator: str) -> np.ndarray:
+    """Compute one indicator; see ``compute_indicators``."""
+    return compute_indicators(prices, [indicator])[indicator]
+
+
+def _stockstats_reference(prices: pd.DataFrame, indicator: str) -> np.ndarray:
+    from stockstats import wrap
+
+    return np.asarray(wrap(prices.copy())[indicator], dtype=np.float64)
+
+
+def _random_prices(rng, n):
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 0.5, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(0, 5_000_000, n).astype(np.float64),
+        }
+    )
+
+
+def conformance(n_series=20, length=2500, seed=0, tolerance=1e-9):
+    """Compare the native engine with stockstats on random price series.
+
+    Every indicator is checked per series and for the whole set as one
+    batch whose columns start at different rows. Returns the worst relative
+    difference per indicator and raises AssertionError above ``tolerance``.
+    """
+    rng = np.random.default_rng(seed)
+    series = [_random_prices(rng, int(rng.integers(length // 2, length))) for _ in range(n_series)]
+    # Flat prices and zero volume exercise the division guards
+    series[0].loc[:50, ["open", "high", "low", "close"]] = 100.0
+    series[0].loc[:30, "volume"] = 0.0
+
+    indicators = SUPPORTED_INDICATORS + ["close_5_sma", "close_30_ema"]
+    batch = {
+        name: np.full((length, n_series), np.nan) for name in ("close", "high", "low", "volume")
+    }
+    for i, prices in enumerate(series):
+        for name in batch:
+            batch[name][length - len(prices) :, i] = prices[name].to_numpy()
+    batched = compute_indicators(batch, indicators)
+
+    worst = {}
+    for indicator in indicators:
+        worst[indicator] = 0.0
+        for i, prices in enumerate(series):
+            expected = _stockstats_reference(prices, indicator)
+            for actual in (
+                compute_indicator(prices, indicator),
+                batched[indicator][length - len(prices) :, i],
+            ):
+                both_nan = np.isnan(expected) & np.isnan(actual)
+                error = np.abs(actual - expected) / np.maximum(1.0, np.abs(expected))
+                error = np.where(both_nan, 0.0, np.nan_to_num(error, nan=np.inf))
+                worst[indicator] = max(worst[indicator], float(error.max()))
+        assert worst[indicator] <= tolerance, f"{indicator} differs from stockstats: {worst[indicator]}"
+    return worst
+
+
+if __name__ == "__main__":
+    # Usage: python -m tradingagents.dataflows.indicators [n_series]
+    # Conformance against stockstats, then timing of one batched pass.
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for indicator, error in conformance(n_series).items():
+        print(f"{indicator}: max relative difference {error:.2e}")
+
+    rng = np.random.default_rng(1)
+    frames = [_random_prices(rng, 2500) for _ in range(100)]
+    start = time.perf_counter()
+    for prices in frames:
+        for indicator in SUPPORTED_INDICATORS:
+            _stockstats_reference(prices, indicator)
+    stockstats_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compute_indicators(
+        {name: np.column_stack([p[name] for p in frames]) for name in ("close", "high", "low", "volume")},
+        SUPPORTED_INDICATORS,
+    )
+    native_time = time.perf_counter() - start
+    print(
+        f"100 tickers x 2500 sessions: stockstats {stockstats_time:.2f}s, "
+        f"native batch {native_time:.2f}s ({stockstats_time / native_time:.0f}x)"
+    )
@@ -0,0 +1,384 @@
+import functools
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Annotated, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+
+
+INGEST_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+SIMFIN_COLUMNS_FILE = ".columns.npz"  # empty frame with the table's columns
+# Source files of each kind, relative to the data directory
+SOURCES = {
+    "prices": "market_data/price_data/*.csv",
+    "simfin": "fundamental_data/simfin_data_all/*/companies/us/*.csv",
+    "finnhub": "finnhub_data/*/*.json",
+    "reddit": "reddit_data/*/*.jsonl",
+}
+
+
+def ingested_dir() -> str:
+    return get_config()["ingested_data_dir"]
+
+
+def _checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_arrays(frame: pd.DataFrame, prefix: str = "") -> Dict[str, np.ndarray]:
+    """A frame as plain arrays for ``np.savez``: its columns, index and values.
+
+    Text columns are stored as fixed-width strings with a mask of their
+    missing values, so the arrays load without ``allow_pickle``.
+    """
+    index = frame.index.to_numpy()
+    arrays = {
+        f"{prefix}columns": np.array([str(name) for name in frame.columns], dtype=str),
+        f"{prefix}index": index.astype(str) if index.dtype == object else index,
+    }
+    for i, (_, column) in enumerate(frame.items()):
+        values = column.to_numpy()
+        if values.dtype == object:
+            missing = column.isna().to_numpy()
+            arrays[f"{prefix}missing{i}"] = missing
+            values = np.where(missing, "", column.astype(str).to_numpy()).astype(str)
+        arrays[f"{prefix}column{i}"] = values
+    return arrays
+
+
+def read_frame(arrays: Mapping[str, np.ndarray], prefix: str = "") -> pd.DataFrame:
+    """The frame stored by ``frame_arrays``."""
+    columns = arrays[f"{prefix}columns"].tolist()
+    data = {}
+    for i, name in enumerate(columns):
+        values = arrays[f"{prefix}column{i}"]
+        if f"{prefix}missing{i}" in arrays:
+            values = values.astype(object)
+            values[arrays[f"{prefix}missing{i}"]] = np.nan
+        data[name] = values
+    return pd.DataFrame(data, index=pd.Index(arrays[f"{prefix}index"]), columns=columns)
+
+
+def _save_frame(frame: pd.DataFrame, path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **frame_arrays(frame))
+    os.replace(tmp_path, path)
+
+
+def _load_frame(path: str) -> pd.DataFrame:
+    with np.load(path, allow_pickle=False) as arrays:
+        return read_frame(arrays)
+
+
+def _dump(obj, path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(gzip.compress(json.dumps(obj).encode("utf-8"), compresslevel=1))
+    os.replace(tmp_path, path)
+
+
+def _load(path: str):
+    """A converted file: npz frames or gzip-compressed JSON, neither of which can run code."""
+    if path.endswith(".npz"):
+        return _load_frame(path)
+    with open(path, "rb") as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def _date_range(dates) -> Dict:
+    dates = sorted(dates)
+    return {"start": dates[0] if dates else None, "end": dates[-1] if dates else None}
+
+
+def _convert_prices(source: str, output: str) -> Dict:
+    """The raw rows as an npz frame, skipping the CSV parse."""
+    data = pd.read_csv(source)
+    _save_frame(data, output)
+    return {"rows": len(data), **_date_range(data["Date"].astype(str).str[:10])}
+
+
+def _convert_simfin(source: str, output: str) -> Dict:
+    """One npz frame per ticker, keeping the table's row index."""
+    table = pd.read_csv(source, sep=";")
+    tmp_dir = f"{output}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    _save_frame(table.iloc[:0], os.path.join(tmp_dir, SIMFIN_COLUMNS_FILE))
+    for ticker, rows in table.groupby("Ticker", sort=False):
+        _save_frame(rows, os.path.join(tmp_dir, f"{ticker}.npz"))
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(tmp_dir, output)
+    return {
+        "rows": len(table),
+        "tickers": int(table["Ticker"].nunique()),
+        **_date_range(table["Publish Date"].dropna().astype(str).str[:10]),
+    }
+
+
+def _convert_finnhub(source: str, output: str) -> Dict:
+    """The non-empty dated entries, in file order, with their dates for bisection."""
+    with open(source, "r") as f:
+        data = json.load(f)
+    dates = [day for day, value in data.items() if len(value) > 0]
+    values = [data[day] for day in dates]
+    _dump({"dates": dates, "values": values, "sorted": dates == sorted(dates)}, output)
+    return {"dates": len(dates), **_date_range(dates)}
+
+
+def _convert_reddit(source: str, output: str) -> Dict:
+    """The posts grouped by posting date, as the Reddit tools look them up."""
+    from .reddit_utils import parse_posts_by_date
+
+    posts_by_date = parse_posts_by_date(source)
+    _dump(posts_by_date, output)
+    return {
+        "posts": sum(len(posts) for posts in posts_by_date.values()),
+        **_date_range(posts_by_date),
+    }
+
+
+CONVERTERS = {
+    "prices": _convert_prices,
+    "simfin": _convert_simfin,
+    "finnhub": _convert_finnhub,
+    "reddit": _convert_reddit,
+}
+
+
+def _output_name(kind: str, rel: str) -> str:
+    if kind == "simfin":
+        return f"{rel}.tickers"
+    return f"{rel}.npz" if kind == "prices" else f"{rel}.json.gz"
+
+
+def _ingest_file(kind: str, source: str, output: str, old_checksum: Optional[str]) -> Dict:
+    """Convert one source file unless its content is unchanged. Runs in a worker process."""
+    stat = os.stat(source)
+    checksum = _checksum(source)
+    entry = {"kind": kind, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": checksum}
+    if checksum == old_checksum and os.path.exists(output):
+        return entry
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    entry["coverage"] = CONVERTERS[kind](source, output)
+    entry["converted"] = True
+    return entry
+
+
+def _remove_output(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def ingest_data_dir(
+    data_dir: Annotated[Optional[str], "raw data directory (default config['data_dir'])"] = None,
+    output_dir: Annotated[Optional[str], "converted data directory (default config['ingested_data_dir'])"] = None,
+    max_workers: Annotated[Optional[int], "conversion processes (default one per CPU)"] = None,
+    force: Annotated[bool, "convert every file again"] = False,
+) -> Dict:
+    """Convert the raw price, SimFin, Finnhub and Reddit files into indexed formats.
+
+    Prices become npz frames, SimFin tables one npz frame per ticker, Finnhub
+    JSONs date-sorted entries and Reddit dumps posts grouped by date (both
+    gzip-compressed JSON); none of these formats can run code when loaded.
+    The manifest in ``output_dir`` records each source's size, mtime,
+    checksum and coverage. Running again converts only the files whose
+    content changed and drops the outputs of removed files, or of every
+    file when the manifest is from another version. Returns the manifest.
+    """
+    data_dir = os.path.abspath(data_dir or get_config()["data_dir"])
+    output_dir = output_dir or ingested_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+
+    previous, stale = {}, {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == INGEST_VERSION and manifest.get("data_dir") == data_dir:
+            previous = manifest["files"]
+        else:
+            stale = manifest.get("files", {})
+
+    sources = {}
+    for kind, pattern in SOURCES.items():
+        for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+            sources[os.path.relpath(path, data_dir)] = kind
+
+    files, pending = {}, {}
+    for rel, kind in sources.items():
+        old = previous.get(rel)
+        stat = os.stat(os.path.join(data_dir, rel))
+        if not force and old is not None and (old["size"], old["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            files[rel] = old
+        else:
+            pending[rel] = kind
+
+    counts = {"converted": 0, "unchanged": len(files), "removed": 0}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            rel: executor.submit(
+                _ingest_file,
+                kind,
+                os.path.join(data_dir, rel),
+                os.path.join(output_dir, _output_name(kind, rel)),
+                None if force else (previous.get(rel) or {}).get("sha256"),
+            )
+            for rel, kind in pending.items()
+        }
+        for rel, future in futures.items():
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"Ingesting {rel} failed: {e}")
+                continue
+            if entry.pop("converted", False):
+                counts["converted"] += 1
+            else:
+                entry["coverage"] = previous[rel]["coverage"]
+                counts["unchanged"] += 1
+            entry["output"] = _output_name(entry["kind"], rel)
+            files[rel] = entry
+
+    for rel, old in previous.items():
+        if rel not in sources:
+            _remove_output(os.path.join(output_dir, old["output"]))
+            counts["removed"] += 1
+    # Outputs of an older format that were not rewritten
+    outputs = {entry["output"] for entry in files.values()}
+    for old in stale.values():
+        if old.get("output") and old["output"] not in outputs:
+            _remove_output(os.path.join(output_dir, old["output"]))
+
+    manifest = {"version": INGEST_VERSION, "data_dir": data_dir, "files": dict(sorted(files.items()))}
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+    print(
+        f"Ingested {data_dir} into {output_dir}: {counts['converted']} converted, "
+        f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+    )
+    return manifest
+
+
+@functools.lru_cache(maxsize=4)
+def _read_manifest(path: str, version: int) -> Dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def converted_file(
+    source: Annotated[str, "path of a raw file in the data directory"],
+) -> Optional[str]:
+    """The converted form of a raw file, or None when it is missing or stale.
+
+    A conversion is only used while the source keeps the size and mtime
+    recorded at ingestion, so edited files are read raw until ingested again,
+    and only from a manifest of this ``INGEST_VERSION``.
+    """
+    directory = ingested_dir()
+    if not directory:
+        return None
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        manifest = _read_manifest(manifest_path, os.stat(manifest_path).st_mtime_ns)
+        stat = os.stat(source)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != INGEST_VERSION:
+        return None
+    entry = manifest["files"].get(os.path.relpath(os.path.abspath(source), manifest["data_dir"]))
+    if entry is None or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        return None
+    return os.path.join(directory, entry["output"])
+
+
+def load_converted(
+    source: Annotated[str, "path of a raw file in the data directory"],
+):
+    """The converted content of a raw file, or None when it has not been ingested."""
+    path = converted_file(source)
+    return None if path is None else _load(path)
+
+
+def finnhub_range(
+    source: Annotated[str, "path of a Finnhub JSON file"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+) -> Optional[Dict]:
+    """Non-empty entries of an ingested Finnhub file in a date range, or None."""
+    data = load_converted(source)
+    if data is None:
+        return None
+    dates, values = data["dates"], data["values"]
+    if data["sorted"]:
+        lo, hi = bisect_left(dates, start_date), bisect_right(dates, end_date)
+        return dict(zip(dates[lo:hi], values[lo:hi]))
+    return {day: value for day, value in zip(dates, values) if start_date <= day <= end_date}
+
+
+@functools.lru_cache(maxsize=6)
+def _read_simfin_csv(path: str, version: int) -> pd.DataFrame:
+    return pd.read_csv(path, sep=";")
+
+
+def load_simfin_rows(
+    source: Annotated[str, "path of a SimFin statement CSV"],
+    ticker: Annotated[str, "ticker symbol"],
+) -> pd.DataFrame:
+    """A SimFin table's rows of one ticker, with their row index in the table.
+
+    Read from the ticker's own file when the table has been ingested.
+    """
+    directory = converted_file(source)
+    if directory is not None:
+        path = os.path.join(directory, f"{ticker}.npz")
+        if not os.path.exists(path):
+            path = os.path.join(directory, SIMFIN_COLUMNS_FILE)
+        return _load_frame(path)
+    table = _read_simfin_csv(source, os.stat(source).st_mtime_ns)
+    return table[table["Ticker"] == ticker].copy()
+
+
+def coverage_report(
+    output_dir: Annotated[Optional[str], "converted data directory (default config['ingested_data_dir'])"] = None,
+) -> pd.DataFrame:
+    """Files, rows and date span of the ingested data, per source directory."""
+    with open(os.path.join(output_dir or ingested_dir(), MANIFEST_FILE), "r") as f:
+        files = json.load(f)["files"]
+    rows = []
+    for rel, entry in files.items():
+        coverage = entry["coverage"]
+        rows.append(
+            {
+                "source": os.path.dirname(rel),
+                "kind": entry["kind"],
+                "files": 1,
+                "start": coverage["start"],
+                "end": coverage["end"],
+            }
+        )
+    if not rows:
+        return pd.DataFrame(columns=["source", "kind", "files", "start", "end"])
+    return (
+        pd.DataFrame(rows)
+        .groupby(["source", "kind"], as_index=False)
+        .agg({"files": "sum", "start": "min", "end": "max"})
+    )
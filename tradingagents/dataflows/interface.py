@@ -2,6 +2,13 @@ from typing import Annotated, Dict
 from .reddit_utils import fetch_top_from_category
 from .yfin_utils import *
 from .stockstats_utils import *
+from .indicators import compute_indicator, required_history
+from .indicator_state import update_indicator_state
+from .indicator_store import get_indicator_store
+from .run_bundle import find_run_bundle
+from .ingest import load_simfin_rows
+from .price_store import load_price_range, read_price_file
+from .trading_calendar import get_trading_calendar
 from .googlenews_utils import *
 from .finnhub_utils import get_data_in_range
 from dateutil.relativedelta import relativedelta
@@ -9,6 +16,7 @@ from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
+import threading
 import pandas as pd
 from tqdm import tqdm
 import yfinance as yf
@@ -33,6 +41,52 @@ def _create_llm_from_config():
         raise ValueError(f"Unsupported LLM provider: {config['llm_provider']}")
 
 
+def _finnhub_data(ticker, start_date, end_date, data_type):
+    """Finnhub data from the ticker's run bundle when it covers the range, else from disk."""
+    bundle = find_run_bundle(ticker, end_date)
+    if bundle is not None:
+        data = bundle.finnhub_data(data_type, start_date, end_date)
+        if data is not None:
+            return data
+    return get_data_in_range(ticker, start_date, end_date, data_type, DATA_DIR)
+
+
+def _simfin_table(ticker, curr_date, statement, file_name):
+    """The ticker's rows of a SimFin statement table, from its run bundle when there is one."""
+    freq = file_name.rsplit("-", 1)[-1][: -len(".csv")]
+    bundle = find_run_bundle(ticker, curr_date)
+    if bundle is not None:
+        rows = bundle.simfin_rows(statement, freq)
+        if rows is not None:
+            return rows
+    data_path = os.path.join(
+        DATA_DIR,
+        "fundamental_data",
+        "simfin_data_all",
+        statement,
+        "companies",
+        "us",
+        file_name,
+    )
+    return load_simfin_rows(data_path, ticker)
+
+
+def _reddit_posts(bundle, category, date, max_limit, query=None):
+    """One day of Reddit posts from the run bundle when it covers the day, else from the dumps."""
+    if bundle is not None:
+        posts = bundle.reddit_posts(category, date, max_limit)
+        if posts is not None:
+            return posts
+    return fetch_top_from_category(
+        category, date, max_limit, query, data_path=os.path.join(DATA_DIR, "reddit_data")
+    )
+
+
+def _indicator_text(value):
+    """An indicator value at the precision of the float32 indicator store, so every source prints alike."""
+    return f"{float(value):.6g}"
+
+
 def get_finnhub_news(
     ticker: Annotated[
         str,
@@ -57,7 +111,7 @@ def get_finnhub_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    result = get_data_in_range(ticker, before, curr_date, "news_data", DATA_DIR)
+    result = _finnhub_data(ticker, before, curr_date, "news_data")
 
     if len(result) == 0:
         return ""
@@ -96,7 +150,7 @@ def get_finnhub_company_insider_sentiment(
     before = date_obj - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    data = get_data_in_range(ticker, before, curr_date, "insider_senti", DATA_DIR)
+    data = _finnhub_data(ticker, before, curr_date, "insider_senti")
 
     if len(data) == 0:
         return ""
@@ -137,7 +191,7 @@ def get_finnhub_company_insider_transactions(
     before = date_obj - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    data = get_data_in_range(ticker, before, curr_date, "insider_trans", DATA_DIR)
+    data = _finnhub_data(ticker, before, curr_date, "insider_trans")
 
     if len(data) == 0:
         return ""
@@ -166,16 +220,7 @@ def get_simfin_balance_sheet(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "balance_sheet",
-        "companies",
-        "us",
-        f"us-balance-{freq}.csv",
-    )
-    df = pd.read_csv(data_path, sep=";")
+    df = _simfin_table(ticker, curr_date, "balance_sheet", f"us-balance-{freq}.csv")
 
     # Convert date strings to datetime objects and remove any time components
     df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
@@ -213,16 +258,7 @@ def get_simfin_cashflow(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "cash_flow",
-        "companies",
-        "us",
-        f"us-cashflow-{freq}.csv",
-    )
-    df = pd.read_csv(data_path, sep=";")
+    df = _simfin_table(ticker, curr_date, "cash_flow", f"us-cashflow-{freq}.csv")
 
     # Convert date strings to datetime objects and remove any time components
     df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
@@ -260,16 +296,7 @@ def get_simfin_income_statements(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "income_statements",
-        "companies",
-        "us",
-        f"us-income-{freq}.csv",
-    )
-    df = pd.read_csv(data_path, sep=";")
+    df = _simfin_table(ticker, curr_date, "income_statements", f"us-income-{freq}.csv")
 
     # Convert date strings to datetime objects and remove any time components
     df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
@@ -325,6 +352,29 @@ def get_google_news(
     return f"## {query} Google News, from {before} to {curr_date}:\n\n{news_str}"
 
 
+_GLOBAL_NEWS = {}
+_GLOBAL_NEWS_LOCKS = {}
+_GLOBAL_NEWS_LOCK = threading.Lock()
+
+
+def _shared_global_news(key, fetch):
+    """Compute global news once per key.
+
+    Global news does not depend on the ticker, so concurrent runs for the
+    same date wait for the first one instead of fetching it again. Errors
+    are not cached.
+    """
+    with _GLOBAL_NEWS_LOCK:
+        lock = _GLOBAL_NEWS_LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        if key in _GLOBAL_NEWS:
+            return _GLOBAL_NEWS[key]
+        result = fetch()
+        if not result.startswith("Error retrieving"):
+            _GLOBAL_NEWS[key] = result
+        return result
+
+
 def get_reddit_global_news(
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     look_back_days: Annotated[int, "how many days to look back"],
@@ -338,7 +388,13 @@ def get_reddit_global_news(
     Returns:
         str: A formatted dataframe containing the latest news articles posts on reddit and meta information in these columns: "created_utc", "id", "title", "selftext", "score", "num_comments", "url"
     """
+    return _shared_global_news(
+        ("reddit", start_date, look_back_days, max_limit_per_day),
+        lambda: _fetch_reddit_global_news(start_date, look_back_days, max_limit_per_day),
+    )
+
 
+def _fetch_reddit_global_news(start_date, look_back_days, max_limit_per_day):
     start_date = datetime.strptime(start_date, "%Y-%m-%d")
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
@@ -349,14 +405,12 @@ def get_reddit_global_news(
 
     total_iterations = (start_date - curr_date).days + 1
     pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
+    bundle = find_run_bundle(None, start_date.strftime("%Y-%m-%d"))
 
     while curr_date <= start_date:
         curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "global_news",
-            curr_date_str,
-            max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
+        fetch_result = _reddit_posts(
+            bundle, "global_news", curr_date_str, max_limit_per_day
         )
         posts.extend(fetch_result)
         curr_date += relativedelta(days=1)
@@ -406,15 +460,12 @@ def get_reddit_company_news(
         desc=f"Getting Company News for {ticker} on {start_date}",
         total=total_iterations,
     )
+    bundle = find_run_bundle(ticker, start_date.strftime("%Y-%m-%d"))
 
     while curr_date <= start_date:
         curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "company_news",
-            curr_date_str,
-            max_limit_per_day,
-            ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
+        fetch_result = _reddit_posts(
+            bundle, "company_news", curr_date_str, max_limit_per_day, ticker
         )
         posts.extend(fetch_result)
         curr_date += relativedelta(days=1)
@@ -528,39 +579,57 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
-    if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
-        )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+    store = None if online else get_indicator_store()
+    state = None
+    if online:
+        # Fold the new bars into the saved indicator state instead of recomputing
+        state = update_indicator_state(symbol, online=online)
+        if not state.covers(before.strftime("%Y-%m-%d")):
+            state = None
+    bundled = None
+    bundle = None if online else find_run_bundle(symbol, end_date)
+    if bundle is not None:
+        bundled = bundle.indicator_values(indicator, before.strftime("%Y-%m-%d"), end_date)
+    if bundled is not None:
+        # The run bundle built for this watchlist holds the whole series
+        session_values = bundled
+    elif store is not None and store.covers(symbol.upper(), end_date):
+        # Read the window straight from the precomputed indicator store
+        dates, values = store.window(symbol.upper(), indicator, before, end_date)
+        session_values = dict(zip(dates.astype(str), values.tolist()))
+    elif state is not None:
+        session_values = {
+            day: value
+            for day, value in zip(state.history["date"], state.history[indicator])
+        }
     else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-            )
-
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+        # Load only the window plus the warm-up sessions the indicator needs
+        calendar = get_trading_calendar()
+        start = calendar.offset(before, -required_history(indicator) - 1)
+        prices = load_price_range(symbol, start, end_date, online)
+        values = compute_indicator(prices, indicator)
+        sessions = prices.index.strftime("%Y-%m-%d")
+        session_values = dict(zip(sessions, values.tolist()))
+
+    # The symbol's own bars are its sessions: 24/7 symbols trade on weekends
+    # and other listings on NYSE holidays
+    ind_string = ""
+    if online:
+        # Every calendar day, with the days without a bar marked
+        day = curr_date
+        while day >= before:
+            day_str = day.strftime("%Y-%m-%d")
+            if day_str in session_values:
+                ind_string += f"{day_str}: {_indicator_text(session_values[day_str])}\n"
+            else:
+                ind_string += f"{day_str}: N/A: Not a trading day (weekend or holiday)\n"
+            day = day - relativedelta(days=1)
+    else:
+        # only do the trading dates
+        first_day = before.strftime("%Y-%m-%d")
+        for day_str in sorted(session_values, reverse=True):
+            if first_day <= day_str <= end_date:
+                ind_string += f"{day_str}: {_indicator_text(session_values[day_str])}\n"
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -612,7 +681,7 @@ def get_YFin_data_window(
     start_date = before.strftime("%Y-%m-%d")
 
     # read in data
-    data = pd.read_csv(
+    data = read_price_file(
         os.path.join(
             DATA_DIR,
             f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
@@ -684,18 +753,39 @@ def get_YFin_data_online(
     return header + csv_string
 
 
+_COMPANY_SECTORS = {}
+
+
+def get_company_sector(
+    symbol: Annotated[str, "ticker symbol of the company"],
+) -> str:
+    """Sector of the company from Yahoo Finance, or "" when unavailable."""
+    symbol = symbol.upper()
+    if symbol not in _COMPANY_SECTORS:
+        try:
+            _COMPANY_SECTORS[symbol] = yf.Ticker(symbol).info.get("sector") or ""
+        except Exception as e:
+            print(f"Error fetching sector for {symbol}: {e}")
+            return ""
+    return _COMPANY_SECTORS[symbol]
+
+
 def get_YFin_data(
     symbol: Annotated[str, "ticker symbol of the company"],
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ) -> str:
-    # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
+    # read in data, from the run bundle when there is one
+    bundle = find_run_bundle(symbol, end_date)
+    if bundle is not None and bundle.prices is not None:
+        data = bundle.prices.copy()
+    else:
+        data = read_price_file(
+            os.path.join(
+                DATA_DIR,
+                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
+            )
         )
-    )
 
     if end_date > "2025-03-25":
         raise Exception(
@@ -750,6 +840,14 @@ def get_global_news_openai(curr_date):
     
     Note: This function now uses the configured LLM provider instead of hardcoded OpenAI.
     """
+    config = get_config()
+    return _shared_global_news(
+        ("llm", curr_date, config["llm_provider"], config["quick_think_llm"]),
+        lambda: _fetch_global_news_openai(curr_date),
+    )
+
+
+def _fetch_global_news_openai(curr_date):
     try:
         llm = _create_llm_from_config()
         
@@ -0,0 +1,107 @@
+import os
+from typing import Annotated, List
+
+import pandas as pd
+import yfinance as yf
+
+from . import interface
+from .config import DATA_DIR
+from .reddit_utils import load_category
+from .stockstats_utils import online_data_file
+
+
+def prefetch_price_data(
+    symbols: Annotated[List[str], "ticker symbols to download"],
+) -> List[str]:
+    """Download the online price history of many tickers in one request.
+
+    Each ticker is written to the cache file the stockstats tools read, so the
+    analysts of every run find their data on disk. Tickers that are already
+    cached are skipped. Returns the tickers that were downloaded.
+    """
+    missing = {}
+    for symbol in dict.fromkeys(s.upper() for s in symbols):
+        data_file, start_date, end_date = online_data_file(symbol)
+        if not os.path.exists(data_file):
+            missing[symbol] = data_file
+
+    if not missing:
+        return []
+
+    data = yf.download(
+        list(missing),
+        start=start_date,
+        end=end_date,
+        group_by="ticker",
+        progress=False,
+        auto_adjust=True,
+    )
+
+    fetched = []
+    for symbol, data_file in missing.items():
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        else:
+            frame = data
+        frame = frame.dropna(how="all")
+        if frame.empty:
+            print(f"No price data downloaded for {symbol}")
+            continue
+        frame = frame.rename_axis("Date").reset_index()
+        frame.columns.name = None
+        frame.to_csv(data_file, index=False)
+        fetched.append(symbol)
+    return fetched
+
+
+def prefetch_reddit_data():
+    """Parse the offline Reddit dumps once for all runs."""
+    for category in ("global_news", "company_news"):
+        path = os.path.join(DATA_DIR, "reddit_data", category)
+        if os.path.isdir(path):
+            load_category(category, os.path.join(DATA_DIR, "reddit_data"))
+
+
+def prefetch_global_news(
+    trade_date: Annotated[str, "Trade date in yyyy-mm-dd format"],
+    online: Annotated[bool, "whether the runs use online tools"],
+):
+    """Compute the ticker-independent global news once for all runs."""
+    if online:
+        interface.get_global_news_openai(trade_date)
+    else:
+        interface.get_reddit_global_news(trade_date, 7, 5)
+
+
+def prefetch(
+    tickers: Annotated[List[str], "ticker symbols of the batch"],
+    trade_date: Annotated[str, "Trade date in yyyy-mm-dd format"],
+    config: Annotated[dict, "TradingAgents config of the runs"],
+    selected_analysts: Annotated[List[str], "analysts of the runs"] = (
+        "market",
+        "social",
+        "news",
+        "fundamentals",
+    ),
+):
+    """Fetch the data shared by a batch of runs before the runs start.
+
+    Every step is best effort: a failure is reported and the runs fall back
+    to fetching the data themselves.
+    """
+    online = config.get("online_tools", False)
+    steps = []
+    if online and "market" in selected_analysts:
+        steps.append(("price data", lambda: prefetch_price_data(tickers)))
+    if not online and ("social" in selected_analysts or "news" in selected_analysts):
+        steps.append(("reddit data", prefetch_reddit_data))
+    if "news" in selected_analysts:
+        steps.append(("global news", lambda: prefetch_global_news(str(trade_date), online)))
+
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            print(f"Prefetching {name} failed: {e}")
@@ -0,0 +1,138 @@
+import functools
+import io
+import os
+from typing import Annotated
+
+import pandas as pd
+
+from .config import get_config
+from .ingest import converted_file, load_converted
+from .stockstats_utils import online_data_file
+
+
+OFFLINE_PRICE_FILE = "{symbol}-YFin-data-2015-01-01-2025-03-25.csv"
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def offline_price_file(
+    symbol: Annotated[str, "ticker symbol of the company"],
+) -> str:
+    """Path of a ticker's price history in the offline data directory."""
+    return os.path.join(
+        get_config()["data_dir"],
+        "market_data",
+        "price_data",
+        OFFLINE_PRICE_FILE.format(symbol=symbol),
+    )
+
+
+def price_file(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    online: Annotated[bool, "use the online price cache instead of the offline data"],
+) -> str:
+    """Path of the price history the tools read for ``symbol``."""
+    if online:
+        data_file, _, _ = online_data_file(symbol)
+        if not os.path.exists(data_file):
+            from .prefetch import prefetch_price_data
+
+            prefetch_price_data([symbol])
+        return data_file
+    return offline_price_file(symbol)
+
+
+def _frame(data: pd.DataFrame) -> pd.DataFrame:
+    dates = data["Date"].astype(str).str[:10].to_numpy().astype("datetime64[ns]")
+    prices = data[[c for c in PRICE_COLUMNS if c in data.columns]].astype("float64")
+    prices.index = pd.DatetimeIndex(dates, name="Date")
+    return prices[~prices.index.duplicated(keep="last")].sort_index()
+
+
+def read_price_file(
+    path: Annotated[str, "price CSV in the data directory or the online cache"],
+) -> pd.DataFrame:
+    """The raw rows of a price file, from its ingested copy when there is one."""
+    data = load_converted(path)
+    return pd.read_csv(path) if data is None else data
+
+
+@functools.lru_cache(maxsize=512)
+def _load(path: str) -> pd.DataFrame:
+    return _frame(read_price_file(path))
+
+
+def _seek_date(f, data_start: int, size: int, date: bytes) -> int:
+    """Offset of the first row dated on or after ``date`` in a date-sorted CSV."""
+    lo, hi = data_start, size
+    while hi - lo > 4096:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()  # skip to the next full row
+        row = f.readline()
+        if row and row[:10] < date:
+            lo = mid
+        else:
+            hi = mid
+    f.seek(lo)
+    if lo > data_start:
+        f.readline()
+    while True:
+        offset = f.tell()
+        row = f.readline()
+        if not row or row[:10] >= date:
+            return offset
+
+
+def _read_range(path: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Rows of a price CSV between two dates, found by binary search on the file."""
+    if converted_file(path) is not None:
+        # Ingested files load without parsing, so slice the cached history
+        return _load(path).loc[start_date:end_date].copy()
+    with open(path, "rb") as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        begin = _seek_date(f, len(header), size, start_date.encode())
+        next_day = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        end = _seek_date(f, begin, size, next_day.strftime("%Y-%m-%d").encode())
+        f.seek(begin)
+        rows = f.read(end - begin)
+    return _frame(pd.read_csv(io.BytesIO(header + rows)))
+
+
+def load_price_history(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    online: Annotated[bool, "use the online price cache instead of the offline data"] = None,
+) -> pd.DataFrame:
+    """Daily OHLCV history of a ticker indexed by session date.
+
+    Reads the same files as the market data tools: the offline price data, or
+    the online cache when ``online`` (default ``config["online_tools"]``).
+    Frames are cached and shared between callers, so treat them as read-only.
+    Raises FileNotFoundError when the ticker has no price history.
+    """
+    if online is None:
+        online = get_config()["online_tools"]
+    path = price_file(symbol.upper(), online)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No price history for {symbol}: {path}")
+    return _load(path)
+
+
+def load_price_range(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    start_date: Annotated[str, "first date to load, yyyy-mm-dd"],
+    end_date: Annotated[str, "last date to load, yyyy-mm-dd"],
+    online: Annotated[bool, "use the online price cache instead of the offline data"] = None,
+) -> pd.DataFrame:
+    """Daily OHLCV history of a ticker between two dates, inclusive.
+
+    Only the rows in range are read from disk (the price files are sorted
+    by date), so short windows cost a fraction of ``load_price_history``.
+    Raises FileNotFoundError when the ticker has no price history.
+    """
+    if online is None:
+        online = get_config()["online_tools"]
+    path = price_file(symbol.upper(), online)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No price history for {symbol}: {path}")
+    return _read_range(path, str(start_date)[:10], str(end_date)[:10])
@@ -1,3 +1,4 @@
+import functools
 import requests
 import time
 import json
@@ -7,6 +8,9 @@ from typing import Annotated
 import os
 import re
 
+from .ingest import load_converted
+
+
 ticker_to_company = {
     "AAPL": "Apple",
     "MSFT": "Microsoft",
@@ -49,6 +53,102 @@ ticker_to_company = {
 }
 
 
+@functools.lru_cache(maxsize=256)
+def load_posts_by_date(
+    path: Annotated[str, "Path to a subreddit .jsonl dump"],
+):
+    """Parse a subreddit dump once, grouping its posts by UTC posting date.
+
+    Every ticker and every day of a look-back window reads the same files, so
+    they are parsed on first use and served from memory afterwards. Dumps
+    converted by ``ingest_data_dir`` are loaded already grouped.
+    """
+    posts_by_date = load_converted(path)
+    if posts_by_date is not None:
+        return posts_by_date
+    return parse_posts_by_date(path)
+
+
+def parse_posts_by_date(
+    path: Annotated[str, "Path to a subreddit .jsonl dump"],
+):
+    """Group the posts of a subreddit dump by UTC posting date."""
+    posts_by_date = {}
+    with open(path, "rb") as f:
+        for line in f:
+            # skip empty lines
+            if not line.strip():
+                continue
+
+            parsed_line = json.loads(line)
+            post_date = datetime.utcfromtimestamp(parsed_line["created_utc"]).strftime(
+                "%Y-%m-%d"
+            )
+            posts_by_date.setdefault(post_date, []).append(
+                {
+                    "title": parsed_line["title"],
+                    "content": parsed_line["selftext"],
+                    "url": parsed_line["url"],
+                    "upvotes": parsed_line["ups"],
+                    "posted_date": post_date,
+                }
+            )
+    return posts_by_date
+
+
+def load_category(
+    category: Annotated[str, "Category of subreddits, e.g. company_news"],
+    data_path: Annotated[str, "Path to the data folder."] = "reddit_data",
+):
+    """Parse every subreddit dump of a category in one pass."""
+    for data_file in os.listdir(os.path.join(data_path, category)):
+        if data_file.endswith(".jsonl"):
+            load_posts_by_date(os.path.join(data_path, category, data_file))
+
+
+def company_search_terms(
+    query: Annotated[str, "ticker symbol of the company"],
+):
+    """Names a post may use for the company: its name(s) and the ticker."""
+    search_terms = []
+    if "OR" in ticker_to_company[query]:
+        search_terms = ticker_to_company[query].split(" OR ")
+    else:
+        search_terms = [ticker_to_company[query]]
+
+    search_terms.append(query)
+    return search_terms
+
+
+def mentions_company(post, search_terms):
+    """Whether the title or the content of a post mentions any of the terms."""
+    for term in search_terms:
+        if re.search(term, post["title"], re.IGNORECASE) or re.search(
+            term, post["content"], re.IGNORECASE
+        ):
+            return True
+    return False
+
+
+def company_post_counts(
+    query: Annotated[str, "ticker symbol of the company"],
+    data_path: Annotated[str, "Path to the data folder."] = "reddit_data",
+):
+    """Number of company_news posts mentioning the company, per posting date."""
+    search_terms = company_search_terms(query)
+    counts = {}
+    category_path = os.path.join(data_path, "company_news")
+    for data_file in os.listdir(category_path):
+        if not data_file.endswith(".jsonl"):
+            continue
+        posts_by_date = load_posts_by_date(os.path.join(category_path, data_file))
+        for post_date, posts in posts_by_date.items():
+            found = sum(mentions_company(post, search_terms) for post in posts)
+            if found:
+                counts[post_date] = counts.get(post_date, 0) + found
+    return counts
+
+
 def fetch_top_from_category(
     category: Annotated[
         str, "Category to fetch top post from. Collection of subreddits."
@@ -81,51 +181,16 @@ def fetch_top_from_category(
 
         all_content_curr_subreddit = []
 
-        with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
-                # skip empty lines
-                if not line.strip():
+        # select only posts that are from the date
+        for post in load_posts_by_date(os.path.join(base_path, category, data_file)).get(
+            date, []
+        ):
+            # if is company_news, check that the title or the content has the company's name (query) mentioned
+            if "company" in category and query:
+                if not mentions_company(post, company_search_terms(query)):
                     continue
 
-                parsed_line = json.loads(line)
-
-                # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
-                if post_date != date:
-                    continue
-
-                # if is company_news, check that the title or the content has the company's name (query) mentioned
-                if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
-                        continue
-
-                post = {
-                    "title": parsed_line["title"],
-                    "content": parsed_line["selftext"],
-                    "url": parsed_line["url"],
-                    "upvotes": parsed_line["ups"],
-                    "posted_date": post_date,
-                }
-
-                all_content_curr_subreddit.append(post)
+            all_content_curr_subreddit.append(post)
 
         # sort all_content_curr_subreddit by upvote_ratio in descending order
         all_content_curr_subreddit.sort(key=lambda x: x["upvotes"], reverse=True)
@@ -0,0 +1,274 @@
+import functools
+import json
+import os
+from datetime import datetime
+from typing import Annotated, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from .config import get_config
+from .finnhub_utils import get_data_in_range
+from .indicators import SUPPORTED_INDICATORS, compute_indicators
+from .ingest import frame_arrays, load_simfin_rows, read_frame
+from .price_store import load_price_history, offline_price_file, read_price_file
+from .reddit_utils import fetch_top_from_category, ticker_to_company
+
+
+BUNDLE_VERSION = 2
+BUNDLE_FILE = "{ticker}-{start_date}-{end_date}.bundle"
+DEFAULT_BUNDLE_LOOKBACK_DAYS = 90  # calendar days of news, filings and indicators before the first date
+REDDIT_POSTS_PER_DAY = 5  # the limit the Reddit tools use
+FINNHUB_DATA_TYPES = ["news_data", "insider_senti", "insider_trans"]
+SIMFIN_STATEMENTS = {
+    "balance_sheet": "balance",
+    "cash_flow": "cashflow",
+    "income_statements": "income",
+}
+
+
+def _simfin_path(data_dir: str, statement: str, freq: str) -> str:
+    return os.path.join(
+        data_dir,
+        "fundamental_data",
+        "simfin_data_all",
+        statement,
+        "companies",
+        "us",
+        f"us-{SIMFIN_STATEMENTS[statement]}-{freq}.csv",
+    )
+
+
+class RunBundle:
+    """All offline tool inputs of one ticker for a range of trade dates.
+
+    Each source is kept in the form the tools read it (raw price rows,
+    Finnhub entries by date, the ticker's SimFin rows, the Reddit posts each
+    day's lookup returns and the indicator series), so the tools produce the
+    same output as from the raw files. ``None`` marks a source that was not
+    available when the bundle was built; the tools then read the raw data.
+    """
+
+    def __init__(self, data: Dict):
+        self.ticker: str = data["ticker"]
+        self.start_date: str = data["start_date"]
+        self.end_date: str = data["end_date"]
+        self.data_start: str = data["data_start"]
+        self.prices: Optional[pd.DataFrame] = data["prices"]
+        self.indicators: Optional[Dict[str, Dict[str, float]]] = data["indicators"]
+        self.finnhub: Dict[str, Optional[Dict]] = data["finnhub"]
+        self.simfin: Dict[str, Optional[pd.DataFrame]] = data["simfin"]
+        self.reddit: Dict[str, Optional[Dict[str, List]]] = data["reddit"]
+
+    def covers(self, start_date: str, end_date: str) -> bool:
+        """Whether the bundle holds the data of every date from ``start_date`` to ``end_date``."""
+        return self.data_start <= start_date and end_date <= self.end_date
+
+    def finnhub_data(self, data_type: str, start_date: str, end_date: str) -> Optional[Dict]:
+        """``get_data_in_range`` from the bundle, or None when not covered."""
+        data = self.finnhub.get(data_type)
+        if data is None or not self.covers(start_date, end_date):
+            return None
+        return {day: value for day, value in data.items() if start_date <= day <= end_date}
+
+    def simfin_rows(self, statement: str, freq: str) -> Optional[pd.DataFrame]:
+        """The ticker's rows of a SimFin statement table, or None when not bundled."""
+        rows = self.simfin.get(f"{statement}-{freq}")
+        return None if rows is None else rows.copy()
+
+    def reddit_posts(self, category: str, date: str, max_limit: int) -> Optional[List]:
+        """``fetch_top_from_category`` from the bundle, or None when not covered."""
+        posts = self.reddit.get(category)
+        if posts is None or max_limit != REDDIT_POSTS_PER_DAY or not self.covers(date, date):
+            return None
+        return list(posts.get(date, []))
+
+    def indicator_values(self, indicator: str, start_date: str, end_date: str) -> Optional[Dict]:
+        """Indicator values by session date, or None when not covered."""
+        if self.indicators is None or indicator not in self.indicators:
+            return None
+        if not self.covers(start_date, end_date):
+            return None
+        return self.indicators[indicator]
+
+
+def bundle_dir() -> str:
+    return get_config()["run_bundle_dir"]
+
+
+def build_run_bundle(
+    ticker: Annotated[str, "ticker symbol of the company"],
+    start_date: Annotated[str, "first trade date the bundle serves, yyyy-mm-dd"],
+    end_date: Annotated[str, "last trade date the bundle serves, yyyy-mm-dd"],
+    lookback_days: Annotated[int, "calendar days of data kept before start_date"] = DEFAULT_BUNDLE_LOOKBACK_DAYS,
+    path: Annotated[Optional[str], "output file (default in config['run_bundle_dir'])"] = None,
+) -> str:
+    """Gather every offline input of a ticker for the trade dates into one compressed file.
+
+    The file is a compressed npz: the price and SimFin frames as plain
+    arrays and the rest as JSON, so loading it cannot run code. Returns the
+    path of the bundle. Sources missing from the data directory
+    are recorded as missing, and the tools fall back to the raw files.
+    """
+    ticker = ticker.upper()
+    data_dir = get_config()["data_dir"]
+    data_start = (
+        datetime.strptime(start_date, "%Y-%m-%d") - relativedelta(days=lookback_days)
+    ).strftime("%Y-%m-%d")
+    days = pd.date_range(data_start, end_date).strftime("%Y-%m-%d")
+
+    prices = indicators = None
+    if os.path.exists(offline_price_file(ticker)):
+        prices = read_price_file(offline_price_file(ticker))
+        history = load_price_history(ticker, online=False)
+        in_range = (history.index >= data_start) & (history.index <= end_date)
+        sessions = history.index[in_range].strftime("%Y-%m-%d")
+        computed = compute_indicators(history, SUPPORTED_INDICATORS)
+        indicators = {
+            name: dict(zip(sessions, values[in_range].tolist()))
+            for name, values in computed.items()
+        }
+
+    finnhub = {}
+    for data_type in FINNHUB_DATA_TYPES:
+        try:
+            finnhub[data_type] = get_data_in_range(ticker, data_start, end_date, data_type, data_dir)
+        except FileNotFoundError:
+            finnhub[data_type] = None
+
+    simfin = {}
+    for statement in SIMFIN_STATEMENTS:
+        for freq in ("annual", "quarterly"):
+            table_path = _simfin_path(data_dir, statement, freq)
+            if os.path.exists(table_path):
+                simfin[f"{statement}-{freq}"] = load_simfin_rows(table_path, ticker)
+            else:
+                simfin[f"{statement}-{freq}"] = None
+
+    reddit_path = os.path.join(data_dir, "reddit_data")
+    reddit = {}
+    for category, query in (("global_news", None), ("company_news", ticker)):
+        if not os.path.isdir(os.path.join(reddit_path, category)) or (
+            query is not None and query not in ticker_to_company
+        ):
+            reddit[category] = None
+            continue
+        try:
+            reddit[category] = {
+                day: fetch_top_from_category(
+                    category, day, REDDIT_POSTS_PER_DAY, query, data_path=reddit_path
+                )
+                for day in days
+            }
+        except ValueError as e:
+            print(f"Not bundling Reddit {category}: {e}")
+            reddit[category] = None
+
+    meta = {
+        "version": BUNDLE_VERSION,
+        "ticker": ticker,
+        "start_date": start_date,
+        "end_date": end_date,
+        "data_start": data_start,
+        "prices": prices is not None,
+        "indicators": indicators,
+        "finnhub": finnhub,
+        "simfin": {key: rows is not None for key, rows in simfin.items()},
+        "reddit": reddit,
+    }
+    arrays = {"meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)}
+    if prices is not None:
+        arrays.update(frame_arrays(prices, "prices."))
+    for key, rows in simfin.items():
+        if rows is not None:
+            arrays.update(frame_arrays(rows, f"simfin.{key}."))
+
+    if path is None:
+        os.makedirs(bundle_dir(), exist_ok=True)
+        path = os.path.join(
+            bundle_dir(),
+            BUNDLE_FILE.format(ticker=ticker, start_date=start_date, end_date=end_date),
+        )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_watchlist_bundles(
+    tickers: Annotated[List[str], "ticker symbols of the watchlist"],
+    start_date: Annotated[str, "first trade date, yyyy-mm-dd"],
+    end_date: Annotated[Optional[str], "last trade date, yyyy-mm-dd (default start_date)"] = None,
+    lookback_days: Annotated[int, "calendar days of data kept before start_date"] = DEFAULT_BUNDLE_LOOKBACK_DAYS,
+) -> Dict[str, str]:
+    """Build the bundles of a watchlist ahead of its runs. Returns ticker -> path."""
+    paths = {}
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        try:
+            paths[ticker] = build_run_bundle(ticker, start_date, end_date or start_date, lookback_days)
+        except Exception as e:
+            print(f"Building the run bundle of {ticker} failed: {e}")
+    return paths
+
+
+@functools.lru_cache(maxsize=64)
+def _read_bundle(path: str, version: int) -> RunBundle:
+    with np.load(path, allow_pickle=False) as arrays:
+        data = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+        if data.get("version") != BUNDLE_VERSION:
+            raise ValueError(
+                f"bundle version {data.get('version')}, expected {BUNDLE_VERSION}"
+            )
+        data["prices"] = read_frame(arrays, "prices.") if data["prices"] else None
+        data["simfin"] = {
+            key: read_frame(arrays, f"simfin.{key}.") if bundled else None
+            for key, bundled in data["simfin"].items()
+        }
+    return RunBundle(data)
+
+
+def load_run_bundle(path: Annotated[str, "bundle file"]) -> RunBundle:
+    """Read a bundle with one sequential read; cached until the file changes.
+
+    Raises ValueError for a bundle of another ``BUNDLE_VERSION`` (build it
+    again) or a file that is not a bundle.
+    """
+    return _read_bundle(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _bundle_index(directory: str, version: int) -> List:
+    index = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".bundle"):
+            continue
+        parts = name[: -len(".bundle")].rsplit("-", 6)
+        if len(parts) != 7:
+            continue
+        ticker = parts[0]
+        start_date, end_date = "-".join(parts[1:4]), "-".join(parts[4:7])
+        index.append((ticker, start_date, end_date, os.path.join(directory, name)))
+    return index
+
+
+def find_run_bundle(
+    ticker: Annotated[Optional[str], "ticker symbol, or None for any ticker"],
+    date: Annotated[str, "trade date the bundle must serve, yyyy-mm-dd"],
+) -> Optional[RunBundle]:
+    """A bundle in ``config["run_bundle_dir"]`` serving the ticker on ``date``, if any."""
+    directory = bundle_dir()
+    if not directory:
+        return None
+    try:
+        version = os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    for bundle_ticker, start_date, end_date, path in _bundle_index(directory, version):
+        if (ticker is None or bundle_ticker == ticker.upper()) and start_date <= date <= end_date:
+            try:
+                return load_run_bundle(path)
+            except (ValueError, OSError, KeyError) as e:
+                print(f"Ignoring run bundle {path}: {e}")
+    return None
@@ -4,6 +4,31 @@ from stockstats import wrap
 from typing import Annotated
 import os
 from .config import get_config
+from .indicators import compute_indicator, is_supported
+from .ingest import load_converted
+
+
+def online_data_file(
+    symbol: Annotated[str, "ticker symbol for the company"],
+):
+    """Cache file of the 15-year online price history, with its start and end dates."""
+    # Get today's date as YYYY-mm-dd to add to cache
+    today_date = pd.Timestamp.today()
+
+    end_date = today_date
+    start_date = today_date - pd.DateOffset(years=15)
+    start_date = start_date.strftime("%Y-%m-%d")
+    end_date = end_date.strftime("%Y-%m-%d")
+
+    # Get config and ensure cache directory exists
+    config = get_config()
+    os.makedirs(config["data_cache_dir"], exist_ok=True)
+
+    data_file = os.path.join(
+        config["data_cache_dir"],
+        f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+    )
+    return data_file, start_date, end_date
 
 
 class StockstatsUtils:
@@ -30,33 +55,19 @@ class StockstatsUtils:
 
         if not online:
             try:
-                data = pd.read_csv(
-                    os.path.join(
-                        data_dir,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
+                data_file = os.path.join(
+                    data_dir,
+                    f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
                 )
+                data = load_converted(data_file)
+                if data is None:
+                    data = pd.read_csv(data_file)
                 df = wrap(data)
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
             curr_date = pd.to_datetime(curr_date)
-
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
-
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
-
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
+            data_file, start_date, end_date = online_data_file(symbol)
 
             if os.path.exists(data_file):
                 data = pd.read_csv(data_file)
@@ -77,6 +88,14 @@ class StockstatsUtils:
             df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
             curr_date = curr_date.strftime("%Y-%m-%d")
 
+        if is_supported(indicator):
+            # Same values as stockstats, computed natively on the raw columns
+            values = compute_indicator(data, indicator)
+            matching = df["Date"].astype(str).str.startswith(curr_date).to_numpy()
+            if matching.any():
+                return values[matching.argmax()]
+            return "N/A: Not a trading day (weekend or holiday)"
+
         df[indicator]  # trigger stockstats to calculate the indicator
         matching_rows = df[df["Date"].str.startswith(curr_date)]
 
@@ -0,0 +1,197 @@
+import functools
+import os
+from datetime import date, timedelta
+from typing import Annotated, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .price_store import offline_price_file
+
+
+CALENDAR_START = "1990-01-01"
+
+# Unscheduled full-day NYSE closures
+NYSE_SPECIAL_CLOSURES = [
+    "1994-04-27",  # President Nixon's funeral
+    "2001-09-11",  # September 11 attacks
+    "2001-09-12",
+    "2001-09-13",
+    "2001-09-14",
+    "2004-06-11",  # President Reagan's funeral
+    "2007-01-02",  # President Ford's funeral
+    "2012-10-29",  # Hurricane Sandy
+    "2012-10-30",
+    "2018-12-05",  # President G. H. W. Bush's funeral
+    "2025-01-09",  # President Carter's funeral
+]
+
+DateLike = Annotated[object, "date as yyyy-mm-dd string, date, datetime or Timestamp"]
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``-th given weekday of a month (``n=-1`` for the last one)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    j, k = c // 4, c % 4
+    m = (a + 11 * h) // 319
+    r = (2 * e + 2 * j - k - h + m + 32) % 7
+    month = (h - m + r + 90) // 25
+    return date(year, month, (h - m + r + month + 19) % 32)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday ones on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> List[date]:
+    """Scheduled full-day NYSE holidays of a year."""
+    holidays = [
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    ]
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # not moved back into December
+        holidays.append(_observed(new_year))
+    if year >= 1998:
+        holidays.append(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+HOLIDAY_RULES: Dict[str, Callable[[int], List[date]]] = {
+    "NYSE": nyse_holidays,
+    "NASDAQ": nyse_holidays,
+}
+SPECIAL_CLOSURES: Dict[str, List[str]] = {
+    "NYSE": NYSE_SPECIAL_CLOSURES,
+    "NASDAQ": NYSE_SPECIAL_CLOSURES,
+}
+
+
+def _day(value: DateLike) -> np.datetime64:
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]")
+    return np.datetime64(str(value)[:10], "D")
+
+
+class TradingCalendar:
+    """Sorted session dates of an exchange with O(log n) lookups.
+
+    Dates may be given as ``yyyy-mm-dd`` strings, dates, datetimes or
+    Timestamps; sessions are returned as ``yyyy-mm-dd`` strings.
+    """
+
+    def __init__(self, sessions, exchange: str = "NYSE"):
+        self.exchange = exchange
+        self.sessions = np.unique(np.asarray(sessions, dtype="datetime64[D]"))
+
+    @classmethod
+    def from_rules(cls, exchange: str, start: DateLike, end: DateLike) -> "TradingCalendar":
+        """Weekdays between two dates without the exchange's holidays and closures."""
+        start, end = _day(start), _day(end)
+        days = np.arange(start, end + 1, dtype="datetime64[D]")
+        days = days[np.is_busday(days)]
+        first, last = pd.Timestamp(start).year, pd.Timestamp(end).year
+        closed = [
+            holiday for year in range(first, last + 1) for holiday in HOLIDAY_RULES[exchange](year)
+        ]
+        closed = np.array(closed + SPECIAL_CLOSURES.get(exchange, []), dtype="datetime64[D]")
+        return cls(days[~np.isin(days, closed)], exchange)
+
+    def restricted_to(self, observed) -> "TradingCalendar":
+        """Within the span of ``observed`` sessions (local price data), keep only those."""
+        observed = np.unique(np.asarray(observed, dtype="datetime64[D]"))
+        if not len(observed):
+            return self
+        inside = (self.sessions >= observed[0]) & (self.sessions <= observed[-1])
+        keep = ~inside | np.isin(self.sessions, observed)
+        return TradingCalendar(self.sessions[keep], self.exchange)
+
+    def _check(self, position: int, date: DateLike) -> str:
+        if not 0 <= position < len(self.sessions):
+            raise ValueError(f"{date} is outside the {self.exchange} calendar")
+        return str(self.sessions[position])
+
+    def is_trading_day(self, date: DateLike) -> bool:
+        day = _day(date)
+        position = np.searchsorted(self.sessions, day)
+        return bool(position < len(self.sessions) and self.sessions[position] == day)
+
+    def next_session(self, date: DateLike, inclusive: bool = False) -> str:
+        """First session after ``date`` (on or after it when ``inclusive``)."""
+        side = "left" if inclusive else "right"
+        return self._check(int(np.searchsorted(self.sessions, _day(date), side=side)), date)
+
+    def previous_session(self, date: DateLike, inclusive: bool = False) -> str:
+        """Last session before ``date`` (on or before it when ``inclusive``)."""
+        side = "right" if inclusive else "left"
+        return self._check(int(np.searchsorted(self.sessions, _day(date), side=side)) - 1, date)
+
+    def offset(self, date: DateLike, sessions: int) -> str:
+        """The session ``sessions`` sessions after (negative: before) the last one on or before ``date``.
+
+        Clamped to the calendar's first and last sessions.
+        """
+        position = int(np.searchsorted(self.sessions, _day(date), side="right")) - 1
+        position = min(max(position + sessions, 0), len(self.sessions) - 1)
+        return str(self.sessions[position])
+
+    def sessions_in_range(self, start: DateLike, end: DateLike) -> List[str]:
+        """Sessions between two dates, inclusive, in order."""
+        lo = np.searchsorted(self.sessions, _day(start), side="left")
+        hi = np.searchsorted(self.sessions, _day(end), side="right")
+        return self.sessions[lo:hi].astype(str).tolist()
+
+
+@functools.lru_cache(maxsize=8)
+def _build_calendar(exchange: str, end_year: int, reference_file: Optional[str]) -> TradingCalendar:
+    calendar = TradingCalendar.from_rules(exchange, CALENDAR_START, f"{end_year}-12-31")
+    if reference_file and os.path.exists(reference_file):
+        dates = pd.read_csv(reference_file, usecols=["Date"])["Date"].astype(str).str[:10]
+        calendar = calendar.restricted_to(dates.to_numpy().astype("datetime64[D]"))
+    return calendar
+
+
+def get_trading_calendar(
+    exchange: Annotated[str, "exchange whose sessions to use, e.g. NYSE"] = "NYSE",
+) -> TradingCalendar:
+    """The exchange's calendar from its holiday rules, checked against local data.
+
+    Within the span of the offline price history of
+    ``config["trading_calendar_reference"]`` its sessions are used as they
+    are, so closures missing from the rules are still skipped.
+    """
+    exchange = exchange.upper()
+    if exchange not in HOLIDAY_RULES:
+        raise ValueError(
+            f"No trading calendar for {exchange}. Please choose from: {list(HOLIDAY_RULES)}"
+        )
+    reference = get_config().get("trading_calendar_reference")
+    reference_file = None
+    if reference:
+        reference_file = offline_price_file(reference)
+    return _build_calendar(exchange, date.today().year + 1, reference_file)
@@ -27,13 +27,11 @@ def decorate_all_methods(decorator):
 
 
 def get_next_weekday(date):
+    """The date itself if it is a trading session, else the next session (NYSE calendar)."""
+    from .trading_calendar import get_trading_calendar
 
     if not isinstance(date, datetime):
         date = datetime.strptime(date, "%Y-%m-%d")
 
-    if date.weekday() >= 5:
-        days_to_add = 7 - date.weekday()
-        next_weekday = date + timedelta(days=days_to_add)
-        return next_weekday
-    else:
-        return date
+    next_session = get_trading_calendar().next_session(date, inclusive=True)
+    return datetime.strptime(next_session, "%Y-%m-%d")
@@ -8,6 +8,18 @@ DEFAULT_CONFIG = {
         os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
         "dataflows/data_cache",
     ),
+    "indicator_store_dir": os.path.join(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+        "dataflows/data_cache/indicator_store",
+    ),
+    "run_bundle_dir": os.path.join(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+        "dataflows/data_cache/run_bundles",
+    ),
+    "ingested_data_dir": os.path.join(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+        "dataflows/data_cache/ingested",
+    ),
     # LLM settings
     "llm_provider": "openai",
     "deep_think_llm": "o4-mini",
@@ -17,8 +29,45 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    "max_concurrent_runs": 4,  # tickers analysed at once by propagate_many
+    "screen_top_n": None,  # propagate_many only runs the top N tickers of the universe screen
+    "screen_weights": None,  # {feature: weight} for the screen score; None uses the defaults
+    "screen_min_history": 252,  # sessions of price history a ticker needs to be ranked
+    "screen_min_dollar_volume": 0.0,  # minimum 20-day average traded value
+    "backtest_holding_period": 1,  # sessions between a decision and its realized return
+    "backtest_freeze_memory": False,  # keep memories at their snapshot so dates run concurrently
+    "backtest_triggers": None,  # None runs every session; True or {rule: params} runs flagged ones
+    "trading_calendar_reference": "SPY",  # offline price history whose sessions correct the NYSE rules
+    "checkpoint_dir": None,  # save run state to SQLite here so failed runs can be resumed
+    "debate_mode": "sequential",  # "sequential" or "parallel_opening" (bull and bear open at once)
+    "risk_debate_mode": "sequential",  # "sequential" or "parallel" (all three debators per round at once)
+    "adaptive_debate_stopping": False,  # end debates early once stances converge or arguments repeat
+    "debate_convergence_threshold": 0.9,  # similarity between a speaker's turns that counts as repeating
+    "skip_risk_debate_when_unanimous": False,  # analysts, research manager and trader agree -> Risk Judge
+    # Memory settings
+    "embedding_backend": "auto",  # "auto", "openai" or "local"
+    "local_embedding_dim": 384,
+    "embedding_chunk_chars": 4000,  # longer report sections are split into chunks
+    "embedding_max_chunks": 32,
+    "memory_scoring": "pooled",  # "pooled" or "maxsim" (NumPy backend only)
+    "memory_backend": "chromadb",  # "chromadb" or "numpy"
+    "memory_dir": None,  # persist NumPy memories here when set
+    "memory_quantization": None,  # None, "float16" or "int8" (NumPy backend only)
+    "memory_rescore_factor": 4,  # rescore top k * factor in float32; 0 disables
+    "memory_capacity": None,  # max entries per memory; None is unbounded
+    "memory_ticker_quota": None,  # max entries per ticker
+    "memory_eviction": "oldest",  # "oldest" or "least_retrieved"
+    "memory_dedup_threshold": 0.98,  # skip inserts this similar to a stored entry
+    "memory_merge_threshold": 0.95,  # compaction merges entries above this
+    "memory_compaction_interval": None,  # seconds between background compactions
+    "memory_retrieval_scope": "all",  # "all", "ticker" or "sector"
+    "memory_point_in_time": True,  # only retrieve lessons whose outcome was realized by the trade date
     # Tool settings
     "online_tools": True,
+    "max_analyst_tool_iterations": 8,  # LLM/tool rounds per analyst before forcing a report
+    "tool_timeout": 60,  # seconds per tool call
+    "max_tool_workers": 8,  # concurrent tool calls per analyst turn
+    "max_tool_calls_in_flight": 16,  # across all analysts and runs in the process
     # Language settings
     "output_language": "chinese",
 }
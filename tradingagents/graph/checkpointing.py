@@ -0,0 +1,57 @@
+# TradingAgents/graph/checkpointing.py
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List
+
+
+_INSTALL_HINT = (
+    "Checkpointing needs the SQLite checkpointer: pip install langgraph-checkpoint-sqlite"
+)
+
+
+def checkpoint_path(checkpoint_dir: str) -> str:
+    """Path of the SQLite database holding the run checkpoints."""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    return os.path.join(checkpoint_dir, "checkpoints.sqlite")
+
+
+def create_checkpointer(checkpoint_dir: str):
+    """Create a SQLite checkpointer for synchronous graph runs."""
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ImportError(_INSTALL_HINT) from e
+
+    # The analysts run in worker threads, so the connection is shared across threads
+    conn = sqlite3.connect(checkpoint_path(checkpoint_dir), check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+def create_async_checkpointer(checkpoint_dir: str):
+    """Async context manager yielding a SQLite checkpointer bound to the running loop."""
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise ImportError(_INSTALL_HINT) from e
+
+    return AsyncSqliteSaver.from_conn_string(checkpoint_path(checkpoint_dir))
+
+
+def config_hash(config: Dict[str, Any], selected_analysts: List[str]) -> str:
+    """Short stable hash of everything that changes what a run computes."""
+    payload = json.dumps(
+        {"config": config, "selected_analysts": list(selected_analysts)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def run_thread_id(
+    ticker: str, trade_date, config: Dict[str, Any], selected_analysts: List[str]
+) -> str:
+    """Checkpoint thread id for one run: ticker, trade date and config hash."""
+    return f"{ticker.upper()}:{trade_date}:{config_hash(config, selected_analysts)}"
@@ -1,15 +1,131 @@
 # TradingAgents/graph/conditional_logic.py
 
+import re
+
 from tradingagents.agents.utils.agent_states import AgentState
+from tradingagents.agents.utils.embeddings import HashingEmbedder
+
+
+_STANCE_PATTERNS = [
+    re.compile(r"FINAL TRANSACTION PROPOSAL:\s*\**\s*(BUY|SELL|HOLD)", re.IGNORECASE),
+    re.compile(
+        r"(?:recommendation|decision|stance)\s*[:：]\s*\**\s*(buy|sell|hold)\b",
+        re.IGNORECASE,
+    ),
+    re.compile(r"(?:建议|决策|决定|立场)\s*[:：]?\s*\**\s*(买入|卖出|持有)"),
+]
+_STANCE_LABELS = {"买入": "BUY", "卖出": "SELL", "持有": "HOLD"}
+
+
+def extract_stance(text):
+    """Return the BUY/SELL/HOLD stance a text commits to, or None.
+
+    Patterns are tried from most to least explicit; within a pattern the last
+    match wins since conclusions come at the end.
+    """
+    for pattern in _STANCE_PATTERNS:
+        matches = pattern.findall(text or "")
+        if matches:
+            label = matches[-1].upper()
+            return _STANCE_LABELS.get(label, label)
+    return None
+
+
+def split_turns(history, speaker):
+    """Split a speaker's history ("\\n<speaker> Analyst: ...") into turns."""
+    turns = re.split(rf"(?:^|\n){re.escape(speaker)} Analyst: ", history or "")
+    return [turn.strip() for turn in turns if turn.strip()]
 
 
 class ConditionalLogic:
     """Handles conditional logic for determining graph flow."""
 
-    def __init__(self, max_debate_rounds=1, max_risk_discuss_rounds=1):
+    def __init__(
+        self,
+        max_debate_rounds=1,
+        max_risk_discuss_rounds=1,
+        adaptive_stopping=False,
+        convergence_threshold=0.9,
+        skip_unanimous_risk_debate=False,
+    ):
         """Initialize with configuration parameters."""
         self.max_debate_rounds = max_debate_rounds
         self.max_risk_discuss_rounds = max_risk_discuss_rounds
+        self.adaptive_stopping = adaptive_stopping
+        self.convergence_threshold = convergence_threshold
+        self.skip_unanimous_risk_debate = skip_unanimous_risk_debate
+        self._embedder = HashingEmbedder()
+
+    def _repeating(self, turns_by_speaker):
+        """Whether every speaker's latest turn is near-identical to their previous one."""
+        for turns in turns_by_speaker:
+            if len(turns) < 2:
+                return False
+            previous, latest = self._embedder.embed(turns[-2:])
+            if float(previous @ latest) < self.convergence_threshold:
+                return False
+        return True
+
+    def debate_stop_reason(self, state: AgentState):
+        """Why the investment debate should stop now, or None to continue."""
+        debate_state = state["investment_debate_state"]
+        count = debate_state["count"]
+        if count >= 2 * self.max_debate_rounds:
+            return "max_rounds"
+        # Only check convergence once both sides have spoken in the round
+        if not self.adaptive_stopping or count == 0 or count % 2:
+            return None
+
+        bull_turns = split_turns(debate_state.get("bull_history", ""), "Bull")
+        bear_turns = split_turns(debate_state.get("bear_history", ""), "Bear")
+        stances = {extract_stance(turns[-1]) for turns in (bull_turns, bear_turns) if turns}
+        if len(stances) == 1 and None not in stances:
+            return "stance_converged"
+        if self._repeating([bull_turns, bear_turns]):
+            return "no_new_arguments"
+        return None
+
+    def is_unanimous(self, state: AgentState) -> bool:
+        """Whether every analyst report, the investment plan and the trader share one stance."""
+        texts = [
+            state.get(key, "")
+            for key in ("market_report", "sentiment_report", "news_report", "fundamentals_report")
+        ]
+        texts = [text for text in texts if text]
+        texts += [state.get("investment_plan", ""), state.get("trader_investment_plan", "")]
+        stances = {extract_stance(text) for text in texts}
+        return len(stances) == 1 and None not in stances
+
+    def risk_stop_reason(self, state: AgentState):
+        """Why the risk debate should stop now, or None to continue."""
+        risk_state = state["risk_debate_state"]
+        count = risk_state["count"]
+        if count == 0:
+            if self.skip_unanimous_risk_debate and self.is_unanimous(state):
+                return "unanimous"
+            return None
+        if count >= 3 * self.max_risk_discuss_rounds:
+            return "max_rounds"
+        # Only check convergence after complete rounds
+        if not self.adaptive_stopping or count % 3:
+            return None
+
+        speakers = ("risky", "safe", "neutral")
+        stances = {extract_stance(risk_state.get(f"current_{s}_response", "")) for s in speakers}
+        if len(stances) == 1 and None not in stances:
+            return "stance_converged"
+        turns = [
+            split_turns(risk_state.get(f"{s}_history", ""), s.capitalize()) for s in speakers
+        ]
+        if self._repeating(turns):
+            return "no_new_arguments"
+        return None
+
+    def should_start_risk_debate(self, state: AgentState) -> str:
+        """Skip the risk debate when analysts, research manager and trader agree."""
+        if self.risk_stop_reason(state) == "unanimous":
+            return "Risk Judge"
+        return "Risk Debate"
 
     def should_continue_market(self, state: AgentState):
         """Determine if market analysis should continue."""
@@ -46,9 +162,7 @@ class ConditionalLogic:
     def should_continue_debate(self, state: AgentState) -> str:
         """Determine if debate should continue."""
 
-        if (
-            state["investment_debate_state"]["count"] >= 2 * self.max_debate_rounds
-        ):  # 3 rounds of back-and-forth between 2 agents
+        if self.debate_stop_reason(state):  # round limit or convergence
             return "Research Manager"
         if state["investment_debate_state"]["current_response"].startswith("Bull"):
             return "Bear Researcher"
@@ -56,12 +170,16 @@ class ConditionalLogic:
 
     def should_continue_risk_analysis(self, state: AgentState) -> str:
         """Determine if risk analysis should continue."""
-        if (
-            state["risk_debate_state"]["count"] >= 3 * self.max_risk_discuss_rounds
-        ):  # 3 rounds of back-and-forth between 3 agents
+        if self.risk_stop_reason(state):  # round limit or convergence
             return "Risk Judge"
         if state["risk_debate_state"]["latest_speaker"].startswith("Risky"):
             return "Safe Analyst"
         if state["risk_debate_state"]["latest_speaker"].startswith("Safe"):
             return "Neutral Analyst"
         return "Risky Analyst"
+
+    def should_continue_risk_round(self, state: AgentState) -> str:
+        """Determine if another parallel risk round should run."""
+        if self.risk_stop_reason(state):
+            return "Risk Judge"
+        return "Parallel Risk Round"
@@ -1,6 +1,6 @@
 # TradingAgents/graph/reflection.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from langchain_openai import ChatOpenAI
 
 
@@ -46,14 +46,30 @@ Your goal is to deliver detailed insights into investment decisions and highligh
 Adhere strictly to these instructions, and ensure your output is detailed, accurate, and actionable. You will also be given objective descriptions of the market from a price movements, technical indicator, news, and sentiment perspective to provide more context for your analysis.
 """
 
+    def _extract_report_sections(self, current_state: Dict[str, Any]) -> List[str]:
+        """Extract the analyst reports that describe the current market situation."""
+        return [
+            current_state["market_report"],
+            current_state["sentiment_report"],
+            current_state["news_report"],
+            current_state["fundamentals_report"],
+        ]
+
+    def _extract_metadata(
+        self, current_state: Dict[str, Any], decision: str = "", exit_date: str = ""
+    ) -> Dict[str, Any]:
+        """Extract the metadata recorded with each memory entry."""
+        return {
+            "ticker": current_state["company_of_interest"],
+            "sector": current_state.get("company_sector", ""),
+            "trade_date": current_state["trade_date"],
+            "exit_date": exit_date,
+            "decision": decision,
+        }
+
     def _extract_current_situation(self, current_state: Dict[str, Any]) -> str:
         """Extract the current market situation from the state."""
-        curr_market_report = current_state["market_report"]
-        curr_sentiment_report = current_state["sentiment_report"]
-        curr_news_report = current_state["news_report"]
-        curr_fundamentals_report = current_state["fundamentals_report"]
-
-        return f"{curr_market_report}\n\n{curr_sentiment_report}\n\n{curr_news_report}\n\n{curr_fundamentals_report}"
+        return "\n\n".join(self._extract_report_sections(current_state))
 
     def _reflect_on_component(
         self, component_type: str, report: str, situation: str, returns_losses
@@ -70,7 +86,9 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         result = self.quick_thinking_llm.invoke(messages).content
         return result
 
-    def reflect_bull_researcher(self, current_state, returns_losses, bull_memory):
+    def reflect_bull_researcher(
+        self, current_state, returns_losses, bull_memory, decision="", exit_date=""
+    ):
         """Reflect on bull researcher's analysis and update memory."""
         situation = self._extract_current_situation(current_state)
         bull_debate_history = current_state["investment_debate_state"]["bull_history"]
@@ -78,9 +96,14 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         result = self._reflect_on_component(
             "BULL", bull_debate_history, situation, returns_losses
         )
-        bull_memory.add_situations([(situation, result)])
+        bull_memory.add_situations(
+            [(self._extract_report_sections(current_state), result)],
+            self._extract_metadata(current_state, decision, exit_date),
+        )
 
-    def reflect_bear_researcher(self, current_state, returns_losses, bear_memory):
+    def reflect_bear_researcher(
+        self, current_state, returns_losses, bear_memory, decision="", exit_date=""
+    ):
         """Reflect on bear researcher's analysis and update memory."""
         situation = self._extract_current_situation(current_state)
         bear_debate_history = current_state["investment_debate_state"]["bear_history"]
@@ -88,9 +111,14 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         result = self._reflect_on_component(
             "BEAR", bear_debate_history, situation, returns_losses
         )
-        bear_memory.add_situations([(situation, result)])
+        bear_memory.add_situations(
+            [(self._extract_report_sections(current_state), result)],
+            self._extract_metadata(current_state, decision, exit_date),
+        )
 
-    def reflect_trader(self, current_state, returns_losses, trader_memory):
+    def reflect_trader(
+        self, current_state, returns_losses, trader_memory, decision="", exit_date=""
+    ):
         """Reflect on trader's decision and update memory."""
         situation = self._extract_current_situation(current_state)
         trader_decision = current_state["trader_investment_plan"]
@@ -98,9 +126,14 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         result = self._reflect_on_component(
             "TRADER", trader_decision, situation, returns_losses
         )
-        trader_memory.add_situations([(situation, result)])
+        trader_memory.add_situations(
+            [(self._extract_report_sections(current_state), result)],
+            self._extract_metadata(current_state, decision, exit_date),
+        )
 
-    def reflect_invest_judge(self, current_state, returns_losses, invest_judge_memory):
+    def reflect_invest_judge(
+        self, current_state, returns_losses, invest_judge_memory, decision="", exit_date=""
+    ):
         """Reflect on investment judge's decision and update memory."""
         situation = self._extract_current_situation(current_state)
         judge_decision = current_state["investment_debate_state"]["judge_decision"]
@@ -108,9 +141,14 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         result = self._reflect_on_component(
             "INVEST JUDGE", judge_decision, situation, returns_losses
         )
-        invest_judge_memory.add_situations([(situation, result)])
+        invest_judge_memory.add_situations(
+            [(self._extract_report_sections(current_state), result)],
+            self._extract_metadata(current_state, decision, exit_date),
+        )
 
-    def reflect_risk_manager(self, current_state, returns_losses, risk_manager_memory):
+    def reflect_risk_manager(
+        self, current_state, returns_losses, risk_manager_memory, decision="", exit_date=""
+    ):
         """Reflect on risk manager's decision and update memory."""
         situation = self._extract_current_situation(current_state)
         judge_decision = current_state["risk_debate_state"]["judge_decision"]
@@ -118,4 +156,7 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         result = self._reflect_on_component(
             "RISK JUDGE", judge_decision, situation, returns_losses
         )
-        risk_manager_memory.add_situations([(situation, result)])
+        risk_manager_memory.add_situations(
+            [(self._extract_report_sections(current_state), result)],
+            self._extract_metadata(current_state, decision, exit_date),
+        )
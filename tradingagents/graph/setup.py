@@ -1,14 +1,27 @@
 # TradingAgents/graph/setup.py
 
+import asyncio
+import concurrent.futures
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph, START
-from langgraph.prebuilt import ToolNode
 
 from tradingagents.agents import *
 from tradingagents.agents.utils.agent_states import AgentState
 from tradingagents.agents.utils.agent_utils import Toolkit
 from .conditional_logic import ConditionalLogic
+from .tool_executor import ParallelToolExecutor
+
+
+# State key of each analyst's report
+REPORT_KEYS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
 
 
 class GraphSetup:
@@ -19,7 +32,7 @@ class GraphSetup:
         quick_thinking_llm: ChatOpenAI,
         deep_thinking_llm: ChatOpenAI,
         toolkit: Toolkit,
-        tool_nodes: Dict[str, ToolNode],
+        tool_nodes: Dict[str, ParallelToolExecutor],
         bull_memory,
         bear_memory,
         trader_memory,
@@ -40,7 +53,9 @@ class GraphSetup:
         self.conditional_logic = conditional_logic
 
     def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
+        self,
+        selected_analysts=["market", "social", "news", "fundamentals"],
+        checkpointer=None,
     ):
         """Set up and compile the agent workflow graph.
 
@@ -50,6 +65,7 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+            checkpointer: Optional LangGraph checkpointer saving state after each step
         """
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
@@ -115,20 +131,56 @@ class GraphSetup:
         # Add other nodes
         workflow.add_node("Bull Researcher", bull_researcher_node)
         workflow.add_node("Bear Researcher", bear_researcher_node)
-        workflow.add_node("Research Manager", research_manager_node)
+        workflow.add_node(
+            "Research Manager",
+            self._with_stop_reason(
+                research_manager_node,
+                "debate_stop_reason",
+                self.conditional_logic.debate_stop_reason,
+            ),
+        )
         workflow.add_node("Trader", trader_node)
-        workflow.add_node("Risky Analyst", risky_analyst)
-        workflow.add_node("Neutral Analyst", neutral_analyst)
-        workflow.add_node("Safe Analyst", safe_analyst)
-        workflow.add_node("Risk Judge", risk_manager_node)
+        workflow.add_node(
+            "Risk Judge",
+            self._with_stop_reason(
+                risk_manager_node,
+                "risk_stop_reason",
+                self.conditional_logic.risk_stop_reason,
+            ),
+        )
 
         # Create parallel analyst execution node
-        parallel_analysis_node = self._create_parallel_analyst_node(analyst_nodes, selected_analysts)
+        parallel_analysis_node = self._create_parallel_analyst_node(
+            analyst_nodes, selected_analysts, tool_nodes
+        )
         workflow.add_node("Parallel Analysis", parallel_analysis_node)
-        
+
+        # Retrieve every agent's memories at once, off the debate's critical path
+        workflow.add_node("Memory Retrieval", self._create_memory_retrieval_node())
+
         # Define edges for parallel execution
         workflow.add_edge(START, "Parallel Analysis")
-        workflow.add_edge("Parallel Analysis", "Bull Researcher")
+        workflow.add_edge("Parallel Analysis", "Memory Retrieval")
+
+        if self.toolkit.config.get("debate_mode", "sequential") == "parallel_opening":
+            # Neither side has anything to rebut yet, so both open at once
+            workflow.add_node(
+                "Opening Statements",
+                self._create_opening_statements_node(
+                    bull_researcher_node, bear_researcher_node
+                ),
+            )
+            workflow.add_edge("Memory Retrieval", "Opening Statements")
+            workflow.add_conditional_edges(
+                "Opening Statements",
+                self.conditional_logic.should_continue_debate,
+                {
+                    "Bull Researcher": "Bull Researcher",
+                    "Research Manager": "Research Manager",
+                },
+            )
+        else:
+            workflow.add_edge("Memory Retrieval", "Bull Researcher")
 
         # Add remaining edges
         workflow.add_conditional_edges(
@@ -148,28 +200,58 @@ class GraphSetup:
             },
         )
         workflow.add_edge("Research Manager", "Trader")
-        workflow.add_edge("Trader", "Risky Analyst")
-        workflow.add_conditional_edges(
-            "Risky Analyst",
-            self.conditional_logic.should_continue_risk_analysis,
-            {
-                "Safe Analyst": "Safe Analyst",
-                "Risk Judge": "Risk Judge",
-            },
-        )
-        workflow.add_conditional_edges(
-            "Safe Analyst",
-            self.conditional_logic.should_continue_risk_analysis,
-            {
-                "Neutral Analyst": "Neutral Analyst",
-                "Risk Judge": "Risk Judge",
-            },
-        )
+
+        if self.toolkit.config.get("risk_debate_mode", "sequential") == "parallel":
+            # All three debators answer the previous round at once
+            workflow.add_node(
+                "Parallel Risk Round",
+                self._create_risk_round_node(risky_analyst, safe_analyst, neutral_analyst),
+            )
+            first_risk_node = "Parallel Risk Round"
+            workflow.add_conditional_edges(
+                "Parallel Risk Round",
+                self.conditional_logic.should_continue_risk_round,
+                {
+                    "Parallel Risk Round": "Parallel Risk Round",
+                    "Risk Judge": "Risk Judge",
+                },
+            )
+        else:
+            workflow.add_node("Risky Analyst", risky_analyst)
+            workflow.add_node("Neutral Analyst", neutral_analyst)
+            workflow.add_node("Safe Analyst", safe_analyst)
+            first_risk_node = "Risky Analyst"
+            workflow.add_conditional_edges(
+                "Risky Analyst",
+                self.conditional_logic.should_continue_risk_analysis,
+                {
+                    "Safe Analyst": "Safe Analyst",
+                    "Risk Judge": "Risk Judge",
+                },
+            )
+            workflow.add_conditional_edges(
+                "Safe Analyst",
+                self.conditional_logic.should_continue_risk_analysis,
+                {
+                    "Neutral Analyst": "Neutral Analyst",
+                    "Risk Judge": "Risk Judge",
+                },
+            )
+            workflow.add_conditional_edges(
+                "Neutral Analyst",
+                self.conditional_logic.should_continue_risk_analysis,
+                {
+                    "Risky Analyst": "Risky Analyst",
+                    "Risk Judge": "Risk Judge",
+                },
+            )
+
+        # Unanimous decisions can go straight to the judge
         workflow.add_conditional_edges(
-            "Neutral Analyst",
-            self.conditional_logic.should_continue_risk_analysis,
+            "Trader",
+            self.conditional_logic.should_start_risk_debate,
             {
-                "Risky Analyst": "Risky Analyst",
+                "Risk Debate": first_risk_node,
                 "Risk Judge": "Risk Judge",
             },
         )
@@ -177,13 +259,87 @@ class GraphSetup:
         workflow.add_edge("Risk Judge", END)
 
         # Compile and return
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
 
-    def _create_parallel_analyst_node(self, analyst_nodes, selected_analysts):
+    def _create_parallel_analyst_node(self, analyst_nodes, selected_analysts, tool_nodes):
         """Create a node that executes all analysts in parallel."""
-        import asyncio
-        import concurrent.futures
-        
+
+        max_iterations = self.toolkit.config.get("max_analyst_tool_iterations", 8)
+
+        def wants_tools(analyst_type, state, messages):
+            should_continue = getattr(
+                self.conditional_logic, f"should_continue_{analyst_type}"
+            )
+            return should_continue({**state, "messages": messages}).startswith("tools_")
+
+        def limit_reached(analyst_type, messages):
+            # Iteration cap reached: ask for the report from the data gathered so far
+            print(f"⚠️ {analyst_type.capitalize()} 分析师达到工具调用上限 ({max_iterations})")
+            messages.append(
+                HumanMessage(
+                    content="Tool call limit reached. Do not call any more tools; "
+                    "write your final report now with the data you already have."
+                )
+            )
+
+        def final_report(analyst_type, result):
+            """Keep a report when the turn after the cap still asks for tools."""
+            message = result["messages"][-1]
+            if not getattr(message, "tool_calls", None):
+                return result
+            print(
+                f"⚠️ {analyst_type.capitalize()} 分析师在达到上限后仍请求工具调用，"
+                f"忽略 {len(message.tool_calls)} 个调用"
+            )
+            report = message.content if isinstance(message.content, str) else ""
+            return {
+                **result,
+                REPORT_KEYS[analyst_type]: report.strip()
+                or "Report unavailable: the analyst kept requesting tools after the tool call limit.",
+            }
+
+        def run_agent_loop(analyst_type, analyst_node, state):
+            """Alternate LLM turns and tool calls until the analyst writes its report."""
+            messages = list(state["messages"])
+
+            for _ in range(max_iterations):
+                result = analyst_node.invoke({**state, "messages": messages})
+                messages.extend(result["messages"])
+                if not wants_tools(analyst_type, state, messages):
+                    return result
+                # Tool calls from one turn run concurrently
+                messages.extend(tool_nodes[analyst_type].execute(messages[-1]))
+
+            limit_reached(analyst_type, messages)
+            return final_report(
+                analyst_type, analyst_node.invoke({**state, "messages": messages})
+            )
+
+        async def arun_agent_loop(analyst_type, analyst_node, state):
+            """Async agent loop: ``ainvoke`` the LLM and await the tools."""
+            messages = list(state["messages"])
+
+            for _ in range(max_iterations):
+                result = await analyst_node.ainvoke({**state, "messages": messages})
+                messages.extend(result["messages"])
+                if not wants_tools(analyst_type, state, messages):
+                    return result
+                messages.extend(await tool_nodes[analyst_type].aexecute(messages[-1]))
+
+            limit_reached(analyst_type, messages)
+            return final_report(
+                analyst_type, await analyst_node.ainvoke({**state, "messages": messages})
+            )
+
+        def merge_result(state, analyst_type, result):
+            """Merge an analyst's result into the main state."""
+            if isinstance(result, dict):
+                for key, value in result.items():
+                    if key != "messages":  # Don't merge messages to avoid conflicts
+                        state[key] = value
+
+            print(f"✅ {analyst_type.capitalize()} 分析师完成")
+
         def parallel_analysis(state):
             """Execute all analysts in parallel using ThreadPoolExecutor."""
             
@@ -192,11 +348,11 @@ class GraphSetup:
                 try:
                     # Create a copy of state for this analyst
                     analyst_state = state.copy()
-                    result = analyst_node(analyst_state)
+                    result = run_agent_loop(analyst_type, analyst_node, analyst_state)
                     return analyst_type, result
                 except Exception as e:
                     print(f"Error in {analyst_type} analyst: {e}")
-                    return analyst_type, {f"{analyst_type}_report": f"分析过程中出现错误: {str(e)}"}
+                    return analyst_type, {REPORT_KEYS[analyst_type]: f"分析过程中出现错误: {str(e)}"}
             
             # Execute all analysts in parallel
             with concurrent.futures.ThreadPoolExecutor(max_workers=len(selected_analysts)) as executor:
@@ -209,16 +365,179 @@ class GraphSetup:
                 # Collect results
                 for future in concurrent.futures.as_completed(future_to_analyst):
                     analyst_type, result = future.result()
-                    
-                    # Merge the result into the main state
-                    if isinstance(result, dict):
-                        for key, value in result.items():
-                            if key != "messages":  # Don't merge messages to avoid conflicts
-                                state[key] = value
-                    
-                    print(f"✅ {analyst_type.capitalize()} 分析师完成")
+                    merge_result(state, analyst_type, result)
             
             print("🚀 所有分析师并行执行完成！")
             return state
-        
-        return parallel_analysis
+
+        async def aparallel_analysis(state):
+            """Execute all analysts concurrently on the event loop."""
+
+            async def run_analyst(analyst_type, analyst_node):
+                try:
+                    result = await arun_agent_loop(analyst_type, analyst_node, state.copy())
+                except Exception as e:
+                    print(f"Error in {analyst_type} analyst: {e}")
+                    result = {REPORT_KEYS[analyst_type]: f"分析过程中出现错误: {str(e)}"}
+                merge_result(state, analyst_type, result)
+
+            await asyncio.gather(
+                *(
+                    run_analyst(analyst_type, analyst_nodes[analyst_type])
+                    for analyst_type in selected_analysts
+                )
+            )
+
+            print("🚀 所有分析师并行执行完成！")
+            return state
+
+        return RunnableLambda(parallel_analysis, afunc=aparallel_analysis)
+
+    def _with_stop_reason(self, judge_node, key, stop_reason):
+        """Record why the preceding debate stopped alongside the judge's output."""
+
+        def judge(state):
+            return {**judge_node.invoke(state), key: stop_reason(state) or ""}
+
+        async def ajudge(state):
+            return {**(await judge_node.ainvoke(state)), key: stop_reason(state) or ""}
+
+        return RunnableLambda(judge, afunc=ajudge)
+
+    def _create_concurrent_node(self, nodes, merge):
+        """Create a node that runs several LLM nodes on the same state at once.
+
+        ``nodes`` maps a key to an LLM node; ``merge(state, results)`` combines
+        their state updates, keyed the same way, into one update.
+        """
+
+        def run_concurrently(state):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+                futures = {key: executor.submit(node.invoke, state) for key, node in nodes.items()}
+                return merge(state, {key: future.result() for key, future in futures.items()})
+
+        async def arun_concurrently(state):
+            results = await asyncio.gather(*(node.ainvoke(state) for node in nodes.values()))
+            return merge(state, dict(zip(nodes, results)))
+
+        return RunnableLambda(run_concurrently, afunc=arun_concurrently)
+
+    def _create_opening_statements_node(self, bull_researcher_node, bear_researcher_node):
+        """Create a node producing the bull and bear opening arguments concurrently."""
+
+        def merge_openings(state, results):
+            investment_debate_state = state["investment_debate_state"]
+            bull_argument = results["bull"]["investment_debate_state"]["current_response"]
+            bear_argument = results["bear"]["investment_debate_state"]["current_response"]
+
+            # Recorded as if the bull spoke first and the bear replied, so the
+            # alternation continues with the bull's rebuttal.
+            return {
+                "investment_debate_state": {
+                    "history": investment_debate_state.get("history", "")
+                    + "\n"
+                    + bull_argument
+                    + "\n"
+                    + bear_argument,
+                    "bull_history": investment_debate_state.get("bull_history", "")
+                    + "\n"
+                    + bull_argument,
+                    "bear_history": investment_debate_state.get("bear_history", "")
+                    + "\n"
+                    + bear_argument,
+                    "current_response": bear_argument,
+                    "count": investment_debate_state["count"] + 2,
+                }
+            }
+
+        return self._create_concurrent_node(
+            {"bull": bull_researcher_node, "bear": bear_researcher_node},
+            merge_openings,
+        )
+
+    def _create_risk_round_node(self, risky_analyst, safe_analyst, neutral_analyst):
+        """Create a node running one risk-debate round with all three debators in parallel."""
+
+        def merge_round(state, results):
+            risk_debate_state = state["risk_debate_state"]
+            arguments = {
+                speaker: results[speaker]["risk_debate_state"][f"current_{speaker}_response"]
+                for speaker in ("risky", "safe", "neutral")
+            }
+
+            # Every debator answered the same previous round, so the round is
+            # appended to the shared history as a block.
+            return {
+                "risk_debate_state": {
+                    "history": "\n".join(
+                        [risk_debate_state.get("history", "")] + list(arguments.values())
+                    ),
+                    **{
+                        f"{speaker}_history": risk_debate_state.get(f"{speaker}_history", "")
+                        + "\n"
+                        + argument
+                        for speaker, argument in arguments.items()
+                    },
+                    "latest_speaker": "Neutral",
+                    **{
+                        f"current_{speaker}_response": argument
+                        for speaker, argument in arguments.items()
+                    },
+                    "count": risk_debate_state["count"] + len(arguments),
+                }
+            }
+
+        return self._create_concurrent_node(
+            {"risky": risky_analyst, "safe": safe_analyst, "neutral": neutral_analyst},
+            merge_round,
+        )
+
+    def _create_memory_retrieval_node(self, n_matches=2):
+        """Create a node that queries all agent memories concurrently."""
+
+        memories = {
+            "bull": self.bull_memory,
+            "bear": self.bear_memory,
+            "invest_judge": self.invest_judge_memory,
+            "trader": self.trader_memory,
+            "risk_manager": self.risk_manager_memory,
+        }
+
+        def memory_retrieval(state):
+            """Retrieve past memories for every downstream agent in parallel."""
+            curr_situation = [
+                state["market_report"],
+                state["sentiment_report"],
+                state["news_report"],
+                state["fundamentals_report"],
+            ]
+
+            # Memories with the same embedding settings share one embedder:
+            # embedding once here lets the lookups below hit its chunk cache
+            embedders = {id(memory.embedder): memory.embedder for memory in memories.values()}
+            for embedder in embedders.values():
+                embedder.embed_chunked([curr_situation])
+
+            def retrieve(role, memory):
+                try:
+                    return role, memory.get_memories(
+                        curr_situation, n_matches=n_matches, **memory.retrieval_filters(state)
+                    )
+                except Exception as e:
+                    # Leave the role out so its node retries the lookup itself
+                    print(f"Error retrieving {role} memories: {e}")
+                    return role, None
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(memories)) as executor:
+                results = executor.map(lambda item: retrieve(*item), memories.items())
+                past_memories = {
+                    role: result for role, result in results if result is not None
+                }
+
+            return {"past_memories": past_memories}
+
+        async def amemory_retrieval(state):
+            """Async variant: the lookups are blocking, so they run in worker threads."""
+            return await asyncio.to_thread(memory_retrieval, state)
+
+        return RunnableLambda(memory_retrieval, afunc=amemory_retrieval)
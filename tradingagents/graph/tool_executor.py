@@ -0,0 +1,179 @@
+# TradingAgents/graph/tool_executor.py
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+
+class _InFlightLimit:
+    """Semaphore whose limit can change while slots are held."""
+
+    def __init__(self, limit: int):
+        self._condition = threading.Condition()
+        self.limit = limit
+        self.count = 0
+
+    def resize(self, limit: int):
+        with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        with self._condition:
+            while self.count >= self.limit:
+                if not blocking:
+                    return False
+                self._condition.wait()
+            self.count += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.count -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+# One cap on the tool calls in flight in the process, across every executor
+_IN_FLIGHT = _InFlightLimit(16)
+
+
+class ParallelToolExecutor:
+    """Executes the tool calls of one AI message concurrently.
+
+    Blocking tools run on a thread pool and coroutine tools on the event loop.
+    Each call gets its own timeout, measured from when it starts running, and
+    a process-wide limit caps the number of tool calls in flight across all
+    analysts and runs: every executor shares it, and ``max_in_flight`` sets
+    it for all of them (the config's ``max_tool_calls_in_flight``). Results come back as ToolMessages in the order of
+    the tool calls; failures and timeouts become error ToolMessages so the
+    LLM can react to them.
+    """
+
+    def __init__(
+        self,
+        tools: List[BaseTool],
+        timeout: Optional[float] = 60,
+        max_workers: int = 8,
+        max_in_flight: int = 16,
+    ):
+        """Initialize with the tools and concurrency limits."""
+        self.tools_by_name: Dict[str, BaseTool] = {tool.name: tool for tool in tools}
+        self.timeout = timeout
+        self.max_workers = max_workers
+        _IN_FLIGHT.resize(max_in_flight)
+        self._in_flight = _IN_FLIGHT
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tool"
+        )
+
+    @staticmethod
+    def _error(tool_call, content: str) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {content}",
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+            status="error",
+        )
+
+    def _invalid(self, tool_call) -> Optional[ToolMessage]:
+        if tool_call["name"] not in self.tools_by_name:
+            return self._error(tool_call, f"{tool_call['name']} is not a valid tool.")
+        return None
+
+    def _timed_out(self, tool_call) -> ToolMessage:
+        return self._error(
+            tool_call, f"{tool_call['name']} timed out after {self.timeout}s"
+        )
+
+    @staticmethod
+    def _is_async(tool: BaseTool) -> bool:
+        """Whether the tool only has a coroutine implementation."""
+        return (
+            getattr(tool, "coroutine", None) is not None
+            and getattr(tool, "func", None) is None
+        )
+
+    def _run(self, tool_call, started: threading.Event) -> ToolMessage:
+        """Run one call in a worker thread, holding an in-flight slot."""
+        tool = self.tools_by_name[tool_call["name"]]
+        with self._in_flight:
+            started.set()
+            try:
+                if self._is_async(tool):
+                    return asyncio.run(tool.ainvoke({**tool_call, "type": "tool_call"}))
+                return tool.invoke({**tool_call, "type": "tool_call"})
+            except Exception as e:
+                return self._error(tool_call, str(e))
+
+    def execute(self, message: AIMessage) -> List[ToolMessage]:
+        """Execute the message's tool calls concurrently on the thread pool."""
+        tool_calls = message.tool_calls
+        invalid = [self._invalid(call) for call in tool_calls]
+        started = [threading.Event() for _ in tool_calls]
+        futures = [
+            None if error else self._pool.submit(self._run, call, event)
+            for call, error, event in zip(tool_calls, invalid, started)
+        ]
+
+        results = []
+        for call, error, event, future in zip(tool_calls, invalid, started, futures):
+            if future is None:
+                results.append(error)
+                continue
+            # Time spent waiting for an in-flight slot does not count
+            while not event.wait(0.1):
+                if future.done():
+                    break
+            try:
+                results.append(future.result(timeout=self.timeout))
+            except concurrent.futures.TimeoutError:
+                results.append(self._timed_out(call))
+        return results
+
+    async def _acquire(self):
+        # The limit is shared with worker threads, so poll instead of blocking the loop
+        while not self._in_flight.acquire(blocking=False):
+            await asyncio.sleep(0.01)
+
+    async def _arun(self, tool_call) -> ToolMessage:
+        """Run one call on the event loop, or on the pool for blocking tools."""
+        invalid = self._invalid(tool_call)
+        if invalid is not None:
+            return invalid
+
+        tool = self.tools_by_name[tool_call["name"]]
+        if not self._is_async(tool):
+            started = threading.Event()
+            future = asyncio.wrap_future(self._pool.submit(self._run, tool_call, started))
+            while not started.is_set() and not future.done():
+                await asyncio.sleep(0.01)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                return self._timed_out(tool_call)
+
+        await self._acquire()
+        try:
+            return await asyncio.wait_for(
+                tool.ainvoke({**tool_call, "type": "tool_call"}), self.timeout
+            )
+        except asyncio.TimeoutError:
+            return self._timed_out(tool_call)
+        except Exception as e:
+            return self._error(tool_call, str(e))
+        finally:
+            self._in_flight.release()
+
+    async def aexecute(self, message: AIMessage) -> List[ToolMessage]:
+        """Execute the message's tool calls concurrently with asyncio."""
+        return list(await asyncio.gather(*(self._arun(call) for call in message.tool_calls)))
@@ -1,6 +1,9 @@
 # TradingAgents/graph/trading_graph.py
 
+import asyncio
+import concurrent.futures
 import os
+import threading
 from pathlib import Path
 import json
 from datetime import date
@@ -10,8 +13,6 @@ from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-from langgraph.prebuilt import ToolNode
-
 from tradingagents.agents import *
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.agents.utils.memory import FinancialSituationMemory
@@ -20,13 +21,17 @@ from tradingagents.agents.utils.agent_states import (
     InvestDebateState,
     RiskDebateState,
 )
-from tradingagents.dataflows.interface import set_config
+from tradingagents.dataflows.interface import set_config, get_company_sector
+from tradingagents.dataflows.prefetch import prefetch
+from tradingagents.screening import screen_universe
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .tool_executor import ParallelToolExecutor
+from .checkpointing import create_checkpointer, create_async_checkpointer, run_thread_id
 
 
 class TradingAgentsGraph:
@@ -83,7 +88,15 @@ class TradingAgentsGraph:
         self.tool_nodes = self._create_tool_nodes()
 
         # Initialize components
-        self.conditional_logic = ConditionalLogic()
+        self.conditional_logic = ConditionalLogic(
+            max_debate_rounds=self.config["max_debate_rounds"],
+            max_risk_discuss_rounds=self.config["max_risk_discuss_rounds"],
+            adaptive_stopping=self.config.get("adaptive_debate_stopping", False),
+            convergence_threshold=self.config.get("debate_convergence_threshold", 0.9),
+            skip_unanimous_risk_debate=self.config.get(
+                "skip_risk_debate_when_unanimous", False
+            ),
+        )
         self.graph_setup = GraphSetup(
             self.quick_thinking_llm,
             self.deep_thinking_llm,
@@ -103,16 +116,35 @@ class TradingAgentsGraph:
 
         # State tracking
         self.curr_state = None
+        self.curr_signal = ""
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        self.log_states_dict = {}  # ticker to date to full state dict
+        self._log_lock = threading.Lock()
+
+        # Persist state after every node so failed runs can be resumed
+        self.selected_analysts = selected_analysts
+        self.checkpointer = None
+        if self.config.get("checkpoint_dir"):
+            self.checkpointer = create_checkpointer(self.config["checkpoint_dir"])
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.graph = self.graph_setup.setup_graph(
+            selected_analysts, checkpointer=self.checkpointer
+        )
 
-    def _create_tool_nodes(self) -> Dict[str, ToolNode]:
+    def _create_tool_nodes(self) -> Dict[str, ParallelToolExecutor]:
         """Create tool nodes for different data sources."""
+
+        def tool_node(tools):
+            return ParallelToolExecutor(
+                tools,
+                timeout=self.config.get("tool_timeout", 60),
+                max_workers=self.config.get("max_tool_workers", 8),
+                max_in_flight=self.config.get("max_tool_calls_in_flight", 16),
+            )
+
         return {
-            "market": ToolNode(
+            "market": tool_node(
                 [
                     # online tools
                     self.toolkit.get_YFin_data_online,
@@ -122,7 +154,7 @@ class TradingAgentsGraph:
                     self.toolkit.get_stockstats_indicators_report,
                 ]
             ),
-            "social": ToolNode(
+            "social": tool_node(
                 [
                     # online tools
                     self.toolkit.get_stock_news_openai,
@@ -130,7 +162,7 @@ class TradingAgentsGraph:
                     self.toolkit.get_reddit_stock_info,
                 ]
             ),
-            "news": ToolNode(
+            "news": tool_node(
                 [
                     # online tools
                     self.toolkit.get_global_news_openai,
@@ -140,7 +172,7 @@ class TradingAgentsGraph:
                     self.toolkit.get_reddit_news,
                 ]
             ),
-            "fundamentals": ToolNode(
+            "fundamentals": tool_node(
                 [
                     # online tools
                     self.toolkit.get_fundamentals_openai,
@@ -156,97 +188,333 @@ class TradingAgentsGraph:
 
     def propagate(self, company_name, trade_date):
         """Run the trading agents graph for a company on a specific date."""
+        return self._remember_run(
+            company_name, *self._propagate_one(company_name, trade_date)
+        )
 
-        self.ticker = company_name
-
+    def _propagate_one(self, company_name, trade_date):
+        """Run the graph and return ``(final_state, signal)`` without recording it as the last run."""
         # Initialize state
         init_agent_state = self.propagator.create_initial_state(
-            company_name, trade_date
+            company_name, trade_date, self._company_sector(company_name)
         )
-        args = self.propagator.get_graph_args()
+        args = self._get_graph_args(company_name, trade_date)
+
+        if self.checkpointer is not None:
+            # A new run replaces earlier checkpoints of the same run; resume() continues one
+            self.checkpointer.delete_thread(self._thread_id(company_name, trade_date))
 
-        if self.debug:
-            # Debug mode with tracing
-            trace = []
-            for chunk in self.graph.stream(init_agent_state, **args):
-                if len(chunk["messages"]) == 0:
-                    pass
-                else:
-                    chunk["messages"][-1].pretty_print()
-                    trace.append(chunk)
-
-            final_state = trace[-1]
+        final_state = self._run_graph(init_agent_state, args)
+        return self._finish_run(trade_date, final_state)
+
+    def resume(self, company_name, trade_date):
+        """Continue an interrupted run from its last completed node.
+
+        Requires ``config["checkpoint_dir"]``. Nodes that completed before the
+        failure (e.g. the analysts) are not run again.
+        """
+        if self.checkpointer is None:
+            raise ValueError("Resuming a run requires config['checkpoint_dir']")
+
+        args = self._get_graph_args(company_name, trade_date)
+        snapshot = self.graph.get_state(args["config"])
+        if not snapshot.values:
+            raise ValueError(f"No checkpoint found for {company_name} on {trade_date}")
+
+        if snapshot.next:
+            final_state = self._run_graph(None, args)
         else:
+            final_state = snapshot.values  # the run had already completed
+
+        return self._remember_run(
+            company_name, *self._finish_run(trade_date, final_state)
+        )
+
+    def _thread_id(self, company_name, trade_date):
+        return run_thread_id(
+            company_name, trade_date, self.config, self.selected_analysts
+        )
+
+    def _get_graph_args(self, company_name, trade_date):
+        """Graph arguments, keyed to the run's checkpoint thread when checkpointing."""
+        args = self.propagator.get_graph_args()
+        if self.config.get("checkpoint_dir"):
+            args["config"]["configurable"] = {
+                "thread_id": self._thread_id(company_name, trade_date)
+            }
+        return args
+
+    def _run_graph(self, graph_input, args):
+        """Invoke the graph (or stream it with tracing in debug mode)."""
+        if not self.debug:
             # Standard mode without tracing
-            final_state = self.graph.invoke(init_agent_state, **args)
+            return self.graph.invoke(graph_input, **args)
 
-        # Store current state for reflection
-        self.curr_state = final_state
+        # Debug mode with tracing
+        final_state = None
+        for chunk in self.graph.stream(graph_input, **args):
+            if len(chunk["messages"]) > 0:
+                chunk["messages"][-1].pretty_print()
+            final_state = chunk
+        return final_state
+
+    def _finish_run(self, trade_date, final_state):
+        """Log a completed run and return its final state and processed signal."""
+        signal = self.process_signal(final_state["final_trade_decision"])
 
         # Log state
         self._log_state(trade_date, final_state)
 
         # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"])
+        return final_state, signal
+
+    def _remember_run(self, company_name, final_state, signal):
+        """Store the run as the last one, which ``reflect_and_remember`` reflects on."""
+        self.ticker = company_name
+        self.curr_state = final_state
+        self.curr_signal = signal
+        return final_state, signal
+
+    async def astream(self, company_name, trade_date):
+        """Stream the full state after each step of an async graph run.
+
+        Nodes run their async implementations (``ainvoke`` on the chat models,
+        async tools, analysts gathered on the event loop), so many runs can
+        share one event loop.
+        """
+        company_sector = await asyncio.to_thread(self._company_sector, company_name)
+        init_agent_state = self.propagator.create_initial_state(
+            company_name, trade_date, company_sector
+        )
+        async for chunk in self._astream_graph(
+            init_agent_state, company_name, trade_date
+        ):
+            yield chunk
+
+    async def _astream_graph(self, graph_input, company_name, trade_date):
+        args = self._get_graph_args(company_name, trade_date)
+        if not self.config.get("checkpoint_dir"):
+            async for chunk in self.graph.astream(graph_input, **args):
+                yield chunk
+            return
+
+        # The SQLite connection of an async checkpointer is bound to the running loop
+        async with create_async_checkpointer(self.config["checkpoint_dir"]) as saver:
+            graph = self.graph_setup.setup_graph(
+                self.selected_analysts, checkpointer=saver
+            )
+            if graph_input is not None:
+                await saver.adelete_thread(self._thread_id(company_name, trade_date))
+            else:
+                snapshot = await graph.aget_state(args["config"])
+                if not snapshot.values:
+                    raise ValueError(
+                        f"No checkpoint found for {company_name} on {trade_date}"
+                    )
+                if not snapshot.next:
+                    # The run had already completed
+                    yield snapshot.values
+                    return
+
+            async for chunk in graph.astream(graph_input, **args):
+                yield chunk
+
+    async def apropagate(self, company_name, trade_date):
+        """Async version of ``propagate``."""
+        return self._remember_run(
+            company_name,
+            *await self._aconsume(self.astream(company_name, trade_date), trade_date),
+        )
+
+    async def aresume(self, company_name, trade_date):
+        """Async version of ``resume``."""
+        if not self.config.get("checkpoint_dir"):
+            raise ValueError("Resuming a run requires config['checkpoint_dir']")
+        return self._remember_run(
+            company_name,
+            *await self._aconsume(
+                self._astream_graph(None, company_name, trade_date), trade_date
+            ),
+        )
+
+    async def _aconsume(self, stream, trade_date):
+        final_state = None
+        async for chunk in stream:
+            if self.debug and len(chunk["messages"]) > 0:
+                chunk["messages"][-1].pretty_print()
+            final_state = chunk
+
+        signal = await self.signal_processor.aprocess_signal(
+            final_state["final_trade_decision"]
+        )
+
+        # Log state
+        self._log_state(trade_date, final_state)
+
+        return final_state, signal
+
+    def propagate_many(self, tickers, trade_date, max_concurrency=None, top_n=None):
+        """Run the graph for several tickers on one date.
+
+        With ``top_n`` (default ``config["screen_top_n"]``) the tickers are
+        first ranked by the vectorized universe screen, which downloads the
+        whole universe's prices in one request, and only the best ``top_n``
+        are run. Data the runs share (one multi-ticker price
+        download, the parsed Reddit dumps and the global news) is fetched
+        once up front, then up to ``max_concurrency`` runs (default
+        ``config["max_concurrent_runs"]``) execute at a time. Yields
+        ``(ticker, (final_state, signal))`` as each run finishes, or
+        ``(ticker, exception)`` when it fails.
+
+        The runs share this instance, so none of them becomes the last run
+        that ``reflect_and_remember`` defaults to: pass the yielded final
+        state and signal to it instead.
+        """
+        tickers = self._screen(tickers, trade_date, top_n)
+        prefetch(tickers, trade_date, self.config, self.selected_analysts)
+
+        max_workers = max_concurrency or self.config.get("max_concurrent_runs", 4)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="run"
+        )
+        try:
+            futures = {
+                executor.submit(self._propagate_one, ticker, trade_date): ticker
+                for ticker in tickers
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def apropagate_many(self, tickers, trade_date, max_concurrency=None, top_n=None):
+        """Async version of ``propagate_many``."""
+        tickers = await asyncio.to_thread(self._screen, tickers, trade_date, top_n)
+        await asyncio.to_thread(
+            prefetch, tickers, trade_date, self.config, self.selected_analysts
+        )
+
+        semaphore = asyncio.Semaphore(
+            max_concurrency or self.config.get("max_concurrent_runs", 4)
+        )
+
+        async def run(ticker):
+            async with semaphore:
+                try:
+                    return ticker, await self._aconsume(
+                        self.astream(ticker, trade_date), trade_date
+                    )
+                except Exception as e:
+                    return ticker, e
+
+        tasks = [asyncio.ensure_future(run(ticker)) for ticker in tickers]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _screen(self, tickers, trade_date, top_n=None):
+        """The tickers to run: all of them, or the ``top_n`` ranked by the screen."""
+        tickers = list(dict.fromkeys(tickers))
+        top_n = top_n or self.config.get("screen_top_n")
+        if not top_n or len(tickers) <= top_n:
+            return tickers
+        ranked = screen_universe(tickers, trade_date, self.config)
+        return list(ranked.index[:top_n])
+
+    def _company_sector(self, company_name):
+        """Sector recorded with memories and used for sector-scoped retrieval."""
+        if not self.config["online_tools"]:
+            return ""
+        return get_company_sector(company_name)
 
     def _log_state(self, trade_date, final_state):
         """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
-            "company_of_interest": final_state["company_of_interest"],
-            "trade_date": final_state["trade_date"],
-            "market_report": final_state["market_report"],
-            "sentiment_report": final_state["sentiment_report"],
-            "news_report": final_state["news_report"],
-            "fundamentals_report": final_state["fundamentals_report"],
-            "investment_debate_state": {
-                "bull_history": final_state["investment_debate_state"]["bull_history"],
-                "bear_history": final_state["investment_debate_state"]["bear_history"],
-                "history": final_state["investment_debate_state"]["history"],
-                "current_response": final_state["investment_debate_state"][
-                    "current_response"
-                ],
-                "judge_decision": final_state["investment_debate_state"][
-                    "judge_decision"
-                ],
-            },
-            "trader_investment_decision": final_state["trader_investment_plan"],
-            "risk_debate_state": {
-                "risky_history": final_state["risk_debate_state"]["risky_history"],
-                "safe_history": final_state["risk_debate_state"]["safe_history"],
-                "neutral_history": final_state["risk_debate_state"]["neutral_history"],
-                "history": final_state["risk_debate_state"]["history"],
-                "judge_decision": final_state["risk_debate_state"]["judge_decision"],
-            },
-            "investment_plan": final_state["investment_plan"],
-            "final_trade_decision": final_state["final_trade_decision"],
-        }
-
-        # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
-        directory.mkdir(parents=True, exist_ok=True)
+        ticker = final_state["company_of_interest"]
+        # Runs of the same ticker may finish concurrently
+        with self._log_lock:
+            ticker_states = self.log_states_dict.setdefault(ticker, {})
+            ticker_states[str(trade_date)] = {
+                "company_of_interest": final_state["company_of_interest"],
+                "trade_date": final_state["trade_date"],
+                "market_report": final_state["market_report"],
+                "sentiment_report": final_state["sentiment_report"],
+                "news_report": final_state["news_report"],
+                "fundamentals_report": final_state["fundamentals_report"],
+                "investment_debate_state": {
+                    "bull_history": final_state["investment_debate_state"]["bull_history"],
+                    "bear_history": final_state["investment_debate_state"]["bear_history"],
+                    "history": final_state["investment_debate_state"]["history"],
+                    "current_response": final_state["investment_debate_state"][
+                        "current_response"
+                    ],
+                    "judge_decision": final_state["investment_debate_state"][
+                        "judge_decision"
+                    ],
+                    "stop_reason": final_state.get("debate_stop_reason", ""),
+                },
+                "trader_investment_decision": final_state["trader_investment_plan"],
+                "risk_debate_state": {
+                    "risky_history": final_state["risk_debate_state"]["risky_history"],
+                    "safe_history": final_state["risk_debate_state"]["safe_history"],
+                    "neutral_history": final_state["risk_debate_state"]["neutral_history"],
+                    "history": final_state["risk_debate_state"]["history"],
+                    "judge_decision": final_state["risk_debate_state"]["judge_decision"],
+                    "stop_reason": final_state.get("risk_stop_reason", ""),
+                },
+                "investment_plan": final_state["investment_plan"],
+                "final_trade_decision": final_state["final_trade_decision"],
+            }
+
+            # Save to file
+            directory = Path(f"eval_results/{ticker}/TradingAgentsStrategy_logs/")
+            directory.mkdir(parents=True, exist_ok=True)
+
+            with open(
+                f"eval_results/{ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
+                "w",
+            ) as f:
+                json.dump(ticker_states, f, indent=4)
+
+    def reflect_and_remember(
+        self, returns_losses, final_state=None, signal=None, exit_date=""
+    ):
+        """Reflect on decisions and update memory based on returns.
 
-        with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
-            "w",
-        ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+        Reflects on the last run unless the final state (and signal) of
+        another run is given, as the backtest engine does for concurrent runs.
+        ``exit_date`` is the date the returns were realized; point-in-time
+        retrieval only shows the lessons to runs on or after it.
+        """
+        if final_state is None:
+            if self.curr_state is None:
+                raise ValueError(
+                    "No run to reflect on: propagate_many runs are not recorded "
+                    "as the last run, pass their final_state"
+                )
+            final_state, signal = self.curr_state, self.curr_signal
+        elif signal is None:
+            signal = self.process_signal(final_state["final_trade_decision"])
 
-    def reflect_and_remember(self, returns_losses):
-        """Reflect on decisions and update memory based on returns."""
         self.reflector.reflect_bull_researcher(
-            self.curr_state, returns_losses, self.bull_memory
+            final_state, returns_losses, self.bull_memory, signal, exit_date
         )
         self.reflector.reflect_bear_researcher(
-            self.curr_state, returns_losses, self.bear_memory
+            final_state, returns_losses, self.bear_memory, signal, exit_date
         )
         self.reflector.reflect_trader(
-            self.curr_state, returns_losses, self.trader_memory
+            final_state, returns_losses, self.trader_memory, signal, exit_date
         )
         self.reflector.reflect_invest_judge(
-            self.curr_state, returns_losses, self.invest_judge_memory
+            final_state, returns_losses, self.invest_judge_memory, signal, exit_date
         )
         self.reflector.reflect_risk_manager(
-            self.curr_state, returns_losses, self.risk_manager_memory
+            final_state, returns_losses, self.risk_manager_memory, signal, exit_date
         )
 
     def process_signal(self, full_signal):
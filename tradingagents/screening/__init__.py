@@ -0,0 +1,15 @@
+# TradingAgents/screening/__init__.py
+
+from .screener import (
+    DEFAULT_SCREEN_WEIGHTS,
+    FEATURES,
+    UniverseScreen,
+    screen_universe,
+)
+
+__all__ = [
+    "DEFAULT_SCREEN_WEIGHTS",
+    "FEATURES",
+    "UniverseScreen",
+    "screen_universe",
+]
@@ -0,0 +1,221 @@
+# TradingAgents/screening/screener.py
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.config import get_config
+from tradingagents.dataflows.indicators import compute_indicators
+from tradingagents.dataflows.price_store import load_price_history
+
+
+INDICATORS = [
+    "close_50_sma",
+    "close_200_sma",
+    "close_10_ema",
+    "macd",
+    "macds",
+    "macdh",
+    "rsi",
+    "boll",
+    "boll_ub",
+    "boll_lb",
+    "atr",
+    "vwma",
+    "mfi",
+]
+
+SCORES = [
+    "return_21",  # 1-month return
+    "return_63",  # 3-month return
+    "return_252_21",  # 12-month return skipping the last month
+    "trend_200",  # distance of the close above its 200-day SMA
+    "volatility_20",  # annualised 20-day realised volatility
+    "atr_pct",  # ATR as a fraction of the close
+    "dollar_volume_20",  # 20-day average traded value
+]
+
+FEATURES = ["close"] + INDICATORS + SCORES
+
+DEFAULT_SCREEN_WEIGHTS = {
+    "return_252_21": 1.0,
+    "return_63": 0.5,
+    "trend_200": 0.5,
+    "volatility_20": -0.5,
+}
+
+
+def _rolling_sum(frame: pd.DataFrame, window: int, mean: bool = False) -> pd.DataFrame:
+    """Rolling sum (or mean) over partial windows, skipping NaN, for all columns at once."""
+    values = frame.to_numpy(dtype=np.float64)
+    present = ~np.isnan(values)
+    sums = np.cumsum(np.where(present, values, 0.0), axis=0)
+    counts = np.cumsum(present, axis=0)
+    sums[window:] = sums[window:] - sums[:-window].copy()
+    counts[window:] = counts[window:] - counts[:-window].copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = sums / counts if mean else np.where(counts > 0, sums, np.nan)
+    return pd.DataFrame(out, index=frame.index, columns=frame.columns)
+
+
+def _scores(close, volume, atr, sma_200) -> Dict[str, pd.DataFrame]:
+    returns = close.pct_change(fill_method=None)
+    return {
+        "return_21": close / close.shift(21) - 1,
+        "return_63": close / close.shift(63) - 1,
+        "return_252_21": close.shift(21) / close.shift(252) - 1,
+        "trend_200": close / sma_200 - 1,
+        "volatility_20": returns.rolling(20).std() * np.sqrt(252),
+        "atr_pct": atr / close,
+        "dollar_volume_20": _rolling_sum(close * volume, 20, mean=True),
+    }
+
+
+class UniverseScreen:
+    """Ticker × date × feature array of indicators and scores for a universe.
+
+    Price histories are loaded from the local price store, after one bulk
+    download of the tickers missing from the online cache; the indicators are
+    computed for all tickers in one batch of the native indicator engine and
+    the scores on date × ticker frames aligned on the union of sessions.
+    ``values[t, d, f]`` holds feature ``features[f]`` of ``tickers[t]`` on
+    ``dates[d]`` (NaN where the ticker has no data), stored as float32.
+    """
+
+    def __init__(self, tickers: List[str], online: Optional[bool] = None):
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        if online is None:
+            online = get_config()["online_tools"]
+        if online:
+            from tradingagents.dataflows.prefetch import prefetch_price_data
+
+            # One multi-ticker request instead of a download per ticker
+            try:
+                prefetch_price_data(tickers)
+            except Exception as e:
+                print(f"Prefetching price data failed: {e}")
+
+        histories = {}
+        for ticker in tickers:
+            try:
+                histories[ticker] = load_price_history(ticker, online)
+            except FileNotFoundError as e:
+                print(f"Skipping {ticker}: {e}")
+
+        self.tickers = list(histories)
+        self.features = list(FEATURES)
+        if not histories:
+            self.dates = pd.DatetimeIndex([])
+            self.values = np.empty((0, 0, len(self.features)), dtype=np.float32)
+            return
+
+        self.dates = pd.DatetimeIndex(
+            np.unique(np.concatenate([p.index.values for p in histories.values()]))
+        )
+        # Indicators run on each ticker's own sessions, stacked with leading NaN
+        # padding, so they match the market analyst's values exactly
+        length = max(len(prices) for prices in histories.values())
+        stacked = {
+            name: np.full((length, len(self.tickers)), np.nan)
+            for name in ("Close", "High", "Low", "Volume")
+        }
+        rows = []
+        for t, prices in enumerate(histories.values()):
+            rows.append(self.dates.searchsorted(prices.index))
+            for name, block in stacked.items():
+                block[length - len(prices) :, t] = prices[name].to_numpy(dtype=np.float64)
+        indicators = compute_indicators(stacked, INDICATORS)
+
+        def aligned(values):
+            block = np.full((len(self.dates), len(self.tickers)), np.nan)
+            for t, ticker_rows in enumerate(rows):
+                block[ticker_rows, t] = values[length - len(ticker_rows) :, t]
+            return pd.DataFrame(block, index=self.dates, columns=self.tickers)
+
+        close, volume = aligned(stacked["Close"]), aligned(stacked["Volume"])
+        frames = {"close": close}
+        frames.update({name: aligned(values) for name, values in indicators.items()})
+        frames.update(_scores(close, volume, frames["atr"], frames["close_200_sma"]))
+
+        # Rows after a ticker's last session (or before its first) stay NaN
+        listed = close.notna().to_numpy()
+        self.values = np.empty(
+            (len(self.tickers), len(self.dates), len(self.features)), dtype=np.float32
+        )
+        for f, name in enumerate(self.features):
+            values = frames[name].to_numpy(dtype=np.float64)
+            self.values[:, :, f] = np.where(listed, values, np.nan).T
+        self.history = np.cumsum(listed, axis=0).T  # sessions of data up to each date
+
+    def feature(self, name: str) -> np.ndarray:
+        """A ticker × date view of one feature."""
+        return self.values[:, :, self.features.index(name)]
+
+    def _date_index(self, date) -> int:
+        index = self.dates.searchsorted(pd.Timestamp(date), side="right") - 1
+        if index < 0:
+            raise ValueError(f"No price data on or before {date}")
+        return index
+
+    def snapshot(self, date) -> pd.DataFrame:
+        """Features of every ticker on the last session on or before ``date``."""
+        index = self._date_index(date)
+        frame = pd.DataFrame(
+            self.values[:, index, :], index=pd.Index(self.tickers, name="ticker"), columns=self.features
+        )
+        frame["history"] = self.history[:, index]
+        return frame
+
+    def rank(
+        self,
+        date,
+        weights: Optional[Dict[str, float]] = None,
+        min_history: int = 252,
+        min_dollar_volume: float = 0.0,
+    ) -> pd.DataFrame:
+        """Rank the universe on ``date`` by a weighted sum of cross-sectional z-scores.
+
+        Tickers without a session on that date, with fewer than
+        ``min_history`` sessions of data or with a lower average traded
+        value than ``min_dollar_volume`` are left out.
+        """
+        weights = weights or DEFAULT_SCREEN_WEIGHTS
+        frame = self.snapshot(date)
+        eligible = (
+            frame["close"].notna()
+            & (frame["history"] >= min_history)
+            & (frame["dollar_volume_20"].fillna(0) >= min_dollar_volume)
+        )
+        frame = frame[eligible].copy()
+
+        score = pd.Series(0.0, index=frame.index)
+        for name, weight in weights.items():
+            values = frame[name].astype("float64")
+            std = values.std()
+            z = (values - values.mean()) / std if std > 0 else values * 0.0
+            score += weight * z.fillna(0.0)
+        frame["score"] = score
+        frame = frame.sort_values("score", ascending=False)
+        frame["rank"] = np.arange(1, len(frame) + 1)
+        return frame
+
+    def top(self, date, n: int, **kwargs) -> List[str]:
+        """The ``n`` best-ranked tickers on ``date``."""
+        return list(self.rank(date, **kwargs).index[:n])
+
+
+def screen_universe(
+    tickers: List[str],
+    trade_date,
+    config: Optional[Dict] = None,
+) -> pd.DataFrame:
+    """Rank a universe on ``trade_date`` with the screen settings of ``config``."""
+    config = config or {}
+    screen = UniverseScreen(tickers, online=config.get("online_tools"))
+    return screen.rank(
+        trade_date,
+        weights=config.get("screen_weights"),
+        min_history=config.get("screen_min_history", 252),
+        min_dollar_volume=config.get("screen_min_dollar_volume", 0.0),
+    )